@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = "eventos2.core"
+
+    def ready(self):
+        from eventos2.core import signals  # noqa: F401
@@ -0,0 +1,15 @@
+from eventos2.utils.cache import bump_cache_version
+
+# Cached responses of the event catalog (GET /events/).
+EVENT_CATALOG_CACHE = "event-catalog"
+
+# Cached responses of an event's public pages (the event, activities and tracks).
+EVENT_CACHE = "event:{slug}"
+
+
+def invalidate_event_catalog():
+    bump_cache_version(EVENT_CATALOG_CACHE)
+
+
+def invalidate_event(slug):
+    bump_cache_version(EVENT_CACHE.format(slug=slug))
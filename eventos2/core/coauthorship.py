@@ -0,0 +1,248 @@
+from array import array
+from bisect import bisect_left
+from itertools import combinations, groupby
+
+from django.db.models import Max, Q
+
+from eventos2.core.models import SubmissionAuthorship
+from eventos2.utils.cache import (
+    bump_cache_version,
+    get_cache_version,
+    get_or_refill,
+    refill,
+)
+
+# The co-authorship graph, see `get_coauthorship_graph`. It's versioned,
+# and replaced by `update_coauthorship_graph`, so it doesn't expire.
+COAUTHORSHIP_GRAPH_CACHE = "coauthorship-graph"
+COAUTHORSHIP_CHUNK_SIZE = 5000
+# The merged edges are compacted into the arrays when they're more than
+# this fraction of the edges in the arrays, so each edge is copied
+# a constant number of times (amortized).
+COAUTHORSHIP_COMPACTION_RATIO = 0.1
+
+# Reviewers that co-authored a submission with one of the authors (1 hop)
+# have a conflict of interest, as well as the authors themselves (0 hops).
+CONFLICT_OF_INTEREST_HOPS = 1
+
+# The graph of the current process, and the cache version it was loaded from.
+_local_graph = (None, None)
+
+
+class CoauthorshipGraph:
+    """
+    An undirected graph of the users that authored a submission together,
+    in any event, in compressed sparse row (CSR) form:
+
+    * `users`: the IDs of the users with co-authors, sorted, so the position
+      of a user is found by binary search.
+    * `indptr`: the co-authors of the user in position `i` are in
+      `indices[indptr[i]:indptr[i + 1]]`.
+    * `indices`: the positions of the co-authors.
+
+    Arrays take a fraction of the memory of dicts and sets, and are
+    pickled compactly into the cache.
+
+    `last_authorship_id` is the last authorship read into the graph,
+    so the ones created after it can be merged with `merge`, which keeps
+    the new edges apart, in `added` (user ID -> co-author IDs), until
+    there are enough of them to rebuild the arrays.
+    """
+
+    def __init__(self, users, indptr, indices, last_authorship_id=0):
+        self.users = users
+        self.indptr = indptr
+        self.indices = indices
+        self.last_authorship_id = last_authorship_id
+        self.added = {}
+        self.added_count = 0
+
+    @classmethod
+    def from_edges(cls, edges, last_authorship_id=0):
+        """
+        Builds the graph from `(user_id, user_id)` pairs, in any direction.
+        """
+        adjacency = {}
+        for a, b in edges:
+            if a != b:
+                adjacency.setdefault(a, set()).add(b)
+                adjacency.setdefault(b, set()).add(a)
+
+        users = array("q", sorted(adjacency))
+        positions = {user_id: i for i, user_id in enumerate(users)}
+        indptr = array("q", [0])
+        indices = array("i")
+        for user_id in users:
+            indices.extend(sorted(positions[x] for x in adjacency[user_id]))
+            indptr.append(len(indices))
+        return cls(users, indptr, indices, last_authorship_id)
+
+    def edges(self):
+        for i, user_id in enumerate(self.users):
+            for j in self.indices[self.indptr[i] : self.indptr[i + 1]]:
+                if i < j:
+                    yield user_id, self.users[j]
+        for user_id, coauthors in self.added.items():
+            for coauthor_id in coauthors:
+                if user_id < coauthor_id:
+                    yield user_id, coauthor_id
+
+    def merge(self, edges, last_authorship_id):
+        """
+        Adds the edges to the graph, in place, without rebuilding the arrays,
+        unless the added edges are more than `COAUTHORSHIP_COMPACTION_RATIO`
+        of the edges in them.
+        """
+        for a, b in edges:
+            if a != b and not self.has_edge(a, b):
+                self.added.setdefault(a, set()).add(b)
+                self.added.setdefault(b, set()).add(a)
+                self.added_count += 1
+        self.last_authorship_id = max(self.last_authorship_id, last_authorship_id)
+        if self.added_count > len(self.indices) / 2 * COAUTHORSHIP_COMPACTION_RATIO:
+            self.compact()
+
+    def compact(self):
+        """
+        Rebuilds the arrays with the added edges.
+        """
+        graph = CoauthorshipGraph.from_edges(self.edges())
+        self.users, self.indptr, self.indices = graph.users, graph.indptr, graph.indices
+        self.added = {}
+        self.added_count = 0
+
+    def position(self, user_id):
+        i = bisect_left(self.users, user_id)
+        if i < len(self.users) and self.users[i] == user_id:
+            return i
+        return None
+
+    def has_edge(self, a, b):
+        if b in self.added.get(a, ()):
+            return True
+        i, j = self.position(a), self.position(b)
+        if i is None or j is None:
+            return False
+        # The co-authors of each user are sorted by position.
+        start, end = self.indptr[i], self.indptr[i + 1]
+        k = bisect_left(self.indices, j, start, end)
+        return k < end and self.indices[k] == j
+
+    def coauthors(self, user_id):
+        coauthors = set(self.added.get(user_id, ()))
+        i = self.position(user_id)
+        if i is not None:
+            coauthors.update(
+                self.users[j] for j in self.indices[self.indptr[i] : self.indptr[i + 1]]
+            )
+        return coauthors
+
+    def within_hops(self, user_ids, hops):
+        """
+        Returns the users at most `hops` co-authorships away
+        from any of the users, including themselves.
+        """
+        found = set(user_ids)
+        frontier = found
+        for _ in range(hops):
+            next_frontier = set()
+            for user_id in frontier:
+                next_frontier.update(self.coauthors(user_id))
+            next_frontier -= found
+            if not next_frontier:
+                break
+            found |= next_frontier
+            frontier = next_frontier
+        return found
+
+    def has_conflict(self, reviewer_id, author_ids, hops=CONFLICT_OF_INTEREST_HOPS):
+        """
+        Returns whether the reviewer is one of the authors,
+        or is at most `hops` co-authorships away from one of them.
+        """
+        return not self.within_hops([reviewer_id], hops).isdisjoint(author_ids)
+
+
+def read_coauthorship_edges(authorships):
+    """
+    Returns the co-author pairs of the submissions of the authorships
+    (a queryset), reading them in chunks, ordered by submission.
+    """
+    rows = (
+        authorships.order_by("submission_id", "user_id")
+        .values_list("submission_id", "user_id")
+        .iterator(chunk_size=COAUTHORSHIP_CHUNK_SIZE)
+    )
+    for _, group in groupby(rows, key=lambda x: x[0]):
+        yield from combinations([user_id for _, user_id in group], 2)
+
+
+def build_coauthorship_graph():
+    """
+    Builds the graph from all the authorships.
+    """
+    last_id = SubmissionAuthorship.objects.aggregate(last=Max("pk"))["last"] or 0
+    edges = read_coauthorship_edges(
+        SubmissionAuthorship.objects.filter(pk__lte=last_id)
+    )
+    return CoauthorshipGraph.from_edges(edges, last_id)
+
+
+def merge_new_authorships(graph, submission_ids=()):
+    """
+    Merges into the graph the authorships created since it was built,
+    and the ones of the submissions (which may have been committed
+    after authorships with larger IDs).
+    """
+    last_id = SubmissionAuthorship.objects.aggregate(last=Max("pk"))["last"] or 0
+    if last_id <= graph.last_authorship_id and not submission_ids:
+        return
+    new = SubmissionAuthorship.objects.filter(
+        Q(pk__gt=graph.last_authorship_id) | Q(submission_id__in=submission_ids),
+        pk__lte=last_id,
+    )
+    # All the authors of those submissions, the previous ones included.
+    edges = read_coauthorship_edges(
+        SubmissionAuthorship.objects.filter(
+            submission__in=new.values("submission_id"), pk__lte=last_id
+        )
+    )
+    graph.merge(edges, last_id)
+
+
+def _get_cached_coauthorship_graph():
+    # Built by a single caller, if it isn't cached (e.g. evicted).
+    return get_or_refill(
+        COAUTHORSHIP_GRAPH_CACHE, build_coauthorship_graph, timeout=None
+    )
+
+
+def get_coauthorship_graph():
+    """
+    Returns the co-authorship graph. Each process keeps it in memory,
+    reloading it from the cache only when it's replaced
+    by `update_coauthorship_graph`, so checks take a single cache read
+    (of the version), and no queries.
+    """
+    global _local_graph
+    version = get_cache_version(COAUTHORSHIP_GRAPH_CACHE)
+    local_version, graph = _local_graph
+    if local_version != version:
+        graph = _get_cached_coauthorship_graph()
+        _local_graph = (version, graph)
+    return graph
+
+
+def update_coauthorship_graph(submission_ids=(), rebuild=False):
+    """
+    Replaces the cached graph, merging the new authorships into it,
+    or rebuilding it, e.g. when authorships were deleted.
+    Must not run concurrently (see `update_coauthorships`).
+    """
+    if rebuild:
+        graph = build_coauthorship_graph()
+    else:
+        graph = _get_cached_coauthorship_graph()
+        merge_new_authorships(graph, submission_ids)
+    refill(COAUTHORSHIP_GRAPH_CACHE, graph, timeout=None)
+    bump_cache_version(COAUTHORSHIP_GRAPH_CACHE)
@@ -0,0 +1,392 @@
+import http.client
+import json
+import os
+import subprocess  # nosec
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from eventos2.core.models import Activity, Event, User
+
+# The same configuration as the CMD of docker/backend.dockerfile.
+GUNICORN_ARGS = [
+    "--worker-tmp-dir=/dev/shm",
+    "--workers=2",
+    "--threads=4",
+    "--worker-class=gthread",
+]
+API_PREFIX = "/api/v1"
+SERVER_START_TIMEOUT = 30
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, duration):
+    """
+    Summarizes the samples, a list of `(endpoint, latency, ok)` tuples,
+    with the latency in seconds, per endpoint and in total.
+    """
+    by_endpoint = defaultdict(list)
+    for endpoint, latency, ok in samples:
+        by_endpoint[endpoint].append((latency, ok))
+        by_endpoint["total"].append((latency, ok))
+
+    report = {}
+    for endpoint, values in sorted(by_endpoint.items()):
+        latencies = sorted(latency * 1000 for latency, _ in values)
+        errors = sum(1 for _, ok in values if not ok)
+        report[endpoint] = {
+            "requests": len(values),
+            "errors": errors,
+            "error_rate": errors / len(values),
+            "throughput": len(values) / duration,
+            **{"p{}".format(p): percentile(latencies, p) for p in PERCENTILES},
+        }
+    return report
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """
+    Returns the regressions of the report in relation to the baseline:
+    p95 latencies or throughputs worse than `tolerance` (a fraction),
+    or error rates more than one percentage point higher.
+    """
+    regressions = []
+    for endpoint, before in baseline.items():
+        after = report.get(endpoint)
+        if after is None:
+            continue
+        if after["p95"] > before["p95"] * (1 + tolerance):
+            regressions.append(
+                "{}: p95 went from {:.1f}ms to {:.1f}ms".format(
+                    endpoint, before["p95"], after["p95"]
+                )
+            )
+        if after["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(
+                "{}: error rate went from {:.1%} to {:.1%}".format(
+                    endpoint, before["error_rate"], after["error_rate"]
+                )
+            )
+        if after["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(
+                "{}: throughput went from {:.1f}/s to {:.1f}/s".format(
+                    endpoint, before["throughput"], after["throughput"]
+                )
+            )
+    return regressions
+
+
+class Client:
+    """
+    A keep-alive HTTP connection, for a single thread,
+    which records a sample for each request.
+    """
+
+    def __init__(self, url, token, samples):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.headers = {
+            "Authorization": "Bearer {}".format(token),
+            "Content-Type": "application/json",
+        }
+        self.samples = samples
+        self.connection = None
+
+    def request(self, method, path, endpoint, expected_status, data=None):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port)
+        body = None if data is None else json.dumps(data)
+        started = time.perf_counter()
+        try:
+            self.connection.request(
+                method, API_PREFIX + path, body=body, headers=self.headers
+            )
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            self.samples.append((endpoint, time.perf_counter() - started, False))
+            return None
+
+        ok = response.status == expected_status
+        self.samples.append((endpoint, time.perf_counter() - started, ok))
+        if ok and content:
+            return json.loads(content)
+        return None
+
+
+def run_registration_rush(url, event, activity, users, deadline, samples):
+    """
+    Each user repeatedly opens the event page, registers into the event
+    and into the activity, and then removes both registrations,
+    so that the rush can go on for as long as needed.
+    """
+    clients = [Client(url, str(AccessToken.for_user(x)), samples) for x in users]
+    while time.monotonic() < deadline:
+        for client in clients:
+            client.request(
+                "GET", "/events/{}/".format(event.slug), "GET /events/{slug}/", 200
+            )
+            event_registration = client.request(
+                "POST",
+                "/event_registrations/",
+                "POST /event_registrations/",
+                200,
+                {"event_slug": event.slug},
+            )
+            activity_registration = client.request(
+                "POST",
+                "/activity_registrations/",
+                "POST /activity_registrations/",
+                200,
+                {"activity": activity.pk},
+            )
+            if activity_registration is not None:
+                client.request(
+                    "DELETE",
+                    "/activity_registrations/{}/".format(activity_registration["id"]),
+                    "DELETE /activity_registrations/{id}/",
+                    204,
+                )
+            if event_registration is not None:
+                client.request(
+                    "DELETE",
+                    "/event_registrations/{}/".format(event_registration["id"]),
+                    "DELETE /event_registrations/{id}/",
+                    204,
+                )
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates a registration rush against the API, reporting the latency "
+        "percentiles, throughput and error rate of each endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="The server to test, instead of starting one")
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=8765,
+            help="The port of the gunicorn server started by the command",
+        )
+        parser.add_argument("--duration", type=float, default=30, help="In seconds")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--event-slug", default="test")
+        parser.add_argument(
+            "--populate",
+            action="store_true",
+            help="Creates the dataset with the populate command first",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=1000,
+            help="How many users are created by --populate",
+        )
+        parser.add_argument("--save-baseline", help="Saves the report to this file")
+        parser.add_argument(
+            "--baseline",
+            help="Compares the report to this file, failing on regressions",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="How much worse than the baseline is a regression",
+        )
+
+    def handle(self, *args, **options):
+        # Without Redis, each worker has its own cache, which isn't
+        # the configuration of production (see `SHARED_CACHE`).
+        if not settings.REDIS_URL:
+            if options["url"] is None:
+                raise CommandError(
+                    "REDIS_URL must be set, so the workers of the server "
+                    "share the cache, like in production."
+                )
+            self.stderr.write(
+                self.style.WARNING(
+                    "REDIS_URL isn't set: make sure the server under test "
+                    "uses a shared cache, like in production."
+                )
+            )
+
+        if options["populate"]:
+            self._populate(options["users"])
+
+        event = Event.available_objects.filter(slug=options["event_slug"]).first()
+        if event is None:
+            raise CommandError(
+                "The event doesn't exist. Run this command with --populate."
+            )
+        now = timezone.now()
+        activity = Activity.available_objects.filter(
+            event=event, starts_on__lte=now, ends_on__gte=now, capacity__isnull=True
+        ).first()
+        if activity is None:
+            raise CommandError("The event has no open activity without a capacity.")
+        # Only users that aren't registered yet can take part in the rush.
+        users = list(
+            User.objects.filter(is_active=True, is_superuser=False)
+            .exclude(event_registrations__event=event)
+            .order_by("pk")
+        )
+        concurrency = min(options["concurrency"], len(users))
+        if concurrency == 0:
+            raise CommandError("There are no users left to register into the event.")
+
+        server = None
+        url = options["url"]
+        if url is None:
+            url = "http://127.0.0.1:{}".format(options["port"])
+            server = self._start_server(url, options["port"])
+        try:
+            samples, duration = self._run(
+                url, event, activity, users, concurrency, options["duration"]
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        report = summarize(samples, duration)
+        self._print_report(report, concurrency, duration)
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as file:
+                json.dump(
+                    {
+                        "created_on": timezone.now().isoformat(),
+                        "concurrency": concurrency,
+                        "duration": duration,
+                        "endpoints": report,
+                    },
+                    file,
+                    indent=2,
+                )
+            self.stdout.write(
+                "Saved the baseline to {}.".format(options["save_baseline"])
+            )
+
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+            regressions = compare_to_baseline(
+                report, baseline["endpoints"], options["tolerance"]
+            )
+            if regressions:
+                raise CommandError(
+                    "Regressions in relation to the baseline:\n"
+                    + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions."))
+
+    def _populate(self, n_users):
+        if not User.objects.filter(is_superuser=True).exists():
+            User.objects.create_superuser(
+                email="loadtest@example.com", username="loadtest", password=None
+            )
+        call_command("populate", users=n_users, stdout=self.stdout)
+
+    def _start_server(self, url, port):
+        server = subprocess.Popen(  # nosec
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                *GUNICORN_ARGS,
+                "--bind=127.0.0.1:{}".format(port),
+                "eventos2.wsgi",
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "REDIS_URL": settings.REDIS_URL},
+        )
+        parts = urlsplit(url)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        last_status = None
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("The server exited while starting.")
+            try:
+                connection = http.client.HTTPConnection(parts.hostname, parts.port)
+                connection.request("GET", API_PREFIX + "/health_check")
+                last_status = connection.getresponse().status
+                connection.close()
+                if last_status == 200:
+                    return server
+            except OSError:
+                pass
+            time.sleep(0.2)
+        server.terminate()
+        raise CommandError(
+            "The server didn't start in time (last health check status: {}).".format(
+                last_status or "no response"
+            )
+        )
+
+    @staticmethod
+    def _run(url, event, activity, users, concurrency, duration):
+        # Each worker has its own users, so that no registration
+        # is attempted twice at the same time.
+        samples = []
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(
+                    run_registration_rush,
+                    url,
+                    event,
+                    activity,
+                    users[i::concurrency],
+                    started + duration,
+                    samples,
+                )
+                for i in range(concurrency)
+            ]
+            for future in futures:
+                future.result()
+        return samples, time.monotonic() - started
+
+    def _print_report(self, report, concurrency, duration):
+        self.stdout.write(
+            "{} concurrent users, for {:.1f}s:".format(concurrency, duration)
+        )
+        self.stdout.write(
+            "{:<40} {:>9} {:>8} {:>9} {:>8} {:>8} {:>8}".format(
+                "endpoint", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms"
+            )
+        )
+        for endpoint, stats in report.items():
+            self.stdout.write(
+                "{:<40} {:>9} {:>7.1%} {:>9.1f} {:>8.1f} {:>8.1f} {:>8.1f}".format(
+                    endpoint,
+                    stats["requests"],
+                    stats["error_rate"],
+                    stats["throughput"],
+                    stats["p50"],
+                    stats["p95"],
+                    stats["p99"],
+                )
+            )
@@ -1,172 +1,372 @@
 import random
 from datetime import timedelta
+from itertools import islice
 
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.utils import timezone
 
 from eventos2.core.models import (
     Activity,
+    ActivityOwnership,
     ActivityRegistration,
     Event,
+    EventOwnership,
     EventRegistration,
+    Review,
+    ReviewAnswer,
     Submission,
+    SubmissionAuthorship,
+    SubmissionDocument,
     Track,
+    TrackReviewQuestion,
     TrackSubmissionDocumentSlot,
     User,
 )
+from eventos2.media.models import Document
+
+ANSWERS = {
+    TrackReviewQuestion.AnswerType.YES_NO: ["yes", "no"],
+    TrackReviewQuestion.AnswerType.GRADE_ZERO_TO_TEN: [str(x) for x in range(11)],
+    TrackReviewQuestion.AnswerType.TEXT: ["Bom trabalho.", "Precisa de revisão."],
+}
 
 
 class Command(BaseCommand):
     help = "Creates example data"
 
-    def handle(self, *args, **options):
-        n_users = 9
-        n_activities = 9
-        n_tracks = 9
-        n_min_slots_per_track = 1
-        n_max_slots_per_track = 3
-        n_min_authors_per_submission = 1
-        n_max_authors_per_submission = 3
-        n_registered_users = int(n_users * 0.5)
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=9)
+        parser.add_argument("--events", type=int, default=1)
+        parser.add_argument("--activities-per-event", type=int, default=9)
+        parser.add_argument("--tracks-per-event", type=int, default=9)
+        parser.add_argument(
+            "--submissions", type=int, default=9, help="In total, for all the events"
+        )
+        parser.add_argument("--reviews-per-submission", type=int, default=1)
+        parser.add_argument(
+            "--registered-fraction",
+            type=float,
+            default=0.5,
+            help="The fraction of the users registered into each event",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="The same seed creates the same data"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--password",
+            default="user",
+            help="The password of all the users (hashed only once)",
+        )
 
+    def handle(self, *args, **options):
         superuser = User.objects.filter(is_superuser=True).first()
         if not superuser:
             raise CommandError(
                 "You must create a superuser before running this command."
             )
-
-        event = self._create_event()
-        event.owners.add(superuser)
-
-        users = [self._create_user(i + 1) for i in range(n_users)]
-        activities = [self._create_activity(event, i + 1) for i in range(n_activities)]
-
-        tracks = [self._create_track(event, i + 1) for i in range(n_tracks)]
-        for track in tracks:
-            n_slots = random.randrange(  # nosec
-                n_min_slots_per_track, n_max_slots_per_track + 1
+        if Event.objects.filter(slug="test").exists():
+            raise CommandError("The data has already been populated.")
+        # Each submission needs up to 3 authors, and reviewers besides them.
+        if options["users"] < options["reviews_per_submission"] + 3:
+            raise CommandError(
+                "There must be at least 3 more users than reviews per submission."
             )
-            [
-                self._create_track_submission_document_slot(track, i + 1)
-                for i in range(n_slots)
-            ]
 
-        track_authors_pairs = []
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
 
-        for _ in range(n_tracks):
-            track = random.choice(tracks)  # nosec
-            n_authors = random.randrange(  # nosec
-                n_min_authors_per_submission, n_max_authors_per_submission + 1
+        with transaction.atomic():
+            users = self._create_users(options["users"], options["password"])
+            events = self._create_events(options["events"], superuser, users)
+            for event in events:
+                activities = self._create_activities(
+                    event, options["activities_per_event"], users
+                )
+                self._create_registrations(
+                    event, activities, users, options["registered_fraction"]
+                )
+            tracks = self._create_tracks(events, options["tracks_per_event"])
+            submissions = self._create_submissions(
+                tracks, options["submissions"], users
             )
-            authors = random.sample(users, n_authors)
-            track_authors_pairs.append((track, authors))
+            self._create_documents(submissions)
+            self._create_reviews(submissions, options["reviews_per_submission"], users)
 
-        for track, authors in track_authors_pairs:
-            self._create_submission(track, authors)
-
-        event_registrations = [
-            self._create_event_registration(event, user)
-            for user in random.sample(users, n_registered_users)  # nosec
-        ]
+        self.stdout.write(self.style.SUCCESS("Successfully populated data."))
 
-        activity_registration_pairs = set(
-            (random.choice(activities), random.choice(event_registrations))  # nosec
-            for _ in range(n_users * n_activities)
-        )
-        for activity, event_registration in activity_registration_pairs:
-            self._create_activity_registration(activity, event_registration)
+    def _bulk_create(self, model, objects):
+        """
+        Creates the objects (from an iterable) in batches,
+        returning the instances, with their primary keys.
+        """
+        objects = iter(objects)
+        created = []
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            created.extend(model.objects.bulk_create(batch))
+        self.stdout.write("Created {} {} rows.".format(len(created), model.__name__))
+        return created
 
-        self.stdout.write(self.style.SUCCESS("Successfully populated data."))
+    def _token(self):
+        return "{:032x}".format(self.rng.getrandbits(128))
 
-    @staticmethod
-    def _create_event():
-        starts_on = timezone.now()
-        ends_on = starts_on + timedelta(days=2)
-        return Event.objects.create(
-            name="Teste",
-            name_english="Test",
-            slug="test",
-            starts_on=starts_on,
-            ends_on=ends_on,
-        )
-
-    @staticmethod
-    def _create_user(n):
-        email = "user{}@example.com".format(n)
-        user = User.objects.create(
-            email=email, username=email, first_name="User", last_name=str(n)
-        )
-        user.set_password("user{}".format(n))
-        user.save()
-        return user
-
-    @staticmethod
-    def _create_activity(event, n):
-        starts_on = event.starts_on
-        ends_on = event.ends_on
-        if n % 2 == 0:
-            starts_on += timedelta(days=1)
-        elif n % 3 == 0:
-            ends_on = starts_on + timedelta(minutes=5)
-        return Activity.objects.create(
-            event=event,
-            name="Atividade {}".format(n),
-            name_english="Activity {}".format(n),
-            starts_on=starts_on,
-            ends_on=ends_on,
-        )
-
-    @staticmethod
-    def _create_track(event, n):
-        starts_on = event.starts_on
-        ends_on = event.ends_on
+    def _dates(self, n, starts_on, ends_on):
         if n % 2 == 0:
             starts_on += timedelta(days=1)
         elif n % 3 == 0:
             ends_on = starts_on + timedelta(minutes=5)
-        return Track.objects.create(
-            event=event,
-            name="Track {}".format(n),
-            name_english="Track {}".format(n),
-            starts_on=starts_on,
-            ends_on=ends_on,
-        )
-
-    @staticmethod
-    def _create_track_submission_document_slot(track, n):
-        starts_on = track.starts_on
-        ends_on = track.ends_on
-        if n % 2 == 0:
-            starts_on += timedelta(days=1)
-        elif n % 3 == 0:
-            ends_on = starts_on + timedelta(minutes=5)
-        return TrackSubmissionDocumentSlot.objects.create(
-            track=track,
-            name="Slot {}".format(n),
-            name_english="Slot {}".format(n),
-            starts_on=starts_on,
-            ends_on=ends_on,
+        return starts_on, ends_on
+
+    def _create_users(self, n_users, password):
+        # Hashing is slow on purpose, so it's done once for all the users.
+        password_hash = make_password(password)
+        return [
+            user.pk
+            for user in self._bulk_create(
+                User,
+                (
+                    User(
+                        email="user{}@example.com".format(n),
+                        username="user{}@example.com".format(n),
+                        first_name="User",
+                        last_name=str(n),
+                        password=password_hash,
+                        public_id=self._token(),
+                    )
+                    for n in range(1, n_users + 1)
+                ),
+            )
+        ]
+
+    def _create_events(self, n_events, superuser, users):
+        events = self._bulk_create(
+            Event,
+            (
+                Event(
+                    name="Teste" if n == 1 else "Teste {}".format(n),
+                    name_english="Test" if n == 1 else "Test {}".format(n),
+                    slug="test" if n == 1 else "test-{}".format(n),
+                    starts_on=self.now,
+                    ends_on=self.now + timedelta(days=2),
+                )
+                for n in range(1, n_events + 1)
+            ),
+        )
+        self._bulk_create(
+            EventOwnership,
+            (
+                EventOwnership(event=event, user_id=user_id)
+                for event in events
+                for user_id in {superuser.pk, self.rng.choice(users)}
+            ),
+        )
+        return events
+
+    def _create_activities(self, event, n_activities, users):
+        activities = self._bulk_create(
+            Activity,
+            (
+                Activity(
+                    event=event,
+                    name="Atividade {}".format(n),
+                    name_english="Activity {}".format(n),
+                    starts_on=starts_on,
+                    ends_on=ends_on,
+                )
+                for n in range(1, n_activities + 1)
+                for starts_on, ends_on in [
+                    self._dates(n, event.starts_on, event.ends_on)
+                ]
+            ),
+        )
+        self._bulk_create(
+            ActivityOwnership,
+            (
+                ActivityOwnership(activity=activity, user_id=self.rng.choice(users))
+                for activity in activities
+            ),
+        )
+        return activities
+
+    def _create_registrations(self, event, activities, users, registered_fraction):
+        n_registered = int(len(users) * registered_fraction)
+        event_registrations = self._bulk_create(
+            EventRegistration,
+            (
+                EventRegistration(event=event, user_id=users[i])
+                for i in self.rng.sample(range(len(users)), n_registered)
+            ),
+        )
+        self._bulk_create(
+            ActivityRegistration,
+            (
+                ActivityRegistration(
+                    activity=activity, event_registration=event_registration
+                )
+                for event_registration in event_registrations
+                for activity in self.rng.sample(
+                    activities, self.rng.randint(0, min(3, len(activities)))
+                )
+            ),
         )
 
-    @staticmethod
-    def _create_submission(track, authors):
-        author_str = ", ".join(
-            "{} {}".format(x.first_name, x.last_name) for x in authors
+    def _create_tracks(self, events, n_tracks):
+        tracks = self._bulk_create(
+            Track,
+            (
+                Track(
+                    event=event,
+                    name="Track {}".format(n),
+                    name_english="Track {}".format(n),
+                    starts_on=starts_on,
+                    ends_on=ends_on,
+                )
+                for event in events
+                for n in range(1, n_tracks + 1)
+                for starts_on, ends_on in [
+                    self._dates(n, event.starts_on, event.ends_on)
+                ]
+            ),
         )
-        submission = Submission.objects.create(
-            track=track,
-            title="Trabalho por {}".format(author_str),
-            title_english="Submission by {}".format(author_str),
+        slots = self._bulk_create(
+            TrackSubmissionDocumentSlot,
+            (
+                TrackSubmissionDocumentSlot(
+                    track=track,
+                    name="Slot {}".format(n),
+                    name_english="Slot {}".format(n),
+                    starts_on=starts_on,
+                    ends_on=ends_on,
+                )
+                for track in tracks
+                for n in range(1, self.rng.randint(1, 3) + 1)
+                for starts_on, ends_on in [
+                    self._dates(n, track.starts_on, track.ends_on)
+                ]
+            ),
         )
-        submission.authors.add(*authors)
-        return submission
+        questions = self._bulk_create(
+            TrackReviewQuestion,
+            (
+                TrackReviewQuestion(
+                    track=track,
+                    text="Pergunta {}".format(n),
+                    answer_type=self.rng.choice(TrackReviewQuestion.AnswerType.values),
+                )
+                for track in tracks
+                for n in range(1, self.rng.randint(1, 3) + 1)
+            ),
+        )
+        # Kept with the tracks, for the documents and answers.
+        for track in tracks:
+            track.populated_slots = []
+            track.populated_questions = []
+        tracks_by_id = {track.pk: track for track in tracks}
+        for slot in slots:
+            tracks_by_id[slot.track_id].populated_slots.append(slot)
+        for question in questions:
+            tracks_by_id[question.track_id].populated_questions.append(question)
+        return tracks
+
+    def _create_submissions(self, tracks, n_submissions, users):
+        if not tracks:
+            return []
+        submissions = self._bulk_create(
+            Submission,
+            (
+                Submission(
+                    track=self.rng.choice(tracks),
+                    title="Trabalho {}".format(n),
+                    title_english="Submission {}".format(n),
+                )
+                for n in range(1, n_submissions + 1)
+            ),
+        )
+        for submission in submissions:
+            submission.populated_author_ids = [
+                users[i]
+                for i in self.rng.sample(range(len(users)), self.rng.randint(1, 3))
+            ]
+        self._bulk_create(
+            SubmissionAuthorship,
+            (
+                SubmissionAuthorship(submission=submission, user_id=user_id)
+                for submission in submissions
+                for user_id in submission.populated_author_ids
+            ),
+        )
+        return submissions
 
-    @staticmethod
-    def _create_event_registration(event, user):
-        return EventRegistration.objects.create(event=event, user=user)
+    def _create_documents(self, submissions):
+        # Half of the slots of each submission have a document,
+        # whose file doesn't exist.
+        pairs = [
+            (submission, slot)
+            for submission in submissions
+            for slot in submission.track.populated_slots
+            if self.rng.random() < 0.5
+        ]
+        documents = self._bulk_create(
+            Document,
+            (
+                Document(
+                    file="documents/populated-{}.pdf".format(n),
+                    content_type="application/pdf",
+                    attachment_key=self._token(),
+                    public_id=self._token(),
+                )
+                for n in range(len(pairs))
+            ),
+        )
+        self._bulk_create(
+            SubmissionDocument,
+            (
+                SubmissionDocument(slot=slot, submission=submission, document=document)
+                for (submission, slot), document in zip(pairs, documents)
+            ),
+        )
 
-    @staticmethod
-    def _create_activity_registration(activity, event_registration):
-        return ActivityRegistration.objects.create(
-            activity=activity, event_registration=event_registration
+    def _create_reviews(self, submissions, n_reviews, users):
+        def get_reviewer_ids(submission):
+            candidates = self.rng.sample(range(len(users)), n_reviews + 3)
+            reviewer_ids = [
+                users[i]
+                for i in candidates
+                if users[i] not in submission.populated_author_ids
+            ]
+            return reviewer_ids[:n_reviews]
+
+        reviews = self._bulk_create(
+            Review,
+            (
+                Review(submission=submission, author_id=author_id)
+                for submission in submissions
+                for author_id in get_reviewer_ids(submission)
+            ),
+        )
+        # Half of the reviews are answered.
+        completed = [review for review in reviews if self.rng.random() < 0.5]
+        self._bulk_create(
+            ReviewAnswer,
+            (
+                ReviewAnswer(
+                    review=review,
+                    question=question,
+                    text=self.rng.choice(ANSWERS[question.answer_type]),
+                )
+                for review in completed
+                for question in review.submission.track.populated_questions
+            ),
         )
+        completed_ids = iter([review.pk for review in completed])
+        while True:
+            batch = list(islice(completed_ids, self.batch_size))
+            if not batch:
+                break
+            Review.objects.filter(pk__in=batch).update(completed_on=self.now)
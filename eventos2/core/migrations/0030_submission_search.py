@@ -0,0 +1,96 @@
+# Generated by Django 4.0 on 2026-10-18 15:11
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+import eventos2.utils.search
+
+# `unaccent` is only STABLE, so it can't be used in index expressions.
+# Pinning the dictionary makes this wrapper safe to declare as IMMUTABLE.
+CREATE_IMMUTABLE_UNACCENT = """
+CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+"""
+
+DROP_IMMUTABLE_UNACCENT = "DROP FUNCTION IF EXISTS immutable_unaccent(text);"
+
+# A trigger (instead of Model.save) also covers bulk_create and update().
+CREATE_SEARCH_VECTOR_TRIGGER = """
+CREATE OR REPLACE FUNCTION core_submission_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(
+            to_tsvector('simple', immutable_unaccent(coalesce(NEW.title, ''))), 'A'
+        ) ||
+        setweight(
+            to_tsvector('simple', immutable_unaccent(coalesce(NEW.title_english, ''))),
+            'B'
+        );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_submission_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, title_english ON core_submission
+    FOR EACH ROW EXECUTE PROCEDURE core_submission_search_vector_update();
+
+UPDATE core_submission SET title = title;
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS core_submission_search_vector_trigger ON core_submission;
+DROP FUNCTION IF EXISTS core_submission_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0029_export"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(CREATE_IMMUTABLE_UNACCENT, DROP_IMMUTABLE_UNACCENT),
+        migrations.AddField(
+            model_name="submission",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text="Unaccented title and english title. "
+                "Kept up to date by a trigger.",
+                null=True,
+            ),
+        ),
+        migrations.RunSQL(CREATE_SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+        migrations.AddIndex(
+            model_name="submission",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="submission_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    eventos2.utils.search.ImmutableUnaccent("title"),
+                    name="gin_trgm_ops",
+                ),
+                name="submission_title_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    eventos2.utils.search.ImmutableUnaccent("title_english"),
+                    name="gin_trgm_ops",
+                ),
+                name="submission_title_en_trgm_idx",
+            ),
+        ),
+    ]
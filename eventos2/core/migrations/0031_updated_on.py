@@ -0,0 +1,28 @@
+# Generated by Django 4.0 on 2026-10-18 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0030_submission_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activity",
+            name="updated_on",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="updated_on",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="track",
+            name="updated_on",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.0
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0031_updated_on"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityWaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="activity",
+            name="capacity",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="How many users can register, or empty for no limit",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="activity",
+            name="remaining_seats",
+            field=models.IntegerField(
+                editable=False, help_text="Updated through ActivityQuerySet", null=True
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="activity",
+            constraint=models.CheckConstraint(
+                check=models.Q(("remaining_seats__gte", 0)),
+                name="activity_remaining_seats_gte_0",
+            ),
+        ),
+        migrations.AddField(
+            model_name="activitywaitlistentry",
+            name="activity",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="waitlist_entries",
+                to="core.activity",
+            ),
+        ),
+        migrations.AddField(
+            model_name="activitywaitlistentry",
+            name="event_registration",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="activity_waitlist_entries",
+                to="core.eventregistration",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="activitywaitlistentry",
+            constraint=models.UniqueConstraint(
+                fields=("activity", "event_registration"),
+                name="unique_activity_waitlist_entry",
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.0
+
+import secrets
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0032_activity_capacity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegistrationImport",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "public_id",
+                    models.CharField(
+                        default=secrets.token_urlsafe,
+                        help_text="Random sequence to be used as a public identifier.",
+                        max_length=255,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "identifiers",
+                    models.JSONField(
+                        help_text="The emails or public IDs of the users to register, in order."
+                    ),
+                ),
+                (
+                    "results",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="The result (see `Result`) for each of the identifiers.",
+                    ),
+                ),
+                ("requested_on", models.DateTimeField(auto_now_add=True)),
+                ("finished_on", models.DateTimeField(blank=True, null=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="registration_imports",
+                        to="core.event",
+                    ),
+                ),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="registration_imports",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
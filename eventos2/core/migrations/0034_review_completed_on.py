@@ -0,0 +1,39 @@
+# Generated by Django 4.0
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+
+def backfill_completed_on(apps, schema_editor):
+    Review = apps.get_model("core", "Review")
+    ReviewAnswer = apps.get_model("core", "ReviewAnswer")
+    # When the answers were written wasn't recorded,
+    # so the reviews already answered are completed now.
+    Review.objects.filter(
+        Exists(ReviewAnswer.objects.filter(review=OuterRef("pk")))
+    ).update(completed_on=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0033_registration_import"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="completed_on",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                condition=models.Q(("completed_on__isnull", True)),
+                fields=["author"],
+                name="pending_review_author_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_completed_on, migrations.RunPython.noop),
+    ]
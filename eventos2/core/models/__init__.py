@@ -1,5 +1,7 @@
 from eventos2.core.models.activity import *
 from eventos2.core.models.event import *
+from eventos2.core.models.export import *
+from eventos2.core.models.registration_import import *
 from eventos2.core.models.review import *
 from eventos2.core.models.submission import *
 from eventos2.core.models.track import *
@@ -1,9 +1,56 @@
 from django.db import models
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.utils import timezone
 
 from eventos2.core.models.event import Event, EventRegistration
-from eventos2.core.models.soft_deletion import SoftDeletableModel
+from eventos2.core.models.soft_deletion import SoftDeletableModel, SoftDeletableQuerySet
 from eventos2.core.models.user import User
+from eventos2.utils.conditional import subquery_aggregate
+
+
+class ActivityQuerySet(SoftDeletableQuerySet):
+    """
+    The seats of activities with a capacity are counted by `remaining_seats`,
+    which is updated atomically, so that concurrent registrations
+    never take more seats than there are.
+    """
+
+    def take_seat(self, skip_waitlist=False):
+        """
+        Takes a seat of the activity, if there's one left.
+        Returns whether there was. Activities without a capacity
+        have no seats to take.
+
+        Unless `skip_waitlist`, the seats are kept for the waitlist
+        while there's someone on it.
+        """
+        queryset = self.filter(remaining_seats__gt=0)
+        if not skip_waitlist:
+            queryset = queryset.exclude(
+                Exists(ActivityWaitlistEntry.objects.filter(activity=OuterRef("pk")))
+            )
+        return queryset.update(remaining_seats=F("remaining_seats") - 1) > 0
+
+    def release_seat(self):
+        return self.filter(remaining_seats__isnull=False).update(
+            remaining_seats=Least(F("remaining_seats") + 1, F("capacity"))
+        )
+
+    def reconcile_seats(self):
+        """
+        Recounts the remaining seats from the registrations, e.g. when the
+        capacity changes, or registrations were changed without taking or
+        releasing seats.
+        """
+        registration_count = subquery_aggregate(
+            ActivityRegistration.objects.filter(activity=OuterRef("pk")),
+            Count("pk"),
+        )
+        self.filter(capacity__isnull=True).update(remaining_seats=None)
+        return self.filter(capacity__isnull=False).update(
+            remaining_seats=Greatest(F("capacity") - Coalesce(registration_count, 0), 0)
+        )
 
 
 class Activity(SoftDeletableModel):
@@ -18,11 +65,34 @@ class Activity(SoftDeletableModel):
     )
     starts_on = models.DateTimeField()
     ends_on = models.DateTimeField()
+    updated_on = models.DateTimeField(auto_now=True)
+    capacity = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="How many users can register, or empty for no limit",
+    )
+    remaining_seats = models.IntegerField(
+        null=True, editable=False, help_text="Updated through ActivityQuerySet"
+    )
 
     owners = models.ManyToManyField(
         User, through="ActivityOwnership", related_name="activities_owned"
     )
 
+    objects = ActivityQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # The remaining seats are only changed through ActivityQuerySet, so
+        # saving (or soft-deleting) an activity doesn't overwrite the seats
+        # taken or released since it was read.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "remaining_seats"
+            ]
+        super().save(*args, **kwargs)
+
     def is_open_on(self, date):
         return self.starts_on <= date <= self.ends_on
 
@@ -31,6 +101,11 @@ class Activity(SoftDeletableModel):
         return self.is_open_on(timezone.now())
 
     class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=Q(remaining_seats__gte=0), name="activity_remaining_seats_gte_0"
+            )
+        ]
         permissions = [
             ("register_self_into_activity", "Can self-register into an activity"),
             (
@@ -66,3 +141,28 @@ class ActivityRegistration(models.Model):
                 name="unique_activity_registration",
             )
         ]
+
+
+class ActivityWaitlistEntry(models.Model):
+    """
+    A user waiting for a seat in a full activity.
+    The entries are promoted in order (by `id`) as seats are released.
+    """
+
+    activity = models.ForeignKey(
+        Activity, on_delete=models.PROTECT, related_name="waitlist_entries"
+    )
+    event_registration = models.ForeignKey(
+        EventRegistration,
+        on_delete=models.PROTECT,
+        related_name="activity_waitlist_entries",
+    )
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["activity", "event_registration"],
+                name="unique_activity_waitlist_entry",
+            )
+        ]
@@ -21,6 +21,7 @@ class Event(SoftDeletableModel):
     logo = models.ForeignKey(
         Image, on_delete=models.CASCADE, related_name="+", blank=True, null=True
     )
+    updated_on = models.DateTimeField(auto_now=True)
     owners = models.ManyToManyField(
         User, through="EventOwnership", related_name="events_owned"
     )
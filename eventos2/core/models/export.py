@@ -0,0 +1,68 @@
+from secrets import token_urlsafe
+
+from django.db import models
+
+from eventos2.core.models.activity import Activity
+from eventos2.core.models.event import Event
+from eventos2.core.models.user import User
+
+
+class Export(models.Model):
+    class Kind(models.TextChoices):
+        EVENT_REGISTRATIONS = "event_registrations"
+        ACTIVITY_REGISTRATIONS = "activity_registrations"
+
+    class FileFormat(models.TextChoices):
+        CSV = "csv"
+        XLSX = "xlsx"
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    public_id = models.CharField(
+        max_length=255,
+        default=token_urlsafe,
+        unique=True,
+        help_text="Random sequence to be used as a public identifier.",
+    )
+    kind = models.CharField(max_length=255, choices=Kind.choices)
+    file_format = models.CharField(max_length=255, choices=FileFormat.choices)
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name="exports")
+    activity = models.ForeignKey(
+        Activity,
+        on_delete=models.PROTECT,
+        related_name="exports",
+        blank=True,
+        null=True,
+        help_text="Limits an activity registrations export to a single activity.",
+    )
+    requested_by = models.ForeignKey(
+        User, on_delete=models.PROTECT, related_name="exports"
+    )
+    status = models.CharField(
+        max_length=255, choices=Status.choices, default=Status.PENDING
+    )
+    row_count = models.PositiveIntegerField(
+        default=0, help_text="How many rows have been written so far."
+    )
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    file = models.FileField(upload_to="exports/", blank=True)
+    requested_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def progress(self):
+        if self.status == self.Status.DONE:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return self.row_count / self.total_rows
+
+    @property
+    def url(self):
+        if self.status != self.Status.DONE:
+            return None
+        return self.file.url
@@ -0,0 +1,65 @@
+from collections import Counter
+from secrets import token_urlsafe
+
+from django.db import models
+
+from eventos2.core.models.event import Event
+from eventos2.core.models.user import User
+
+
+class RegistrationImport(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    class Result(models.TextChoices):
+        CREATED = "created"
+        ALREADY_REGISTERED = "already_registered"
+        DUPLICATE = "duplicate"
+        NOT_FOUND = "not_found"
+
+    public_id = models.CharField(
+        max_length=255,
+        default=token_urlsafe,
+        unique=True,
+        help_text="Random sequence to be used as a public identifier.",
+    )
+    event = models.ForeignKey(
+        Event, on_delete=models.PROTECT, related_name="registration_imports"
+    )
+    requested_by = models.ForeignKey(
+        User, on_delete=models.PROTECT, related_name="registration_imports"
+    )
+    status = models.CharField(
+        max_length=255, choices=Status.choices, default=Status.PENDING
+    )
+    identifiers = models.JSONField(
+        help_text="The emails or public IDs of the users to register, in order."
+    )
+    results = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="The result (see `Result`) for each of the identifiers.",
+    )
+    requested_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def total_rows(self):
+        return len(self.identifiers)
+
+    @property
+    def summary(self):
+        counts = Counter(self.results)
+        return {result: counts[result] for result in self.Result.values}
+
+    @property
+    def rows(self):
+        return [
+            {"row": row, "identifier": identifier, "result": result}
+            for row, (identifier, result) in enumerate(
+                zip(self.identifiers, self.results), start=1
+            )
+        ]
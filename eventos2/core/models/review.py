@@ -1,19 +1,32 @@
 from django.db import models
+from django.db.models import Q
 
 from eventos2.core.models.submission import Submission
 from eventos2.core.models.track import TrackReviewQuestion
 from eventos2.core.models.user import User
 
 
+class ReviewQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(completed_on__isnull=True)
+
+    def completed(self):
+        return self.filter(completed_on__isnull=False)
+
+
 class Review(models.Model):
     submission = models.ForeignKey(
         Submission, on_delete=models.PROTECT, related_name="reviews"
     )
     author = models.ForeignKey(User, on_delete=models.PROTECT, related_name="reviews")
+    # Set when the answers are written, in the same transaction.
+    completed_on = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ReviewQuerySet.as_manager()
 
     @property
     def is_pending(self):
-        return self.answers.count() == 0
+        return self.completed_on is None
 
     class Meta:
         constraints = [
@@ -21,6 +34,14 @@ class Review(models.Model):
                 fields=["submission", "author"], name="unique_review"
             )
         ]
+        indexes = [
+            # For the pending reviews of each author (their inbox).
+            models.Index(
+                fields=["author"],
+                condition=Q(completed_on__isnull=True),
+                name="pending_review_author_idx",
+            )
+        ]
 
 
 class ReviewAnswer(models.Model):
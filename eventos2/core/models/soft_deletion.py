@@ -3,12 +3,21 @@ from django.utils import timezone
 
 
 class SoftDeletableQuerySet(models.QuerySet):
+    def _auto_now_values(self):
+        # update() doesn't touch auto_now fields (such as `updated_on`)
+        now = timezone.now()
+        return {
+            field.name: now
+            for field in self.model._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        }
+
     def delete(self):
-        count = self.update(deleted_on=timezone.now())
+        count = self.update(deleted_on=timezone.now(), **self._auto_now_values())
         return count, {self.model._meta.label: count}
 
     def undelete(self) -> int:
-        return self.update(deleted_on=None)
+        return self.update(deleted_on=None, **self._auto_now_values())
 
     def hard_delete(self):
         return super().delete()
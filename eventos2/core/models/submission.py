@@ -1,9 +1,12 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from eventos2.core.models.soft_deletion import SoftDeletableModel
 from eventos2.core.models.track import Track, TrackSubmissionDocumentSlot
 from eventos2.core.models.user import User
 from eventos2.media.models import Document
+from eventos2.utils.search import ImmutableUnaccent
 
 
 class Submission(SoftDeletableModel):
@@ -19,6 +22,11 @@ class Submission(SoftDeletableModel):
     authors = models.ManyToManyField(
         User, through="SubmissionAuthorship", related_name="submissions_authored"
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Unaccented title and english title. Kept up to date by a trigger.",
+    )
 
     @property
     def event(self):  # pragma: no cover - no complexity
@@ -28,6 +36,17 @@ class Submission(SoftDeletableModel):
         permissions = [
             ("add_review_to_submission", "Can add a review to a submission"),
         ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="submission_search_idx"),
+            GinIndex(
+                OpClass(ImmutableUnaccent("title"), name="gin_trgm_ops"),
+                name="submission_title_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(ImmutableUnaccent("title_english"), name="gin_trgm_ops"),
+                name="submission_title_en_trgm_idx",
+            ),
+        ]
 
 
 class SubmissionAuthorship(models.Model):
@@ -15,6 +15,7 @@ class Track(SoftDeletableModel):
     )
     starts_on = models.DateTimeField()
     ends_on = models.DateTimeField()
+    updated_on = models.DateTimeField(auto_now=True)
 
     def is_open_on(self, date):
         return self.starts_on <= date <= self.ends_on
@@ -1,34 +1,74 @@
-import rules
+from django.db.models import Q
 
+from eventos2.core.models import Activity, Event, Review, Submission
+from eventos2.core.roles import get_role_index
+from eventos2.utils.memoization import memoize_per_request
+from eventos2.utils.predicates import (
+    NOTHING,
+    filterable_predicate,
+    get_lookup_path,
+    join_lookup,
+)
 
-@rules.predicate
+
+def get_event_id(obj):
+    if isinstance(obj, Event):
+        return obj.pk
+    # avoid loading the event, when the object has a foreign key to it
+    if hasattr(obj, "event_id"):
+        return obj.event_id
+    return obj.event.pk
+
+
+def has_role_in(role, target):
+    """
+    Compiles a role check into a `Q` object: the objects related to
+    one of the `target` objects in which the user has the role.
+    """
+
+    def to_q(user, model):
+        path = join_lookup(get_lookup_path(model, target), "pk")
+        return Q(**{"{}__in".format(path): getattr(get_role_index(user), role)})
+
+    return to_q
+
+
+def is_review_author_q(user, model):
+    if not user.is_authenticated:
+        return NOTHING
+    return Q(**{join_lookup(get_lookup_path(model, Review), "author"): user})
+
+
+@filterable_predicate(to_q=has_role_in("owned_events", Event))
+@memoize_per_request
 def is_event_owner(user, obj):
-    event = getattr(obj, "event", obj)
-    return event and event.owners.filter(pk=user.pk).exists()
+    return obj and get_event_id(obj) in get_role_index(user).owned_events
 
 
-@rules.predicate
+@filterable_predicate(to_q=has_role_in("owned_activities", Activity))
+@memoize_per_request
 def is_activity_owner(user, obj):
-    activity = getattr(obj, "activity", obj)
-    return activity and activity.owners.filter(pk=user.pk).exists()
+    activity_id = getattr(obj, "activity_id", getattr(obj, "pk", None))
+    return obj and activity_id in get_role_index(user).owned_activities
 
 
-@rules.predicate
+@filterable_predicate(to_q=is_review_author_q)
 def is_review_author(user, obj):
     return obj and obj.author == user
 
 
-@rules.predicate
+@filterable_predicate(to_q=has_role_in("authored_submissions", Submission))
+@memoize_per_request
 def is_submission_author(user, obj):
-    submission = getattr(obj, "submission", obj)
-    return submission and submission.authors.filter(pk=user.pk).exists()
+    submission_id = getattr(obj, "submission_id", getattr(obj, "pk", None))
+    return obj and submission_id in get_role_index(user).authored_submissions
 
 
-@rules.predicate
+@filterable_predicate(to_q=has_role_in("registered_events", Event))
+@memoize_per_request
 def is_registered_to_event(user, obj):
-    event = getattr(obj, "event", obj)
     return (
         user.is_authenticated
-        and event
-        and event.registrations.filter(user=user).exists()
+        and obj
+        and get_event_id(obj) in get_role_index(user).registered_events
     )
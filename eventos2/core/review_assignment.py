@@ -0,0 +1,101 @@
+from collections import Counter, defaultdict
+from heapq import heapify, heappop, heappush
+
+from eventos2.core.coauthorship import CONFLICT_OF_INTEREST_HOPS, get_coauthorship_graph
+from eventos2.core.models import Review, SubmissionAuthorship
+
+
+def balance_assignment(submissions, reviewers, loads=None):
+    """
+    Assigns reviewers to submissions, keeping the number of reviews
+    of each reviewer as even as possible.
+
+    `submissions` maps each submission ID to a `(needed, excluded)` pair:
+    how many reviewers it still needs, and the IDs of the users that can't
+    review it. `loads` maps reviewer IDs to the reviews they already have.
+
+    Each submission takes the least loaded reviewers that aren't excluded,
+    from a heap, so the assignment takes `O(S * N * log R)` time.
+    The most constrained submissions are assigned first.
+
+    Returns the `(submission_id, reviewer_id)` pairs.
+    """
+    loads = loads or {}
+    # The position in the pool breaks ties, so the assignment is deterministic.
+    heap = [(loads.get(x, 0), i, x) for i, x in enumerate(reviewers)]
+    heapify(heap)
+
+    pairs = []
+    order = sorted(submissions, key=lambda x: (-len(submissions[x][1]), x))
+    for submission_id in order:
+        needed, excluded = submissions[submission_id]
+        chosen = []
+        skipped = []
+        while heap and len(chosen) < needed:
+            entry = heappop(heap)
+            (skipped if entry[2] in excluded else chosen).append(entry)
+        for load, position, reviewer_id in chosen:
+            pairs.append((submission_id, reviewer_id))
+            heappush(heap, (load + 1, position, reviewer_id))
+        for entry in skipped:
+            heappush(heap, entry)
+    return pairs
+
+
+def plan_review_assignment(submissions, reviewers, per_submission):
+    """
+    Plans the reviews needed for each of the submissions (a queryset)
+    to have `per_submission` reviewers from the pool (a list of user IDs),
+    without assigning to a submission its authors, or their co-authors
+    (see `CONFLICT_OF_INTEREST_HOPS`).
+
+    The current reviews count towards the reviewers of each submission
+    and the load of each reviewer. Takes three queries.
+
+    Returns the (unsaved) reviews, and the IDs of the submissions
+    which couldn't get enough reviewers from the pool.
+    """
+    authors = defaultdict(set)
+    for submission_id, user_id in SubmissionAuthorship.objects.filter(
+        submission__in=submissions
+    ).values_list("submission_id", "user_id"):
+        authors[submission_id].add(user_id)
+
+    pool = set(reviewers)
+    graph = get_coauthorship_graph()
+    excluded = defaultdict(set)
+    for submission_id, author_ids in authors.items():
+        # Only the reviewers of the pool, so the most constrained
+        # submissions are the ones with the fewest reviewers left.
+        excluded[submission_id] = (
+            graph.within_hops(author_ids, CONFLICT_OF_INTEREST_HOPS) & pool
+        ) | author_ids
+    reviewer_count = Counter()
+    loads = Counter()
+    for submission_id, author_id in Review.objects.filter(
+        submission__in=submissions
+    ).values_list("submission_id", "author_id"):
+        excluded[submission_id].add(author_id)
+        reviewer_count[submission_id] += 1
+        if author_id in pool:
+            loads[author_id] += 1
+
+    needed = {}
+    for submission_id in submissions.order_by().values_list("pk", flat=True):
+        missing = per_submission - reviewer_count[submission_id]
+        if missing > 0:
+            needed[submission_id] = (missing, excluded[submission_id])
+
+    pairs = balance_assignment(needed, reviewers, loads)
+
+    assigned = Counter(submission_id for submission_id, _ in pairs)
+    incomplete = sorted(
+        submission_id
+        for submission_id, (missing, _) in needed.items()
+        if assigned[submission_id] < missing
+    )
+    reviews = [
+        Review(submission_id=submission_id, author_id=reviewer_id)
+        for submission_id, reviewer_id in pairs
+    ]
+    return reviews, incomplete
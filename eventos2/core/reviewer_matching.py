@@ -0,0 +1,304 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from heapq import nlargest
+from operator import itemgetter
+
+from eventos2.core.coauthorship import CONFLICT_OF_INTEREST_HOPS, get_coauthorship_graph
+from eventos2.core.models import Review, Submission, SubmissionAuthorship
+from eventos2.utils.cache import (
+    bump_cache_version,
+    get_cache_version,
+    get_or_refill,
+    refill,
+)
+
+# The matching index, see `get_matching_index`. It's versioned,
+# and replaced by `refresh_matching_index`, so it doesn't expire.
+MATCHING_INDEX_CACHE = "reviewer-matching"
+# How many submissions are read from the database at a time.
+MATCHING_INDEX_CHUNK_SIZE = 2000
+# Only the reviewers with the largest weights for each term are compared
+# to the submissions, so common terms don't compare them to everyone.
+MATCHING_MAX_POSTINGS_PER_TERM = 100
+
+# The index of the current process, and the cache version it was loaded from.
+_local_index = (None, None)
+
+TOKEN_PATTERN = re.compile(r"[a-z]{3,}")
+STOP_WORDS = {
+    # Portuguese
+    "como",
+    "das",
+    "dos",
+    "entre",
+    "mais",
+    "nas",
+    "nos",
+    "para",
+    "pela",
+    "pelo",
+    "por",
+    "que",
+    "sem",
+    "sobre",
+    "uma",
+    # English
+    "and",
+    "are",
+    "for",
+    "from",
+    "its",
+    "into",
+    "the",
+    "with",
+}
+
+
+def tokenize(text):
+    """
+    Returns the terms of a text: its words, without accents or stop words.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = text.encode("ascii", "ignore").decode("ascii")
+    return [x for x in TOKEN_PATTERN.findall(text) if x not in STOP_WORDS]
+
+
+def normalize(vector):
+    norm = math.sqrt(sum(x * x for x in vector.values()))
+    if norm == 0:
+        return {}
+    return {term: weight / norm for term, weight in vector.items()}
+
+
+class MatchingIndex:
+    """
+    The term counts of each submission's titles, and of each reviewer's
+    profile: the titles of all the submissions they authored.
+
+    Adding or removing a submission only changes its own counts, and the
+    profiles of its authors. The submissions created after
+    `last_submission_id` are added by `update`, and the ones that changed
+    are updated by `refresh`.
+
+    The reviewers' (L2 normalized) TF-IDF vectors are kept in an inverted
+    index, `postings` (term -> `(reviewer_id, weight)` pairs), which is
+    recomputed by `update_postings` after the counts change, so suggesting
+    reviewers only weighs the terms of the submissions being matched.
+    """
+
+    def __init__(self):
+        self.last_submission_id = 0
+        self.submission_terms = {}
+        self.submission_authors = {}
+        self.reviewer_terms = defaultdict(Counter)
+        self.document_frequency = Counter()
+        self.idf = {}
+        self.postings = {}
+
+    def add_submission(self, submission_id, titles, author_ids):
+        terms = Counter(term for title in titles for term in tokenize(title))
+        self.submission_terms[submission_id] = terms
+        self.submission_authors[submission_id] = set(author_ids)
+        self.document_frequency.update(terms.keys())
+        for author_id in author_ids:
+            self.reviewer_terms[author_id].update(terms)
+        self.last_submission_id = max(self.last_submission_id, submission_id)
+
+    def remove_submission(self, submission_id):
+        terms = self.submission_terms.pop(submission_id, None)
+        if terms is None:
+            return
+        self.document_frequency.subtract(terms.keys())
+        for term in terms:
+            if not self.document_frequency[term]:
+                del self.document_frequency[term]
+        for author_id in self.submission_authors.pop(submission_id):
+            profile = self.reviewer_terms[author_id]
+            profile.subtract(terms)
+            # Without the terms that dropped to zero, and the empty profiles.
+            self.reviewer_terms[author_id] = +profile
+            if not self.reviewer_terms[author_id]:
+                del self.reviewer_terms[author_id]
+
+    def add_from_queryset(self, submissions):
+        """
+        Adds the submissions, reading them in chunks, two queries per chunk.
+        Returns whether there were any.
+        """
+        submissions = submissions.order_by("pk")
+        last_id = 0
+        while True:
+            chunk = list(
+                submissions.filter(pk__gt=last_id).values_list(
+                    "pk", "title", "title_english"
+                )[:MATCHING_INDEX_CHUNK_SIZE]
+            )
+            if not chunk:
+                return last_id != 0
+            authors = defaultdict(list)
+            for submission_id, user_id in SubmissionAuthorship.objects.filter(
+                submission_id__in=[x[0] for x in chunk]
+            ).values_list("submission_id", "user_id"):
+                authors[submission_id].append(user_id)
+            for submission_id, title, title_english in chunk:
+                self.add_submission(
+                    submission_id, [title, title_english], authors[submission_id]
+                )
+            last_id = chunk[-1][0]
+
+    def update(self):
+        """
+        Adds the submissions created since the index was last updated.
+        Returns whether there were any.
+        """
+        return self.add_from_queryset(
+            Submission.available_objects.filter(pk__gt=self.last_submission_id)
+        )
+
+    def refresh(self, submission_ids):
+        """
+        Reads the submissions again, e.g. after their titles or authors changed,
+        removing the ones that were deleted.
+        """
+        for submission_id in submission_ids:
+            self.remove_submission(submission_id)
+        self.add_from_queryset(
+            Submission.available_objects.filter(pk__in=submission_ids)
+        )
+
+    def get_idf(self):
+        """
+        Returns the inverse document frequency of each term, smoothed,
+        so terms in every submission still have some weight.
+        """
+        n = len(self.submission_terms)
+        return {
+            term: math.log((1 + n) / (1 + frequency)) + 1
+            for term, frequency in self.document_frequency.items()
+        }
+
+    def weigh(self, terms, idf):
+        """
+        Returns the (L2 normalized) TF-IDF vector of the term counts.
+        The terms without an IDF (in no submission) are left out.
+        """
+        return normalize(
+            {term: count * idf[term] for term, count in terms.items() if term in idf}
+        )
+
+    def update_postings(self):
+        """
+        Recomputes the IDF of the terms and the reviewer postings. The postings
+        are pruned to the largest weights (`MATCHING_MAX_POSTINGS_PER_TERM`),
+        so the scores of the reviewers that only share common terms
+        with a submission are approximate.
+        """
+        self.idf = self.get_idf()
+        postings = defaultdict(list)
+        for reviewer_id, terms in self.reviewer_terms.items():
+            for term, weight in self.weigh(terms, self.idf).items():
+                postings[term].append((reviewer_id, weight))
+        for term, entries in postings.items():
+            if len(entries) > MATCHING_MAX_POSTINGS_PER_TERM:
+                postings[term] = nlargest(
+                    MATCHING_MAX_POSTINGS_PER_TERM, entries, key=itemgetter(1)
+                )
+        self.postings = dict(postings)
+
+    def suggest_reviewers(self, submissions, k, excluded=None, unavailable=()):
+        """
+        Returns the `k` reviewers whose profiles are the most similar
+        (by cosine similarity) to each of the submissions (a dict of their IDs
+        to their titles), as a dict of submission IDs to lists
+        of `(reviewer_id, score)` pairs.
+
+        `excluded` maps submission IDs to the users that can't review them,
+        and the `unavailable` users aren't suggested for any submission.
+
+        Each submission is only compared to the reviewers in the postings
+        of its terms, like a sparse matrix product.
+        """
+        excluded = excluded or {}
+        suggestions = {}
+        for submission_id, titles in submissions.items():
+            terms = Counter(term for title in titles for term in tokenize(title))
+            scores = defaultdict(float)
+            for term, weight in self.weigh(terms, self.idf).items():
+                for reviewer_id, reviewer_weight in self.postings.get(term, ()):
+                    scores[reviewer_id] += weight * reviewer_weight
+            for user_id in (*excluded.get(submission_id, ()), *unavailable):
+                scores.pop(user_id, None)
+            top = nlargest(k, scores, key=scores.__getitem__)
+            suggestions[submission_id] = [(x, scores[x]) for x in top]
+        return suggestions
+
+
+def build_matching_index():
+    """
+    Builds the index from all the submissions.
+    """
+    index = MatchingIndex()
+    index.update()
+    index.update_postings()
+    return index
+
+
+def _get_cached_matching_index():
+    # Built by a single caller, if it isn't cached (e.g. evicted).
+    return get_or_refill(MATCHING_INDEX_CACHE, build_matching_index, timeout=None)
+
+
+def get_matching_index():
+    """
+    Returns the matching index. Each process keeps it in memory,
+    reloading it from the cache only when it's replaced
+    by `refresh_matching_index`, so it's only unpickled once per update.
+    """
+    global _local_index
+    version = get_cache_version(MATCHING_INDEX_CACHE)
+    local_version, index = _local_index
+    if local_version != version:
+        index = _get_cached_matching_index()
+        _local_index = (version, index)
+    return index
+
+
+def refresh_matching_index(submission_ids):
+    """
+    Replaces the cached index with one updated with the submissions that were
+    created, changed or deleted, and its postings recomputed.
+    Must not run concurrently (see `update_reviewer_matching`).
+    """
+    index = _get_cached_matching_index()
+    index.update()
+    index.refresh(submission_ids)
+    index.update_postings()
+    refill(MATCHING_INDEX_CACHE, index, timeout=None)
+    bump_cache_version(MATCHING_INDEX_CACHE)
+
+
+def get_excluded_reviewers(submissions):
+    """
+    Returns a dict from the IDs of the submissions to the users that can't be
+    suggested as their reviewers: their authors, the co-authors of their
+    authors (see `CONFLICT_OF_INTEREST_HOPS`) and their current reviewers.
+    """
+    authors = defaultdict(set)
+    for submission_id, user_id in SubmissionAuthorship.objects.filter(
+        submission__in=submissions
+    ).values_list("submission_id", "user_id"):
+        authors[submission_id].add(user_id)
+
+    graph = get_coauthorship_graph()
+    excluded = defaultdict(set)
+    for submission_id, author_ids in authors.items():
+        excluded[submission_id] = graph.within_hops(
+            author_ids, CONFLICT_OF_INTEREST_HOPS
+        )
+    for submission_id, user_id in Review.objects.filter(
+        submission__in=submissions
+    ).values_list("submission_id", "author_id"):
+        excluded[submission_id].add(user_id)
+    return excluded
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Value
+
+from eventos2.core.models import (
+    ActivityOwnership,
+    EventOwnership,
+    EventRegistration,
+    SubmissionAuthorship,
+)
+from eventos2.utils.cache import bump_cache_version, get_cache_version
+from eventos2.utils.memoization import memoize_per_request
+
+# The roles of a user, cached until they change (see `invalidate_role_index`).
+ROLE_INDEX_CACHE = "roles:{user_id}"
+ROLE_INDEX_CACHE_TIMEOUT = 60 * 60
+
+
+# The query for each role, returning the IDs of the objects.
+ROLE_QUERIES = {
+    "owned_events": (EventOwnership, "event_id"),
+    "registered_events": (EventRegistration, "event_id"),
+    "owned_activities": (ActivityOwnership, "activity_id"),
+    "authored_submissions": (SubmissionAuthorship, "submission_id"),
+}
+
+
+class RoleIndex:
+    """
+    The IDs of the objects in which a user has a role,
+    so that permission checks are answered without queries.
+    """
+
+    def __init__(self, rows=()):
+        for role in ROLE_QUERIES:
+            setattr(self, role, set())
+        for role, object_id in rows:
+            getattr(self, role).add(object_id)
+
+    def to_rows(self):
+        return [
+            (role, object_id)
+            for role in ROLE_QUERIES
+            for object_id in getattr(self, role)
+        ]
+
+
+def load_role_index(user_id):
+    """
+    Loads the roles of the user from the database, in a single query.
+    """
+    querysets = [
+        model.objects.filter(user_id=user_id)
+        .order_by()
+        .values_list(Value(role), F(field))
+        for role, (model, field) in ROLE_QUERIES.items()
+    ]
+    return RoleIndex(querysets[0].union(*querysets[1:], all=True))
+
+
+@memoize_per_request
+def get_role_index(user, obj=None):
+    """
+    Returns the roles of the user, from the cache or the database.
+    Memoized during the request.
+
+    The roles are only cached with a cache shared by all the processes
+    (see `SHARED_CACHE`), as the invalidation wouldn't reach the others.
+    """
+    if not user or not user.is_authenticated:
+        return RoleIndex()
+    if not settings.SHARED_CACHE:
+        return load_role_index(user.pk)
+
+    namespace = ROLE_INDEX_CACHE.format(user_id=user.pk)
+    key = "{}:{}".format(namespace, get_cache_version(namespace))
+    rows = cache.get(key)
+    if rows is not None:
+        return RoleIndex(rows)
+
+    index = load_role_index(user.pk)
+    cache.set(key, index.to_rows(), ROLE_INDEX_CACHE_TIMEOUT)
+    return index
+
+
+def invalidate_role_index(user_id):
+    bump_cache_version(ROLE_INDEX_CACHE.format(user_id=user_id))
@@ -15,6 +15,12 @@ router.register(
     views.EventRegistrationViewSet,
     basename="event-registration",
 )
+router.register(r"exports", views.ExportViewSet, basename="export")
+router.register(
+    r"registration_imports",
+    views.RegistrationImportViewSet,
+    basename="registration-import",
+)
 router.register(r"reviews", views.ReviewViewSet, basename="review")
 router.register(
     r"review_requests", views.ReviewRequestViewSet, basename="review-request"
@@ -2,6 +2,8 @@ from eventos2.core.serializers.activity import *
 from eventos2.core.serializers.activity_registration import *
 from eventos2.core.serializers.event import *
 from eventos2.core.serializers.event_registration import *
+from eventos2.core.serializers.export import *
+from eventos2.core.serializers.registration_import import *
 from eventos2.core.serializers.review import *
 from eventos2.core.serializers.review_answer import *
 from eventos2.core.serializers.review_request import *
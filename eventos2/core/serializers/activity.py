@@ -1,8 +1,16 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, OuterRef
+from django.db.models.functions import Coalesce
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from eventos2.core.models import Activity, Event
+from eventos2.core.models import Activity, ActivityRegistration, Event
+from eventos2.core.tasks import promote_waitlist
+from eventos2.utils.conditional import subquery_aggregate
+from eventos2.utils.serializers import EagerLoadingMixin
 
 
 class ActivityBaseSerializer(serializers.Serializer):
@@ -28,11 +36,43 @@ class ActivityBaseSerializer(serializers.Serializer):
         return data
 
 
-class ActivitySerializer(ActivityBaseSerializer, serializers.ModelSerializer):
+class ActivitySerializer(
+    EagerLoadingMixin, ActivityBaseSerializer, serializers.ModelSerializer
+):
     registration_count = serializers.SerializerMethodField()
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.annotate(registration_count=Count("registrations"))
+
+    @classmethod
+    def setup_nested_eager_loading(cls, queryset, path):
+        """
+        Joins the activities at `path` to the queryset, annotating its objects
+        with the registration count of their activities, in the same query.
+        The serializer of the objects must move the count to the activities
+        with `set_nested_annotations`.
+        """
+        return queryset.select_related(path).annotate(
+            activity_registration_count=Coalesce(
+                subquery_aggregate(
+                    ActivityRegistration.objects.filter(activity=OuterRef(path)),
+                    Count("pk"),
+                ),
+                0,
+            )
+        )
+
+    @classmethod
+    def set_nested_annotations(cls, obj, activity):
+        if hasattr(obj, "activity_registration_count"):
+            activity.registration_count = obj.activity_registration_count
+
     @extend_schema_field(OpenApiTypes.DECIMAL)
     def get_registration_count(self, obj):
+        # annotated by setup_eager_loading, avoiding a query per activity
+        if hasattr(obj, "registration_count"):
+            return obj.registration_count
         return obj.registrations.count()
 
     class Meta:
@@ -45,11 +85,22 @@ class ActivitySerializer(ActivityBaseSerializer, serializers.ModelSerializer):
             "ends_on",
             "is_open",
             "registration_count",
+            "capacity",
+            "remaining_seats",
         ]
 
     def create(self, validated_data):  # pragma: no cover - no complexity
         raise NotImplementedError("Use ActivityCreateSerializer")
 
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        if "capacity" in validated_data:
+            Activity.objects.filter(pk=instance.pk).reconcile_seats()
+            instance.refresh_from_db(fields=["remaining_seats"])
+            # A larger capacity may have seats for the users on the waitlist.
+            transaction.on_commit(partial(promote_waitlist, instance.pk))
+        return instance
+
 
 class ActivityCreateSerializer(ActivityBaseSerializer, serializers.ModelSerializer):
     event_slug = serializers.SlugRelatedField(
@@ -66,4 +117,9 @@ class ActivityCreateSerializer(ActivityBaseSerializer, serializers.ModelSerializ
             "starts_on",
             "ends_on",
             "is_open",
+            "capacity",
         ]
+
+    def create(self, validated_data):
+        validated_data["remaining_seats"] = validated_data.get("capacity")
+        return super().create(validated_data)
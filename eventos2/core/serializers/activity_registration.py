@@ -1,11 +1,15 @@
+from django.db import models
+from django.db.models import Count, F, Prefetch, Q
 from rest_framework import serializers
 
 from eventos2.core.models import Activity
 from eventos2.core.serializers.activity import ActivitySerializer
+from eventos2.core.serializers.event import EventSerializer
 from eventos2.core.serializers.event_registration import (
     EventRegistrationDetailSerializer,
 )
 from eventos2.core.serializers.user import UserSerializer
+from eventos2.utils.serializers import EagerLoadingMixin
 
 
 class ActivityRegistrationBaseSerializer(serializers.Serializer):
@@ -13,22 +17,85 @@ class ActivityRegistrationBaseSerializer(serializers.Serializer):
 
 
 class ActivityRegistrationCreateSerializer(ActivityRegistrationBaseSerializer):
-    activity = serializers.PrimaryKeyRelatedField(queryset=Activity.objects.all())
+    # The activity is checked by the view, in the statement that creates
+    # the registration.
+    activity = serializers.IntegerField()
 
-    def validate(self, data):
-        if not data["activity"].is_open:
-            raise serializers.ValidationError(
-                {"activity": "Registrations to this activity are closed."}
-            )
-        return data
+
+class ActivityRegistrationCreateManySerializer(ActivityRegistrationBaseSerializer):
+    activities = serializers.ListField(
+        child=serializers.IntegerField(), min_length=1, max_length=100
+    )
+
+
+class RegistrationResult(models.TextChoices):
+    CREATED = "created"
+    WAITLISTED = "waitlisted", "The activity is full, the user is on its waitlist"
+    ALREADY_REGISTERED = "already_registered"
+    CLOSED = "closed"
+    FORBIDDEN = "forbidden"
+    NOT_FOUND = "not_found"
 
 
-class ActivityRegistrationDetailSerializer(ActivityRegistrationBaseSerializer):
+class ActivityRegistrationResultSerializer(serializers.Serializer):
+    activity = serializers.IntegerField()
+    result = serializers.ChoiceField(choices=RegistrationResult.choices)
+    registration_id = serializers.IntegerField(allow_null=True)
+
+
+class ActivityRegistrationDetailSerializer(
+    EagerLoadingMixin, ActivityRegistrationBaseSerializer
+):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        queryset = ActivitySerializer.setup_nested_eager_loading(
+            queryset.select_related("event_registration__user"), "activity"
+        )
+        return EventSerializer.setup_nested_eager_loading(
+            queryset, "event_registration__event"
+        )
+
     id = serializers.IntegerField()
     activity = ActivitySerializer()
     event_registration = EventRegistrationDetailSerializer()
 
+    def to_representation(self, instance):
+        # annotated by setup_eager_loading, in the query of the registrations
+        ActivitySerializer.set_nested_annotations(instance, instance.activity)
+        EventSerializer.set_nested_annotations(
+            instance, instance.event_registration.event
+        )
+        return super().to_representation(instance)
+
+
+class ActivityRegistrationUserListSerializer(
+    EagerLoadingMixin, ActivityRegistrationBaseSerializer
+):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related("event_registration__user")
 
-class ActivityRegistrationUserListSerializer(ActivityRegistrationBaseSerializer):
     id = serializers.IntegerField()
     user = UserSerializer(source="event_registration.user")
+
+
+class ActivityWaitlistEntrySerializer(
+    EagerLoadingMixin, ActivityRegistrationBaseSerializer
+):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.annotate(
+            position=Count(
+                "activity__waitlist_entries",
+                filter=Q(activity__waitlist_entries__id__lte=F("id")),
+            )
+        ).prefetch_related(
+            Prefetch(
+                "activity",
+                queryset=ActivitySerializer.setup_eager_loading(Activity.objects.all()),
+            )
+        )
+
+    id = serializers.IntegerField()
+    activity = ActivitySerializer()
+    position = serializers.IntegerField(help_text="Starts from 1")
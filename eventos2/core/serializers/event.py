@@ -1,13 +1,15 @@
+from django.db.models import Exists, OuterRef
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from eventos2.core.models import Event
+from eventos2.core.models import Activity, Event, Track
 from eventos2.media.models import Image
 from eventos2.media.serializers import ImageSerializer
+from eventos2.utils.serializers import EagerLoadingMixin
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     has_activities = serializers.SerializerMethodField()
     has_tracks = serializers.SerializerMethodField()
     logo_attachment_key = serializers.SlugRelatedField(
@@ -19,12 +21,51 @@ class EventSerializer(serializers.ModelSerializer):
     )
     logo = ImageSerializer(required=False, read_only=True)
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related("logo").annotate(
+            **cls.get_annotations(OuterRef("pk"))
+        )
+
+    @classmethod
+    def setup_nested_eager_loading(cls, queryset, path):
+        """
+        Joins the events at `path` (and their logos) to the queryset,
+        annotating its objects with the flags of their events, in the same
+        query. The serializer of the objects must move the flags to the
+        events with `set_nested_annotations`.
+        """
+        return queryset.select_related(path, "{}__logo".format(path)).annotate(
+            **cls.get_annotations(OuterRef(path))
+        )
+
+    @staticmethod
+    def get_annotations(event):
+        return {
+            "has_available_activities": Exists(
+                Activity.available_objects.filter(event=event)
+            ),
+            "has_available_tracks": Exists(Track.available_objects.filter(event=event)),
+        }
+
+    @classmethod
+    def set_nested_annotations(cls, obj, event):
+        for name in ["has_available_activities", "has_available_tracks"]:
+            if hasattr(obj, name):
+                setattr(event, name, getattr(obj, name))
+
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_has_activities(self, obj):
+        # annotated by setup_eager_loading, avoiding a query per event
+        if hasattr(obj, "has_available_activities"):
+            return obj.has_available_activities
         return obj.has_activities
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_has_tracks(self, obj):
+        # annotated by setup_eager_loading, avoiding a query per event
+        if hasattr(obj, "has_available_tracks"):
+            return obj.has_available_tracks
         return obj.has_tracks
 
     def validate(self, data):
@@ -1,8 +1,8 @@
 from rest_framework import serializers
 
-from eventos2.core.models import Event
 from eventos2.core.serializers.event import EventSerializer
 from eventos2.core.serializers.user import UserSerializer
+from eventos2.utils.serializers import EagerLoadingMixin
 
 
 class EventRegistrationBaseSerializer(serializers.Serializer):
@@ -10,19 +10,25 @@ class EventRegistrationBaseSerializer(serializers.Serializer):
 
 
 class EventRegistrationCreateSerializer(EventRegistrationBaseSerializer):
-    event_slug = serializers.SlugRelatedField(
-        source="event", slug_field="slug", queryset=Event.objects.all()
-    )
+    # The event is checked by the view, in the statement that creates
+    # the registration.
+    event_slug = serializers.CharField(max_length=255)
 
-    def validate(self, data):
-        if not data["event"].is_open:
-            raise serializers.ValidationError(
-                {"event_slug": "Registrations to this event are closed."}
-            )
-        return data
 
+class EventRegistrationDetailSerializer(
+    EagerLoadingMixin, EventRegistrationBaseSerializer
+):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return EventSerializer.setup_nested_eager_loading(
+            queryset.select_related("user"), "event"
+        )
 
-class EventRegistrationDetailSerializer(EventRegistrationBaseSerializer):
     id = serializers.IntegerField()
     event = EventSerializer()
     user = UserSerializer()
+
+    def to_representation(self, instance):
+        # annotated by setup_eager_loading, in the query of the registrations
+        EventSerializer.set_nested_annotations(instance, instance.event)
+        return super().to_representation(instance)
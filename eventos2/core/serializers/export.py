@@ -0,0 +1,50 @@
+from rest_framework import serializers
+
+from eventos2.core.models import Activity, Event, Export
+from eventos2.utils.serializers import ReadOnlyModelSerializer
+
+
+class ExportCreateSerializer(serializers.Serializer):
+    event_slug = serializers.SlugRelatedField(
+        source="event", slug_field="slug", queryset=Event.available_objects.all()
+    )
+    kind = serializers.ChoiceField(choices=Export.Kind.choices)
+    activity = serializers.PrimaryKeyRelatedField(
+        queryset=Activity.available_objects.all(), required=False, allow_null=True
+    )
+    file_format = serializers.ChoiceField(choices=Export.FileFormat.choices)
+
+    def validate(self, data):
+        activity = data.get("activity")
+        if activity is None:
+            return data
+
+        if data["kind"] != Export.Kind.ACTIVITY_REGISTRATIONS:
+            raise serializers.ValidationError(
+                {"activity": "Only activity registrations can be limited by activity."}
+            )
+        if activity.event_id != data["event"].id:
+            raise serializers.ValidationError(
+                {"activity": "The activity must belong to the event."}
+            )
+        return data
+
+
+class ExportSerializer(ReadOnlyModelSerializer):
+    progress = serializers.FloatField()
+    url = serializers.CharField(allow_null=True)
+
+    class Meta:
+        model = Export
+        fields = [
+            "public_id",
+            "kind",
+            "file_format",
+            "status",
+            "progress",
+            "row_count",
+            "total_rows",
+            "url",
+            "requested_on",
+            "finished_on",
+        ]
@@ -0,0 +1,85 @@
+import csv
+import io
+
+from rest_framework import serializers
+
+from eventos2.core.models import Event, RegistrationImport
+from eventos2.utils.serializers import ReadOnlyModelSerializer
+
+# Header cells skipped in the first row of CSV files.
+IMPORT_CSV_HEADERS = {"email", "public_id", "identifier"}
+IMPORT_MAX_ROWS = 100000
+
+
+def read_identifiers(file):
+    """
+    Returns the first column of each (non-empty) row of a CSV file.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    identifiers = [row[0].strip() for row in csv.reader(text) if row and row[0]]
+    if identifiers and identifiers[0].lower() in IMPORT_CSV_HEADERS:
+        identifiers = identifiers[1:]
+    return identifiers
+
+
+class RegistrationImportCreateSerializer(serializers.Serializer):
+    event_slug = serializers.SlugRelatedField(
+        source="event", slug_field="slug", queryset=Event.available_objects.all()
+    )
+    file = serializers.FileField(
+        required=False,
+        help_text="A CSV file, with an email or public ID in the first column.",
+    )
+    identifiers = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        required=False,
+        help_text="Emails or public IDs, instead of a file.",
+    )
+
+    def validate(self, data):
+        file = data.pop("file", None)
+        if file is not None:
+            try:
+                data["identifiers"] = read_identifiers(file)
+            except (UnicodeDecodeError, csv.Error):
+                raise serializers.ValidationError({"file": "Invalid CSV file."})
+
+        if not data.get("identifiers"):
+            raise serializers.ValidationError(
+                {"identifiers": "A file or a list of identifiers is required."}
+            )
+        if len(data["identifiers"]) > IMPORT_MAX_ROWS:
+            raise serializers.ValidationError(
+                {
+                    "identifiers": "At most {} users can be imported at once.".format(
+                        IMPORT_MAX_ROWS
+                    )
+                }
+            )
+        return data
+
+
+class RegistrationImportRowSerializer(serializers.Serializer):
+    row = serializers.IntegerField(help_text="Starts from 1")
+    identifier = serializers.CharField()
+    result = serializers.ChoiceField(choices=RegistrationImport.Result.choices)
+
+
+class RegistrationImportSerializer(ReadOnlyModelSerializer):
+    event_slug = serializers.CharField(source="event.slug")
+    total_rows = serializers.IntegerField()
+    summary = serializers.DictField(child=serializers.IntegerField())
+    rows = RegistrationImportRowSerializer(many=True)
+
+    class Meta:
+        model = RegistrationImport
+        fields = [
+            "public_id",
+            "event_slug",
+            "status",
+            "total_rows",
+            "summary",
+            "rows",
+            "requested_on",
+            "finished_on",
+        ]
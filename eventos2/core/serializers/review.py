@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from eventos2.core.models import Review, ReviewAnswer
@@ -39,16 +41,32 @@ class ReviewCreateSerializer(serializers.Serializer):
         return data
 
     def create(self, validated_data):
+        review = validated_data["request"]
         answers_data = validated_data.pop("answers")
+        now = timezone.now()
 
-        for answer_data in answers_data:
-            ReviewAnswer.objects.create(review=validated_data["request"], **answer_data)
+        with transaction.atomic():
+            # The review is completed by the same statement that checks it's
+            # still pending, so concurrent requests can't both answer it.
+            completed = Review.objects.filter(
+                pk=review.pk, completed_on__isnull=True
+            ).update(completed_on=now)
+            if not completed:
+                raise serializers.ValidationError(
+                    {"request": "This review has already been completed."}
+                )
+            ReviewAnswer.objects.bulk_create(
+                ReviewAnswer(review=review, **answer_data)
+                for answer_data in answers_data
+            )
 
-        return validated_data["request"]
+        review.completed_on = now
+        return review
 
 
 class ReviewDetailSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     submission = SubmissionDetailSerializer()
     author = UserSerializer()
+    completed_on = serializers.DateTimeField()
     answers = ReviewAnswerSerializer(many=True)
@@ -1,9 +1,16 @@
+from django.db.models import Prefetch
 from rest_framework import serializers, validators
 
-from eventos2.core.models import Review, Submission, User
+from eventos2.core.coauthorship import get_coauthorship_graph
+from eventos2.core.models import Event, Review, Submission, Track, User
 from eventos2.core.serializers.submission import (
     SubmissionDetailWithoutAuthorsSerializer,
 )
+from eventos2.core.serializers.user import UserSerializer
+from eventos2.utils.serializers import EagerLoadingMixin
+
+ASSIGN_MAX_REVIEWERS = 10000
+ASSIGN_MAX_REVIEWERS_PER_SUBMISSION = 10
 
 
 class ReviewRequestCreateSerializer(serializers.ModelSerializer):
@@ -24,7 +31,97 @@ class ReviewRequestCreateSerializer(serializers.ModelSerializer):
             )
         ]
 
+    def validate(self, data):
+        author_ids = data["submission"].authors.values_list("pk", flat=True)
+        if get_coauthorship_graph().has_conflict(data["author"].pk, set(author_ids)):
+            raise serializers.ValidationError(
+                {
+                    "author": "This user is an author or co-author of "
+                    "the submission's authors."
+                }
+            )
+        return data
+
+
+class ReviewRequestInlineSerializer(EagerLoadingMixin, serializers.Serializer):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.prefetch_related(
+            Prefetch(
+                "submission",
+                queryset=SubmissionDetailWithoutAuthorsSerializer.setup_eager_loading(
+                    Submission.objects.all()
+                ),
+            )
+        )
 
-class ReviewRequestInlineSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     submission = SubmissionDetailWithoutAuthorsSerializer()
+
+
+class ReviewRequestAssignSerializer(serializers.Serializer):
+    event_slug = serializers.SlugRelatedField(
+        source="event",
+        slug_field="slug",
+        queryset=Event.available_objects.all(),
+        required=False,
+        help_text="Assigns reviewers to all the submissions of the event.",
+    )
+    track = serializers.PrimaryKeyRelatedField(
+        queryset=Track.objects.select_related("event"),
+        required=False,
+        help_text="Assigns reviewers to the submissions of the track only.",
+    )
+    reviewers = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        min_length=1,
+        max_length=ASSIGN_MAX_REVIEWERS,
+        help_text="The public IDs of the reviewer pool.",
+    )
+    reviewers_per_submission = serializers.IntegerField(
+        min_value=1, max_value=ASSIGN_MAX_REVIEWERS_PER_SUBMISSION
+    )
+
+    def validate_reviewers(self, value):
+        public_ids = list(dict.fromkeys(value))
+        users = dict(
+            User.objects.filter(is_active=True, public_id__in=public_ids).values_list(
+                "public_id", "pk"
+            )
+        )
+        unknown = [x for x in public_ids if x not in users]
+        if unknown:
+            raise serializers.ValidationError(
+                "These users don't exist: {}.".format(", ".join(unknown[:10]))
+            )
+        # The IDs of the users, in the order of the pool.
+        return [users[x] for x in public_ids]
+
+    def validate(self, data):
+        if ("event" in data) == ("track" in data):
+            raise serializers.ValidationError(
+                {"event_slug": "Either an event or a track is required."}
+            )
+        if "track" in data:
+            data["event"] = data["track"].event
+        return data
+
+
+class ReviewRequestAssignResultSerializer(serializers.Serializer):
+    assigned = serializers.IntegerField(help_text="The number of reviews created.")
+    submissions = serializers.IntegerField()
+    incomplete_submissions = serializers.ListField(
+        child=serializers.IntegerField(),
+        help_text="The submissions the pool doesn't have enough reviewers for.",
+    )
+
+
+class ReviewerSuggestionSerializer(serializers.Serializer):
+    class SuggestedReviewerSerializer(serializers.Serializer):
+        user = UserSerializer()
+        score = serializers.FloatField(
+            help_text="The similarity to the submission, from 0 to 1."
+        )
+
+    submission = serializers.IntegerField()
+    reviewers = SuggestedReviewerSerializer(many=True)
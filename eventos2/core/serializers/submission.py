@@ -1,8 +1,10 @@
+from django.db.models import Prefetch
 from django.utils import timezone
 from rest_framework import serializers
 
 from eventos2.core.models import (
     Document,
+    Review,
     Submission,
     SubmissionDocument,
     Track,
@@ -17,6 +19,7 @@ from eventos2.core.serializers.submission_document import (
 from eventos2.core.serializers.track import TrackSerializer
 from eventos2.core.serializers.user import UserSerializer
 from eventos2.media.serializers import DocumentSerializer
+from eventos2.utils.serializers import EagerLoadingMixin
 
 
 class SubmissionDocumentInlineSerializer(SubmissionDocumentBaseSerializer):
@@ -106,7 +109,21 @@ class SubmissionCreateSerializer(SubmissionBaseSerializer):
         return submission
 
 
-class SubmissionDetailSerializer(SubmissionBaseSerializer):
+class SubmissionDetailSerializer(EagerLoadingMixin, SubmissionBaseSerializer):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.prefetch_related(
+            Prefetch(
+                "track",
+                queryset=TrackSerializer.setup_eager_loading(Track.objects.all()),
+            ),
+            "authors",
+            Prefetch(
+                "documents",
+                queryset=SubmissionDocument.objects.select_related("slot", "document"),
+            ),
+        )
+
     id = serializers.IntegerField()
     track = TrackSerializer()
     title = serializers.CharField()
@@ -120,6 +137,16 @@ class SubmissionDetailWithReviewsSerializer(SubmissionDetailSerializer):
         id = serializers.IntegerField()
         answers = ReviewAnswerSerializer(many=True)
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return (
+            super()
+            .setup_eager_loading(queryset)
+            .prefetch_related(
+                Prefetch("reviews", queryset=Review.objects.prefetch_related("answers"))
+            )
+        )
+
     id = serializers.IntegerField()
     track = TrackSerializer()
     title = serializers.CharField()
@@ -129,7 +156,22 @@ class SubmissionDetailWithReviewsSerializer(SubmissionDetailSerializer):
     reviews = ReviewInlineSerializer(many=True)
 
 
-class SubmissionDetailWithoutAuthorsSerializer(SubmissionBaseSerializer):
+class SubmissionDetailWithoutAuthorsSerializer(
+    EagerLoadingMixin, SubmissionBaseSerializer
+):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.prefetch_related(
+            Prefetch(
+                "track",
+                queryset=TrackSerializer.setup_eager_loading(Track.objects.all()),
+            ),
+            Prefetch(
+                "documents",
+                queryset=SubmissionDocument.objects.select_related("slot", "document"),
+            ),
+        )
+
     id = serializers.IntegerField()
     track = TrackSerializer()
     title = serializers.CharField()
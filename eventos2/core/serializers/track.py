@@ -1,8 +1,10 @@
+from django.db.models import Count, Q
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from eventos2.core.models import Event, Track
+from eventos2.utils.serializers import EagerLoadingMixin
 
 
 class TrackBaseSerializer(serializers.Serializer):
@@ -28,12 +30,25 @@ class TrackBaseSerializer(serializers.Serializer):
         return data
 
 
-class TrackSerializer(TrackBaseSerializer, serializers.ModelSerializer):
+class TrackSerializer(
+    EagerLoadingMixin, TrackBaseSerializer, serializers.ModelSerializer
+):
     submission_count = serializers.SerializerMethodField()
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.annotate(
+            submission_count=Count(
+                "submissions", filter=Q(submissions__deleted_on__isnull=True)
+            )
+        )
+
     @extend_schema_field(OpenApiTypes.DECIMAL)
     def get_submission_count(self, obj):
-        return obj.submissions.count()
+        # annotated by setup_eager_loading, avoiding a query per track
+        if hasattr(obj, "submission_count"):
+            return obj.submission_count
+        return obj.submissions(manager="available_objects").count()
 
     class Meta:
         model = Track
@@ -0,0 +1,172 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from eventos2.core.cache import invalidate_event, invalidate_event_catalog
+from eventos2.core.models import (
+    Activity,
+    ActivityOwnership,
+    ActivityRegistration,
+    Event,
+    EventOwnership,
+    EventRegistration,
+    Submission,
+    SubmissionAuthorship,
+    Track,
+    User,
+)
+from eventos2.core.roles import invalidate_role_index
+from eventos2.core.tasks import (
+    promote_waitlist,
+    update_coauthorships,
+    update_reviewer_matching,
+)
+from eventos2.utils.authentication import invalidate_cached_user
+from eventos2.utils.memoization import clear_request_memo
+
+# Soft deletions save the instance, so they are handled by post_save.
+# The caches are only invalidated after the commit, otherwise a concurrent
+# request could cache the data from before the change again.
+
+
+@receiver(pre_save, sender=Event)
+def remember_previous_event_slug(sender, instance, **kwargs):
+    # The responses cached under the previous slug must be invalidated too.
+    instance._previous_slug = None
+    if instance.pk is not None:
+        instance._previous_slug = (
+            Event.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_on_change(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_event_catalog)
+    for slug in {instance.slug, getattr(instance, "_previous_slug", None)}:
+        if slug is not None:
+            transaction.on_commit(partial(invalidate_event, slug))
+
+
+# Activities and tracks change the event's `has_activities` and `has_tracks`.
+@receiver(post_save, sender=Activity)
+@receiver(post_delete, sender=Activity)
+@receiver(post_save, sender=Track)
+@receiver(post_delete, sender=Track)
+def invalidate_event_on_schedule_change(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_event_catalog)
+    transaction.on_commit(partial(invalidate_event, instance.event.slug))
+
+
+def invalidate_roles(user_ids):
+    # Invalidated right away, so the rest of the request sees the change,
+    # and again after the commit, in case a concurrent request has cached
+    # the roles from before it in the meantime.
+    clear_request_memo()
+    for user_id in user_ids:
+        invalidate_role_index(user_id)
+        transaction.on_commit(partial(invalidate_role_index, user_id))
+
+
+# The role index (and the memoized predicates) depend on these relationships.
+@receiver(post_save, sender=EventOwnership)
+@receiver(post_delete, sender=EventOwnership)
+@receiver(post_save, sender=ActivityOwnership)
+@receiver(post_delete, sender=ActivityOwnership)
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+@receiver(post_save, sender=SubmissionAuthorship)
+@receiver(post_delete, sender=SubmissionAuthorship)
+def invalidate_roles_on_change(sender, instance, **kwargs):
+    invalidate_roles([instance.user_id])
+
+
+# Changes through `Event.owners`, `Activity.owners` and `Submission.authors`.
+@receiver(m2m_changed, sender=EventOwnership)
+@receiver(m2m_changed, sender=ActivityOwnership)
+@receiver(m2m_changed, sender=SubmissionAuthorship)
+def invalidate_roles_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ["post_add", "post_remove", "pre_clear"]:
+        return
+
+    if reverse:  # changed from the user's side
+        user_ids = [instance.pk]
+    elif action == "pre_clear":
+        user_ids = sender.objects.filter(
+            **{instance._meta.model_name: instance}
+        ).values_list("user_id", flat=True)
+    else:
+        user_ids = pk_set
+    invalidate_roles(user_ids)
+
+
+# Includes deactivations, which must take effect on the next request.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_on_change(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    transaction.on_commit(partial(invalidate_cached_user, instance.pk))
+
+
+# The seat goes to the first user on the waitlist, if there's one.
+@receiver(post_delete, sender=ActivityRegistration)
+def release_seat_on_unregister(sender, instance, **kwargs):
+    if Activity.objects.filter(pk=instance.activity_id).release_seat():
+        transaction.on_commit(partial(promote_waitlist, instance.activity_id))
+
+
+# The reviewer matching index depends on the titles and authors of submissions.
+@receiver(post_save, sender=Submission)
+@receiver(post_delete, sender=Submission)
+def update_reviewer_matching_on_submission_change(sender, instance, **kwargs):
+    transaction.on_commit(partial(update_reviewer_matching, [instance.pk]))
+
+
+@receiver(post_save, sender=SubmissionAuthorship)
+@receiver(post_delete, sender=SubmissionAuthorship)
+def update_reviewer_matching_on_authorship_change(sender, instance, **kwargs):
+    transaction.on_commit(partial(update_reviewer_matching, [instance.submission_id]))
+
+
+@receiver(m2m_changed, sender=SubmissionAuthorship)
+def update_reviewer_matching_on_m2m_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ["post_add", "post_remove", "pre_clear"]:
+        return
+
+    if not reverse:  # changed from the submission's side
+        submission_ids = [instance.pk]
+    elif action == "pre_clear":
+        submission_ids = list(
+            sender.objects.filter(user=instance).values_list("submission_id", flat=True)
+        )
+    else:
+        submission_ids = list(pk_set)
+    transaction.on_commit(partial(update_reviewer_matching, submission_ids))
+
+
+# The co-authorship graph only grows with new authorships,
+# and is rebuilt when they are removed.
+@receiver(post_save, sender=SubmissionAuthorship)
+def update_coauthorships_on_add(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(partial(update_coauthorships, [instance.submission_id]))
+
+
+@receiver(post_delete, sender=SubmissionAuthorship)
+def update_coauthorships_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(update_coauthorships, rebuild=True))
+
+
+@receiver(m2m_changed, sender=SubmissionAuthorship)
+def update_coauthorships_on_m2m_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "post_add":
+        submission_ids = list(pk_set) if reverse else [instance.pk]
+        transaction.on_commit(partial(update_coauthorships, submission_ids))
+    elif action in ["post_remove", "post_clear"]:
+        transaction.on_commit(partial(update_coauthorships, rebuild=True))
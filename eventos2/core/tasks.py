@@ -0,0 +1,297 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.utils import timezone
+from huey.contrib.djhuey import db_task, lock_task
+
+from eventos2.core.coauthorship import update_coauthorship_graph
+from eventos2.core.models import (
+    Activity,
+    ActivityRegistration,
+    ActivityWaitlistEntry,
+    EventRegistration,
+    Export,
+    RegistrationImport,
+    User,
+)
+from eventos2.core.reviewer_matching import refresh_matching_index
+from eventos2.utils.inserts import insert_from_select, insert_objects
+from eventos2.utils.spreadsheets import write_csv, write_xlsx
+
+# How often (in rows) the progress of an export is saved.
+EXPORT_PROGRESS_INTERVAL = 1000
+EXPORT_CHUNK_SIZE = 2000
+# How many users are looked up or registered per query, in imports.
+IMPORT_BATCH_SIZE = 1000
+
+EXPORT_WRITERS = {
+    Export.FileFormat.CSV: write_csv,
+    Export.FileFormat.XLSX: write_xlsx,
+}
+
+
+def get_export_rows(export):
+    """
+    Returns the header and the queryset of rows (as tuples) for the export.
+    """
+    if export.kind == Export.Kind.EVENT_REGISTRATIONS:
+        columns = [
+            ("id", "id"),
+            ("user_public_id", "user__public_id"),
+            ("first_name", "user__first_name"),
+            ("last_name", "user__last_name"),
+            ("email", "user__email"),
+        ]
+        queryset = EventRegistration.objects.filter(event=export.event)
+    else:
+        columns = [
+            ("id", "id"),
+            ("activity_id", "activity_id"),
+            ("activity_name", "activity__name"),
+            ("user_public_id", "event_registration__user__public_id"),
+            ("first_name", "event_registration__user__first_name"),
+            ("last_name", "event_registration__user__last_name"),
+            ("email", "event_registration__user__email"),
+        ]
+        queryset = ActivityRegistration.objects.filter(activity__event=export.event)
+        if export.activity is not None:
+            queryset = queryset.filter(activity=export.activity)
+
+    header = [name for name, _ in columns]
+    rows = queryset.order_by("id").values_list(*[lookup for _, lookup in columns])
+    return header, rows
+
+
+def track_progress(export, rows):
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        yield row
+        if count % EXPORT_PROGRESS_INTERVAL == 0:
+            Export.objects.filter(pk=export.pk).update(row_count=count)
+    export.row_count = count
+
+
+@db_task()
+def run_export(export_id):
+    """
+    Writes the export file under MEDIA_ROOT, reading the rows
+    with a server-side cursor, so they are never all held in memory.
+    """
+    export = Export.objects.select_related("event", "activity").get(pk=export_id)
+
+    header, rows = get_export_rows(export)
+    export.status = Export.Status.RUNNING
+    export.total_rows = rows.count()
+    export.save(update_fields=["status", "total_rows"])
+
+    name = "exports/{}.{}".format(export.public_id, export.file_format)
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    try:
+        EXPORT_WRITERS[export.file_format](
+            path,
+            header,
+            track_progress(export, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)),
+        )
+    except Exception:
+        export.status = Export.Status.FAILED
+        export.finished_on = timezone.now()
+        export.save(update_fields=["status", "finished_on"])
+        raise
+
+    export.file.name = name
+    export.status = Export.Status.DONE
+    export.finished_on = timezone.now()
+    export.save(update_fields=["file", "status", "row_count", "finished_on"])
+
+
+def promote_next_waitlist_entry(activity_id):
+    """
+    Registers the first user on the waitlist of the activity, if there's
+    a seat left. Returns whether the waitlist should still be processed.
+    """
+    with transaction.atomic():
+        entry = (
+            ActivityWaitlistEntry.objects.filter(activity_id=activity_id)
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .first()
+        )
+        if entry is None:
+            return False
+
+        created = insert_from_select(
+            ActivityRegistration,
+            ActivityWaitlistEntry.objects.filter(pk=entry.pk),
+            activity=F("activity"),
+            event_registration=F("event_registration"),
+        )
+        # The user may have registered while waiting, taking a seat already.
+        if created and not Activity.objects.filter(pk=activity_id).take_seat(
+            skip_waitlist=True
+        ):
+            transaction.set_rollback(True)
+            return False
+
+        entry.delete()
+        return True
+
+
+def register_whole_waitlist(activity_id):
+    """
+    Registers all the users on the waitlist of the activity, in order,
+    if it no longer has a capacity (so there are no seats to take).
+    Returns whether it had none.
+    """
+    with transaction.atomic():
+        activity = (
+            Activity.objects.filter(pk=activity_id, capacity__isnull=True)
+            .select_for_update()
+            .first()
+        )
+        if activity is None:
+            return False
+
+        entries = list(
+            ActivityWaitlistEntry.objects.filter(activity_id=activity_id)
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+        )
+        # The users who registered while waiting are skipped.
+        insert_objects(
+            [
+                ActivityRegistration(
+                    activity_id=activity_id,
+                    event_registration_id=entry.event_registration_id,
+                )
+                for entry in entries
+            ]
+        )
+        ActivityWaitlistEntry.objects.filter(pk__in=[x.pk for x in entries]).delete()
+        return True
+
+
+@db_task()
+def promote_waitlist(activity_id):
+    """
+    Registers the users on the waitlist of the activity, in order,
+    while there are seats left, or all of them, if it has no capacity.
+    """
+    if register_whole_waitlist(activity_id):
+        return
+    while promote_next_waitlist_entry(activity_id):
+        pass
+
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def resolve_users(identifiers):
+    """
+    Returns the IDs of the active users, by their emails (matched
+    case-insensitively, like `UserViewSet.list`) or public IDs,
+    looked up in batches.
+    """
+    keys = {x: x.lower() if "@" in x else x for x in identifiers}
+    emails = sorted({key for key in keys.values() if "@" in key})
+    public_ids = sorted({key for key in keys.values() if "@" not in key})
+    users = User.objects.filter(is_active=True).annotate(email_lower=Lower("email"))
+    found = {}
+    for field, values in [("email_lower", emails), ("public_id", public_ids)]:
+        for batch in batched(values, IMPORT_BATCH_SIZE):
+            found.update(
+                users.filter(**{"{}__in".format(field): batch}).values_list(field, "pk")
+            )
+    return {x: found[key] for x, key in keys.items() if key in found}
+
+
+def import_registrations(registration_import):
+    """
+    Registers the users into the event, in a single transaction,
+    and saves the result for each of the identifiers.
+
+    The users already registered (even concurrently) are the ones whose
+    registrations weren't inserted, as reported by the database.
+    """
+    Result = RegistrationImport.Result
+    event = registration_import.event
+    identifiers = registration_import.identifiers
+    user_ids = resolve_users(identifiers)
+    unique_user_ids = list(dict.fromkeys(user_ids.values()))
+
+    with transaction.atomic():
+        created = {
+            x.user_id
+            for x in insert_objects(
+                [EventRegistration(event=event, user_id=x) for x in unique_user_ids],
+                batch_size=IMPORT_BATCH_SIZE,
+            )
+        }
+
+        results = []
+        seen = set()
+        for identifier in identifiers:
+            user_id = user_ids.get(identifier)
+            if user_id is None:
+                results.append(Result.NOT_FOUND)
+            elif user_id in seen:
+                results.append(Result.DUPLICATE)
+            elif user_id in created:
+                results.append(Result.CREATED)
+            else:
+                results.append(Result.ALREADY_REGISTERED)
+            seen.add(user_id)
+
+        registration_import.results = results
+        registration_import.status = RegistrationImport.Status.DONE
+        registration_import.finished_on = timezone.now()
+        registration_import.save(update_fields=["results", "status", "finished_on"])
+
+
+def process_registration_import(registration_import):
+    registration_import.status = RegistrationImport.Status.RUNNING
+    registration_import.save(update_fields=["status"])
+    try:
+        import_registrations(registration_import)
+    except Exception:
+        registration_import.status = RegistrationImport.Status.FAILED
+        registration_import.finished_on = timezone.now()
+        registration_import.save(update_fields=["status", "finished_on"])
+        raise
+
+
+@db_task()
+def run_registration_import(import_id):
+    """
+    Runs an import that is too large for the web worker.
+    """
+    registration_import = RegistrationImport.objects.select_related("event").get(
+        pk=import_id
+    )
+    process_registration_import(registration_import)
+
+
+@db_task(retries=10, retry_delay=1)
+@lock_task("reviewer-matching")
+def update_reviewer_matching(submission_ids):
+    """
+    Updates the reviewer matching index with the submissions.
+    Retried while another update holds the lock.
+    """
+    refresh_matching_index(submission_ids)
+
+
+@db_task(retries=10, retry_delay=1)
+@lock_task("coauthorships")
+def update_coauthorships(submission_ids=(), rebuild=False):
+    """
+    Updates the co-authorship graph with the new authorships
+    (of the submissions), or rebuilds it, when authorships were deleted.
+    """
+    update_coauthorship_graph(submission_ids, rebuild)
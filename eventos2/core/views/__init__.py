@@ -2,6 +2,8 @@ from eventos2.core.views.activity import *
 from eventos2.core.views.activity_registration import *
 from eventos2.core.views.event import *
 from eventos2.core.views.event_registration import *
+from eventos2.core.views.export import *
+from eventos2.core.views.registration_import import *
 from eventos2.core.views.review import *
 from eventos2.core.views.review_request import *
 from eventos2.core.views.submission import *
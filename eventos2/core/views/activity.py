@@ -1,3 +1,4 @@
+from django.db.models import Count, Max
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.decorators import action
@@ -10,10 +11,35 @@ from eventos2.core.serializers import (
     ActivityRegistrationUserListSerializer,
     ActivitySerializer,
 )
+from eventos2.utils.conditional import conditional_response
+from eventos2.utils.pagination import KEYSET_PAGINATION_PARAMETERS
 from eventos2.utils.permissions import PerActionPermissions
 from eventos2.utils.viewsets import CRUDViewSet
 
 
+def get_activity_validators(view, request, pk=None):
+    activity = (
+        Activity.available_objects.filter(pk=pk)
+        .annotate(
+            registration_count=Count("registrations"),
+            last_registration_id=Max("registrations"),
+        )
+        .first()
+    )
+    if activity is None:
+        return None
+    view.check_object_permissions(request, activity)
+    state = [
+        activity.pk,
+        activity.updated_on,
+        activity.is_open,
+        activity.registration_count,
+        activity.last_registration_id,
+    ]
+    # Registrations don't have timestamps, so there's no Last-Modified.
+    return state, None
+
+
 class ActivityViewSet(CRUDViewSet):
     queryset = Activity.available_objects.all()
     permission_classes = [PerActionPermissions]
@@ -30,6 +56,10 @@ class ActivityViewSet(CRUDViewSet):
             return ActivityCreateSerializer
         return ActivitySerializer
 
+    @conditional_response(get_activity_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -43,11 +73,15 @@ class ActivityViewSet(CRUDViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    @extend_schema(responses={200: ActivityRegistrationUserListSerializer(many=True)})
+    @extend_schema(
+        responses={200: ActivityRegistrationUserListSerializer(many=True)},
+        parameters=KEYSET_PAGINATION_PARAMETERS,
+    )
     @action(detail=True, url_path="registrations", url_name="list-registrations")
     def list_registrations(self, request, pk=None):
         activity = self.get_object()
-        serializer = ActivityRegistrationUserListSerializer(
-            activity.registrations, many=True
+        return self.get_list_response(
+            activity.registrations.all(),
+            ActivityRegistrationUserListSerializer,
+            ordering=["id"],
         )
-        return Response(serializer.data)
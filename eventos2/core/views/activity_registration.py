@@ -1,58 +1,292 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import DateTimeField, Exists, F, OuterRef, Value
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from eventos2.core.models import ActivityRegistration, Event, EventRegistration, User
+from eventos2.core.models import (
+    Activity,
+    ActivityRegistration,
+    ActivityWaitlistEntry,
+    Event,
+    User,
+)
 from eventos2.core.serializers import (
     ActivityRegistrationBaseSerializer,
+    ActivityRegistrationCreateManySerializer,
     ActivityRegistrationCreateSerializer,
     ActivityRegistrationDetailSerializer,
+    ActivityRegistrationResultSerializer,
+    ActivityWaitlistEntrySerializer,
+    RegistrationResult,
 )
+from eventos2.core.tasks import promote_waitlist
+from eventos2.utils.inserts import insert_from_select
+from eventos2.utils.pagination import KEYSET_PAGINATION_PARAMETERS
+from eventos2.utils.predicates import permission_to_q
+from eventos2.utils.viewsets import ListActionMixin
 
 
-class ActivityRegistrationViewSet(GenericViewSet):
+class ActivityRegistrationViewSet(ListActionMixin, GenericViewSet):
     queryset = ActivityRegistration.objects.all()
 
     def get_serializer_class(self):
         return {
             "create": ActivityRegistrationCreateSerializer,
+            "create_many": ActivityRegistrationCreateManySerializer,
             "destroy": ActivityRegistrationBaseSerializer,
             "list": ActivityRegistrationBaseSerializer,
         }.get(self.action, None)
 
-    @extend_schema(responses={200: ActivityRegistrationDetailSerializer})
+    @staticmethod
+    def get_registrable_activities(request, now):
+        """
+        Returns the activities into which the user can register,
+        so that the checks are made by the statement that creates
+        the registrations (see `insert_registrations`).
+
+        The join with the user's event registration is filtered in the same
+        `filter` call where it's created, so that the inserted values reuse it.
+        """
+        return Activity.objects.filter(
+            starts_on__lte=now,
+            ends_on__gte=now,
+            event__registrations__user=request.user.pk,
+        ).filter(
+            permission_to_q("core.register_self_into_activity", request.user, Activity)
+        )
+
+    @staticmethod
+    def insert_registrations(model, activities, **values):
+        return insert_from_select(
+            model,
+            activities,
+            activity=F("pk"),
+            event_registration=F("event__registrations__pk"),
+            **values,
+        )
+
+    def add_to_waitlists(self, activities, now):
+        created = self.insert_registrations(
+            ActivityWaitlistEntry,
+            activities,
+            created_on=Value(now, output_field=DateTimeField()),
+        )
+        # Seats may have been released before the user joined the waitlists.
+        for entry in created:
+            transaction.on_commit(partial(promote_waitlist, entry.activity_id))
+        return created
+
+    @extend_schema(
+        responses={
+            200: ActivityRegistrationDetailSerializer,
+            202: ActivityWaitlistEntrySerializer,
+        },
+        description=(
+            "Registers the user into the activity, "
+            "or into its waitlist (202), if the activity is full."
+        ),
+    )
     def create(self, request):
         in_serializer = self.get_serializer(data=request.data)
         in_serializer.is_valid(raise_exception=True)
-        data = in_serializer.validated_data
+        activity_id = in_serializer.validated_data["activity"]
 
-        activity = data["activity"]
+        now = timezone.now()
+        activities = self.get_registrable_activities(request, now).filter(
+            pk=activity_id
+        )
+        # Activities without a capacity need no seat.
+        created = self.insert_registrations(
+            ActivityRegistration, activities.filter(capacity__isnull=True)
+        )
+        if not created:
+            # Otherwise a seat is taken first, which is given back
+            # by the rollback if the registration isn't created.
+            with transaction.atomic():
+                if Activity.objects.filter(pk=activity_id).take_seat():
+                    created = self.insert_registrations(
+                        ActivityRegistration, activities
+                    )
+                    if not created:
+                        transaction.set_rollback(True)
+        if not created:
+            error = self.get_create_error(request, activity_id)
+            if error is not None:
+                raise error
+            return self.join_waitlist(request, activity_id, activities, now)
+
+        activity_registration = (
+            ActivityRegistrationDetailSerializer.setup_eager_loading(
+                ActivityRegistration.objects.filter(pk=created[0].pk)
+            ).get()
+        )
+        out_serializer = ActivityRegistrationDetailSerializer(activity_registration)
+        return Response(out_serializer.data, status=status.HTTP_200_OK)
 
+    def get_create_error(self, request, activity_id):
+        """
+        Finds out why a registration wasn't created.
+        Returns None if it's because the activity is full.
+        """
+        activity = Activity.objects.filter(pk=activity_id).first()
+        if activity is None:
+            return ValidationError(
+                {
+                    "activity": [
+                        'Invalid pk "{}" - object does not exist.'.format(activity_id)
+                    ]
+                }
+            )
+        if not activity.is_open:
+            return ValidationError(
+                {"activity": ["Registrations to this activity are closed."]}
+            )
         if not request.user.has_perm("core.register_self_into_activity", activity):
-            raise PermissionDenied(
+            return PermissionDenied(
                 "You're not authorized to self register into this activity."
             )
-
-        event_registration = EventRegistration.objects.get(
-            event=activity.event, user=request.user
-        )
-        if (
+        is_registered = activity.capacity is None or (
             self.get_queryset()
             .filter(activity=activity, event_registration__user=request.user)
             .exists()
-        ):
-            raise ValidationError("This registration already exists.")
-
-        activity_registration = ActivityRegistration.objects.create(
-            activity=activity, event_registration=event_registration
         )
+        if is_registered:
+            return ValidationError("This registration already exists.")
+        # The activity is full.
+        return None
 
-        out_serializer = ActivityRegistrationDetailSerializer(activity_registration)
+    def join_waitlist(self, request, activity_id, activities, now):
+        self.add_to_waitlists(activities, now)
+
+        entry = ActivityWaitlistEntrySerializer.setup_eager_loading(
+            ActivityWaitlistEntry.objects.filter(
+                activity=activity_id, event_registration__user=request.user
+            )
+        ).get()
+        out_serializer = ActivityWaitlistEntrySerializer(entry)
+        return Response(out_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(
+        request=ActivityRegistrationCreateManySerializer,
+        responses={200: ActivityRegistrationResultSerializer(many=True)},
+        description=(
+            "Registers the user into several activities, "
+            "returning the result for each of them. "
+            "Full activities put the user on their waitlists."
+        ),
+    )
+    @action(detail=False, methods=["post"], url_path="many", url_name="create-many")
+    def create_many(self, request):
+        in_serializer = self.get_serializer(data=request.data)
+        in_serializer.is_valid(raise_exception=True)
+        activity_ids = list(dict.fromkeys(in_serializer.validated_data["activities"]))
+
+        # All the activities are validated with a single query,
+        # and the permissions are answered by the role index.
+        now = timezone.now()
+        activities = Activity.objects.annotate(
+            is_registered=Exists(
+                ActivityRegistration.objects.filter(
+                    activity=OuterRef("pk"), event_registration__user=request.user.pk
+                )
+            )
+        ).in_bulk(activity_ids)
+
+        results = {}
+        candidates = []
+        for activity_id in activity_ids:
+            activity = activities.get(activity_id)
+            if activity is None:
+                results[activity_id] = RegistrationResult.NOT_FOUND
+            elif not activity.is_open_on(now):
+                results[activity_id] = RegistrationResult.CLOSED
+            elif not request.user.has_perm(
+                "core.register_self_into_activity", activity
+            ):
+                results[activity_id] = RegistrationResult.FORBIDDEN
+            elif activity.is_registered:
+                results[activity_id] = RegistrationResult.ALREADY_REGISTERED
+            else:
+                candidates.append(activity)
+
+        registration_ids = self.register_many(request, candidates, now, results)
+
+        out_serializer = ActivityRegistrationResultSerializer(
+            [
+                {
+                    "activity": activity_id,
+                    "result": results[activity_id],
+                    "registration_id": registration_ids.get(activity_id),
+                }
+                for activity_id in activity_ids
+            ],
+            many=True,
+        )
         return Response(out_serializer.data, status=status.HTTP_200_OK)
 
+    def register_many(self, request, activities, now, results):
+        """
+        Registers the user into the activities, with a single insert,
+        filling the `results`. Returns the ID of each registration created,
+        by activity ID.
+        """
+        unlimited_ids = [x.pk for x in activities if x.capacity is None]
+        limited_ids = [x.pk for x in activities if x.capacity is not None]
+        registrable = self.get_registrable_activities(request, now)
+
+        with transaction.atomic():
+            seated_ids = []
+            if limited_ids:
+                # The counters with seats left are locked (in a consistent order,
+                # avoiding deadlocks), so that the seats stay left until taken.
+                seated_ids = list(
+                    Activity.objects.filter(pk__in=limited_ids, remaining_seats__gt=0)
+                    .exclude(
+                        Exists(
+                            ActivityWaitlistEntry.objects.filter(
+                                activity=OuterRef("pk")
+                            )
+                        )
+                    )
+                    .order_by("pk")
+                    .select_for_update()
+                    .values_list("pk", flat=True)
+                )
+                Activity.objects.filter(pk__in=seated_ids).update(
+                    remaining_seats=F("remaining_seats") - 1
+                )
+
+            created = self.insert_registrations(
+                ActivityRegistration,
+                registrable.filter(pk__in=unlimited_ids + seated_ids),
+            )
+            registration_ids = {x.activity_id: x.pk for x in created}
+            # Registered concurrently, so the seats weren't needed.
+            Activity.objects.filter(
+                pk__in=set(seated_ids) - set(registration_ids)
+            ).release_seat()
+
+        full_ids = set(limited_ids) - set(seated_ids)
+        if full_ids:
+            self.add_to_waitlists(registrable.filter(pk__in=full_ids), now)
+
+        for activity in activities:
+            if activity.pk in registration_ids:
+                results[activity.pk] = RegistrationResult.CREATED
+            elif activity.pk in full_ids:
+                results[activity.pk] = RegistrationResult.WAITLISTED
+            else:
+                results[activity.pk] = RegistrationResult.ALREADY_REGISTERED
+        return registration_ids
+
     def destroy(self, request, pk):
         registration = self.get_object()
 
@@ -68,6 +302,7 @@ class ActivityRegistrationViewSet(GenericViewSet):
         parameters=[
             OpenApiParameter("user_public_id", required=True),
             OpenApiParameter("event_slug", required=True),
+            *KEYSET_PAGINATION_PARAMETERS,
         ],
     )
     def list(self, request):
@@ -80,5 +315,6 @@ class ActivityRegistrationViewSet(GenericViewSet):
         registrations = self.get_queryset().filter(
             activity__event=event, event_registration__user=user
         )
-        out_serializer = ActivityRegistrationDetailSerializer(registrations, many=True)
-        return Response(out_serializer.data)
+        return self.get_list_response(
+            registrations, ActivityRegistrationDetailSerializer, ordering=["id"]
+        )
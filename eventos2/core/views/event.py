@@ -1,9 +1,18 @@
+from django.db.models import Count, Max, OuterRef, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import filters
 from rest_framework.decorators import action
-from rest_framework.response import Response
 
-from eventos2.core.models import Event, Submission
+from eventos2.core.cache import EVENT_CACHE, EVENT_CATALOG_CACHE
+from eventos2.core.models import (
+    Activity,
+    ActivityRegistration,
+    Event,
+    Submission,
+    Track,
+)
 from eventos2.core.serializers import (
     ActivitySerializer,
     EventRegistrationDetailSerializer,
@@ -11,18 +20,135 @@ from eventos2.core.serializers import (
     SubmissionDetailWithReviewsSerializer,
     TrackSerializer,
 )
+from eventos2.utils.cache import cache_response
+from eventos2.utils.conditional import conditional_response, subquery_aggregate
+from eventos2.utils.pagination import KEYSET_PAGINATION_PARAMETERS
 from eventos2.utils.permissions import PerActionPermissions
+from eventos2.utils.search import search_by_text
 from eventos2.utils.viewsets import CRUDViewSet
 
+# The responses of the event, activities and tracks are the same for every user
+# allowed to see them. They are invalidated when the event, or any of its
+# activities or tracks, change, but not on new registrations or submissions,
+# so the counts may be outdated by up to `timeout` seconds.
+PUBLIC_PAGE_CACHE = {"timeout": 30, "stale_timeout": 30, "anonymous_only": False}
+
+
+def get_last_change():
+    """
+    The last time an event, or its activities or tracks, were changed
+    (including soft deletions).
+    """
+    return Greatest(
+        "updated_on",
+        subquery_aggregate(
+            Activity.objects.filter(event=OuterRef("pk")), Max("updated_on")
+        ),
+        subquery_aggregate(
+            Track.objects.filter(event=OuterRef("pk")), Max("updated_on")
+        ),
+    )
+
+
+def get_schedule_state(queryset):
+    """
+    Aggregates of the (correlated) activities or tracks, which change
+    when any of them is changed, or opens or closes (see `is_open`).
+    """
+    now = timezone.now()
+    available = queryset.filter(deleted_on__isnull=True)
+    return {
+        "last_change": subquery_aggregate(queryset, Max("updated_on")),
+        "started_count": subquery_aggregate(
+            available.filter(starts_on__lte=now), Count("pk")
+        ),
+        "ended_count": subquery_aggregate(
+            available.filter(ends_on__lt=now), Count("pk")
+        ),
+    }
+
+
+def get_event_state(view, request, slug, annotations):
+    """
+    Fetches the event with the annotations, in a single query,
+    checking the view's object permissions.
+    Returns the event's ID and the annotated values,
+    or None, if the event doesn't exist.
+    """
+    event = Event.available_objects.filter(slug=slug).annotate(**annotations).first()
+    if event is None:
+        return None
+    view.check_object_permissions(request, event)
+    return [event.pk] + [getattr(event, name) for name in annotations]
+
+
+def get_event_validators(view, request, slug=None):
+    state = get_event_state(view, request, slug, {"last_change": get_last_change()})
+    return state and (state, state[1])
+
+
+def get_catalog_validators(view, request):
+    now = timezone.now()
+    # Deleted and ended events are included, so that removing them
+    # from the catalog also changes the validators.
+    events = view.filter_queryset(Event.objects.annotate(last_change=get_last_change()))
+    state = events.aggregate(
+        catalog_last_change=Max("last_change"),
+        catalog_last_ended_on=Max("ends_on", filter=Q(ends_on__lt=now)),
+        catalog_count=Count("pk", filter=Q(deleted_on__isnull=True, ends_on__gte=now)),
+    )
+    changes = [
+        x
+        for x in [state["catalog_last_change"], state["catalog_last_ended_on"]]
+        if x is not None
+    ]
+    return list(state.values()), max(changes, default=None)
+
+
+def get_activities_validators(view, request, slug=None):
+    activities = Activity.objects.filter(event=OuterRef("pk"))
+    registrations = ActivityRegistration.objects.filter(activity__event=OuterRef("pk"))
+    state = get_event_state(
+        view,
+        request,
+        slug,
+        {
+            **get_schedule_state(activities),
+            "registration_count": subquery_aggregate(registrations, Count("pk")),
+            "last_registration_id": subquery_aggregate(registrations, Max("pk")),
+        },
+    )
+    # Registrations don't have timestamps, so there's no Last-Modified.
+    return state and (state, None)
+
+
+def get_tracks_validators(view, request, slug=None):
+    tracks = Track.objects.filter(event=OuterRef("pk"))
+    submissions = Submission.available_objects.filter(track__event=OuterRef("pk"))
+    state = get_event_state(
+        view,
+        request,
+        slug,
+        {
+            **get_schedule_state(tracks),
+            "submission_count": subquery_aggregate(submissions, Count("pk")),
+            "last_submission_id": subquery_aggregate(submissions, Max("pk")),
+        },
+    )
+    # Submissions don't have timestamps, so there's no Last-Modified.
+    return state and (state, None)
+
 
 class EventViewSet(CRUDViewSet):
     lookup_field = "slug"
     queryset = Event.available_objects.all()
     filter_backends = [filters.SearchFilter]
+    search_fields = ["name__unaccent", "name_english__unaccent", "slug"]
     serializer_class = EventSerializer
     permission_classes = [PerActionPermissions]
     per_action_permissions = {
         "create": "core.add_event",
+        "list": PerActionPermissions.ALLOW_ANY,
         "retrieve": PerActionPermissions.ALLOW_ANY,
         "update": "core.change_event",
         "destroy": "core.delete_event",
@@ -31,35 +157,78 @@ class EventViewSet(CRUDViewSet):
         "list_tracks": "core.view_tracks_for_event",
         "list_submissions": "core.view_submissions_for_event",
     }
+    stream_list_actions = ["list_registrations"]
+
+    def get_queryset(self):
+        return EventSerializer.setup_eager_loading(super().get_queryset())
 
-    @extend_schema(responses={200: EventRegistrationDetailSerializer(many=True)})
+    @cache_response(EVENT_CACHE, **PUBLIC_PAGE_CACHE)
+    @conditional_response(get_event_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=KEYSET_PAGINATION_PARAMETERS,
+        description="Lists the events that haven't ended yet, "
+        "ordered by their start date.",
+    )
+    @cache_response(EVENT_CATALOG_CACHE, timeout=60 * 5, stale_timeout=60)
+    @conditional_response(get_catalog_validators)
+    def list(self, request):
+        # The eager loading plan is applied by get_list_response.
+        queryset = Event.available_objects.filter(ends_on__gte=timezone.now())
+        return self.get_list_response(
+            self.filter_queryset(queryset),
+            EventSerializer,
+            ordering=["starts_on", "id"],
+            always_paginate=True,
+        )
+
+    @extend_schema(
+        responses={200: EventRegistrationDetailSerializer(many=True)},
+        parameters=KEYSET_PAGINATION_PARAMETERS,
+    )
     @action(detail=True, url_path="registrations", url_name="list-registrations")
     def list_registrations(self, request, slug=None):
         event = self.get_object()
-        serializer = EventRegistrationDetailSerializer(event.registrations, many=True)
-        return Response(serializer.data)
+        return self.get_list_response(
+            event.registrations.all(),
+            EventRegistrationDetailSerializer,
+            ordering=["id"],
+        )
 
     @extend_schema(responses={200: ActivitySerializer(many=True)})
     @action(detail=True, url_path="activities", url_name="list-activities")
+    @cache_response(EVENT_CACHE, **PUBLIC_PAGE_CACHE)
+    @conditional_response(get_activities_validators)
     def list_activities(self, request, slug=None):
         event = self.get_object()
-        serializer = ActivitySerializer(
-            event.activities(manager="available_objects"), many=True
+        return self.get_list_response(
+            event.activities(manager="available_objects").all(), ActivitySerializer
         )
-        return Response(serializer.data)
 
     @extend_schema(responses={200: TrackSerializer(many=True)})
     @action(detail=True, url_path="tracks", url_name="list-tracks")
+    @cache_response(EVENT_CACHE, **PUBLIC_PAGE_CACHE)
+    @conditional_response(get_tracks_validators)
     def list_tracks(self, request, slug=None):
         event = self.get_object()
-        serializer = TrackSerializer(
-            event.tracks(manager="available_objects"), many=True
+        return self.get_list_response(
+            event.tracks(manager="available_objects").all(), TrackSerializer
         )
-        return Response(serializer.data)
 
     @extend_schema(
         responses={200: SubmissionDetailWithReviewsSerializer(many=True)},
-        parameters=[OpenApiParameter("track", type=int), OpenApiParameter("title")],
+        parameters=[
+            OpenApiParameter("track", type=int),
+            OpenApiParameter(
+                "title",
+                description="Searches the title and english title, "
+                "ignoring accents and tolerating typos. "
+                "The results are sorted by relevance.",
+            ),
+            *KEYSET_PAGINATION_PARAMETERS,
+        ],
     )
     @action(detail=True, url_path="submissions", url_name="list-submissions")
     def list_submissions(self, request, slug=None):
@@ -72,10 +241,18 @@ class EventViewSet(CRUDViewSet):
 
         if track_id:
             filters["track__pk"] = track_id
+
+        queryset = Submission.available_objects.filter(**filters)
+        ordering = ["title", "id"]
         if title:
-            filters["title__unaccent__icontains"] = title
+            queryset = search_by_text(
+                queryset,
+                title,
+                vector_field="search_vector",
+                trigram_fields=["title", "title_english"],
+            )
+            ordering = ["-search_rank", "id"]
 
-        serializer = SubmissionDetailWithReviewsSerializer(
-            Submission.available_objects.filter(**filters).order_by("title"), many=True
+        return self.get_list_response(
+            queryset, SubmissionDetailWithReviewsSerializer, ordering=ordering
         )
-        return Response(serializer.data)
@@ -1,3 +1,5 @@
+from django.db.models import F, IntegerField, Value
+from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.exceptions import PermissionDenied, ValidationError
@@ -10,9 +12,13 @@ from eventos2.core.serializers import (
     EventRegistrationCreateSerializer,
     EventRegistrationDetailSerializer,
 )
+from eventos2.utils.inserts import insert_from_select
+from eventos2.utils.pagination import KEYSET_PAGINATION_PARAMETERS
+from eventos2.utils.predicates import permission_to_q
+from eventos2.utils.viewsets import ListActionMixin
 
 
-class EventRegistrationViewSet(GenericViewSet):
+class EventRegistrationViewSet(ListActionMixin, GenericViewSet):
     queryset = EventRegistration.objects.all()
 
     def get_serializer_class(self):
@@ -28,24 +34,51 @@ class EventRegistrationViewSet(GenericViewSet):
     def create(self, request):
         in_serializer = self.get_serializer(data=request.data)
         in_serializer.is_valid(raise_exception=True)
-        data = in_serializer.validated_data
+        event_slug = in_serializer.validated_data["event_slug"]
+
+        # Checks that the event is open and the user can register into it,
+        # and creates the registration, in a single statement.
+        now = timezone.now()
+        events = Event.objects.filter(
+            slug=event_slug, starts_on__lte=now, ends_on__gte=now
+        ).filter(permission_to_q("core.register_self_into_event", request.user, Event))
+        created = insert_from_select(
+            EventRegistration,
+            events,
+            event=F("pk"),
+            user=Value(request.user.pk, output_field=IntegerField()),
+        )
+        if not created:
+            raise self.get_create_error(request, event_slug)
 
-        event = data["event"]
+        event_registration = EventRegistrationDetailSerializer.setup_eager_loading(
+            EventRegistration.objects.filter(pk=created[0].pk)
+        ).get()
+        out_serializer = EventRegistrationDetailSerializer(event_registration)
+        return Response(out_serializer.data, status=status.HTTP_200_OK)
 
+    def get_create_error(self, request, event_slug):
+        """
+        Finds out why a registration wasn't created.
+        """
+        event = Event.objects.filter(slug=event_slug).first()
+        if event is None:
+            return ValidationError(
+                {
+                    "event_slug": [
+                        "Object with slug={} does not exist.".format(event_slug)
+                    ]
+                }
+            )
+        if not event.is_open:
+            return ValidationError(
+                {"event_slug": ["Registrations to this event are closed."]}
+            )
         if not request.user.has_perm("core.register_self_into_event"):
-            raise PermissionDenied(
+            return PermissionDenied(
                 "You're not authorized to self register into this event."
             )
-
-        if self.get_queryset().filter(event=event, user=request.user).exists():
-            raise ValidationError("This registration already exists.")
-
-        event_registration = EventRegistration.objects.create(
-            event=event, user=request.user
-        )
-
-        out_serializer = EventRegistrationDetailSerializer(event_registration)
-        return Response(out_serializer.data, status=status.HTTP_200_OK)
+        return ValidationError("This registration already exists.")
 
     def destroy(self, request, pk):
         registration = self.get_object()
@@ -62,6 +95,7 @@ class EventRegistrationViewSet(GenericViewSet):
         parameters=[
             OpenApiParameter("user_public_id", required=True),
             OpenApiParameter("event_slug"),
+            *KEYSET_PAGINATION_PARAMETERS,
         ],
     )
     def list(self, request):
@@ -81,5 +115,6 @@ class EventRegistrationViewSet(GenericViewSet):
         else:
             registrations = self.get_queryset().filter(user=user)
 
-        out_serializer = EventRegistrationDetailSerializer(registrations, many=True)
-        return Response(out_serializer.data)
+        return self.get_list_response(
+            registrations, EventRegistrationDetailSerializer, ordering=["id"]
+        )
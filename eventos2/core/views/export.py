@@ -0,0 +1,59 @@
+from django.db import transaction
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from eventos2.core.models import Export
+from eventos2.core.serializers import ExportCreateSerializer, ExportSerializer
+from eventos2.core.tasks import run_export
+from eventos2.utils.permissions import PerActionPermissions
+
+
+class ExportViewSet(GenericViewSet):
+    lookup_field = "public_id"
+    queryset = Export.objects.all()
+    permission_classes = [PerActionPermissions]
+    per_action_permissions = {
+        "create": PerActionPermissions.ALLOW_AUTHENTICATED,
+        "retrieve": PerActionPermissions.ALLOW_AUTHENTICATED,
+    }
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return ExportCreateSerializer
+        return ExportSerializer
+
+    @staticmethod
+    def get_required_permission(data):
+        if data["kind"] == Export.Kind.EVENT_REGISTRATIONS:
+            return "core.view_registrations_for_event", data["event"]
+        if data.get("activity") is not None:
+            return "core.view_registrations_for_activity", data["activity"]
+        return "core.view_activity_registrations_for_event", data["event"]
+
+    @extend_schema(request=ExportCreateSerializer, responses={202: ExportSerializer})
+    def create(self, request):
+        in_serializer = self.get_serializer(data=request.data)
+        in_serializer.is_valid(raise_exception=True)
+        data = in_serializer.validated_data
+
+        permission, obj = self.get_required_permission(data)
+        if not request.user.has_perm(permission, obj):
+            raise PermissionDenied("You're not allowed to export these registrations.")
+
+        export = Export.objects.create(requested_by=request.user, **data)
+        # The export runs in the task queue, never in the web worker.
+        transaction.on_commit(lambda: run_export(export.pk))
+
+        out_serializer = ExportSerializer(export)
+        return Response(out_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    def retrieve(self, request, public_id=None):
+        export = self.get_object()
+
+        if request.user != export.requested_by:
+            raise PermissionDenied("You're not allowed to view this export.")
+
+        return Response(ExportSerializer(export).data)
@@ -0,0 +1,76 @@
+from django.db import transaction
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from eventos2.core.models import RegistrationImport
+from eventos2.core.serializers import (
+    RegistrationImportCreateSerializer,
+    RegistrationImportSerializer,
+)
+from eventos2.core.tasks import process_registration_import, run_registration_import
+from eventos2.utils.permissions import PerActionPermissions
+
+# Larger imports run in the task queue, instead of the web worker.
+IMPORT_MAX_SYNC_ROWS = 500
+
+
+class RegistrationImportViewSet(GenericViewSet):
+    lookup_field = "public_id"
+    queryset = RegistrationImport.objects.select_related("event")
+    permission_classes = [PerActionPermissions]
+    per_action_permissions = {
+        "create": PerActionPermissions.ALLOW_AUTHENTICATED,
+        "retrieve": PerActionPermissions.ALLOW_AUTHENTICATED,
+    }
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return RegistrationImportCreateSerializer
+        return RegistrationImportSerializer
+
+    @extend_schema(
+        request=RegistrationImportCreateSerializer,
+        responses={
+            200: RegistrationImportSerializer,
+            202: RegistrationImportSerializer,
+        },
+        description=(
+            "Registers users into an event, by their emails or public IDs. "
+            "Large imports are accepted (202) and run in the background."
+        ),
+    )
+    def create(self, request):
+        in_serializer = self.get_serializer(data=request.data)
+        in_serializer.is_valid(raise_exception=True)
+        data = in_serializer.validated_data
+
+        if not request.user.has_perm("core.change_event", data["event"]):
+            raise PermissionDenied(
+                "You're not allowed to import registrations into this event."
+            )
+
+        registration_import = RegistrationImport.objects.create(
+            requested_by=request.user, **data
+        )
+        if registration_import.total_rows > IMPORT_MAX_SYNC_ROWS:
+            transaction.on_commit(
+                lambda: run_registration_import(registration_import.pk)
+            )
+            response_status = status.HTTP_202_ACCEPTED
+        else:
+            process_registration_import(registration_import)
+            response_status = status.HTTP_200_OK
+
+        out_serializer = RegistrationImportSerializer(registration_import)
+        return Response(out_serializer.data, status=response_status)
+
+    def retrieve(self, request, public_id=None):
+        registration_import = self.get_object()
+
+        if request.user != registration_import.requested_by:
+            raise PermissionDenied("You're not allowed to view this import.")
+
+        return Response(RegistrationImportSerializer(registration_import).data)
@@ -1,10 +1,21 @@
+from django.db import transaction
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
-from eventos2.core.serializers import ReviewRequestCreateSerializer
+from eventos2.core.models import Submission
+from eventos2.core.review_assignment import plan_review_assignment
+from eventos2.core.serializers import (
+    ReviewRequestAssignResultSerializer,
+    ReviewRequestAssignSerializer,
+    ReviewRequestCreateSerializer,
+)
+from eventos2.utils.inserts import insert_objects
+
+ASSIGN_BATCH_SIZE = 5000
 
 
 class ReviewRequestViewSet(ViewSet):
@@ -28,3 +39,47 @@ class ReviewRequestViewSet(ViewSet):
 
         out_serializer = ReviewRequestCreateSerializer(review)
         return Response(out_serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        request=ReviewRequestAssignSerializer,
+        responses={200: ReviewRequestAssignResultSerializer},
+        description=(
+            "Assigns reviewers from a pool to the submissions of an event "
+            "or track, balancing the reviews among them, and never assigning "
+            "the authors of a submission to it."
+        ),
+    )
+    @action(detail=False, methods=["post"], url_path="assign", url_name="assign")
+    def assign(self, request):
+        in_serializer = ReviewRequestAssignSerializer(data=request.data)
+        in_serializer.is_valid(raise_exception=True)
+        data = in_serializer.validated_data
+
+        if not request.user.has_perm("core.change_event", data["event"]):
+            raise PermissionDenied(
+                "You're not authorized to add review requests to this event."
+            )
+
+        if "track" in data:
+            submissions = Submission.available_objects.filter(track=data["track"])
+        else:
+            submissions = Submission.available_objects.filter(
+                track__event=data["event"]
+            )
+
+        with transaction.atomic():
+            reviews, incomplete = plan_review_assignment(
+                submissions, data["reviewers"], data["reviewers_per_submission"]
+            )
+            # Reviews created meanwhile by other requests are kept,
+            # and only the ones actually inserted are counted.
+            created = insert_objects(reviews, batch_size=ASSIGN_BATCH_SIZE)
+
+        out_serializer = ReviewRequestAssignResultSerializer(
+            {
+                "assigned": len(created),
+                "submissions": submissions.count(),
+                "incomplete_submissions": incomplete,
+            }
+        )
+        return Response(out_serializer.data)
@@ -1,19 +1,50 @@
-from drf_spectacular.utils import extend_schema
+from django.db.models import Count, Max, Q
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 
-from eventos2.core.models import Track
+from eventos2.core.models import Submission, Track, User
+from eventos2.core.reviewer_matching import get_excluded_reviewers, get_matching_index
 from eventos2.core.serializers import (
+    ReviewerSuggestionSerializer,
     TrackCreateSerializer,
     TrackReviewQuestionSerializer,
     TrackSerializer,
     TrackSubmissionDocumentSlotSerializer,
 )
+from eventos2.utils.conditional import conditional_response
 from eventos2.utils.permissions import PerActionPermissions
 from eventos2.utils.viewsets import CRUDViewSet
 
+SUGGESTIONS_DEFAULT_K = 5
+SUGGESTIONS_MAX_K = 20
+
+
+def get_track_validators(view, request, pk=None):
+    available_submissions = Q(submissions__deleted_on__isnull=True)
+    track = (
+        Track.available_objects.filter(pk=pk)
+        .annotate(
+            submission_count=Count("submissions", filter=available_submissions),
+            last_submission_id=Max("submissions", filter=available_submissions),
+        )
+        .first()
+    )
+    if track is None:
+        return None
+    view.check_object_permissions(request, track)
+    state = [
+        track.pk,
+        track.updated_on,
+        track.is_open,
+        track.submission_count,
+        track.last_submission_id,
+    ]
+    # Submissions don't have timestamps, so there's no Last-Modified.
+    return state, None
+
 
 class TrackViewSet(CRUDViewSet):
     queryset = Track.available_objects.all()
@@ -26,6 +57,7 @@ class TrackViewSet(CRUDViewSet):
         "list_submissions": "core.change_event",
         "list_submission_document_slots": "core.view_tracks_for_event",
         "list_review_questions": "core.view_review_questions_for_track",
+        "list_reviewer_suggestions": "core.change_event",
     }
 
     def get_serializer_class(self):
@@ -33,6 +65,10 @@ class TrackViewSet(CRUDViewSet):
             return TrackCreateSerializer
         return TrackSerializer
 
+    @conditional_response(get_track_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -52,10 +88,10 @@ class TrackViewSet(CRUDViewSet):
     )
     def list_submission_document_slots(self, request, pk=None):
         track = self.get_object()
-        serializer = TrackSubmissionDocumentSlotSerializer(
-            track.submission_document_slots.all(), many=True
+        return self.get_list_response(
+            track.submission_document_slots.all(),
+            TrackSubmissionDocumentSlotSerializer,
         )
-        return Response(serializer.data)
 
     @extend_schema(responses={200: TrackReviewQuestionSerializer(many=True)})
     @action(
@@ -65,7 +101,74 @@ class TrackViewSet(CRUDViewSet):
     )
     def list_review_questions(self, request, pk=None):
         track = self.get_object()
-        serializer = TrackReviewQuestionSerializer(
-            track.review_questions.all(), many=True
+        return self.get_list_response(
+            track.review_questions.all(), TrackReviewQuestionSerializer
+        )
+
+    @extend_schema(
+        responses={200: ReviewerSuggestionSerializer(many=True)},
+        parameters=[
+            OpenApiParameter(
+                "k",
+                int,
+                description="How many reviewers to suggest for each submission.",
+            )
+        ],
+        description=(
+            "Suggests reviewers for each submission of the track, by the "
+            "similarity of its titles to the titles of the submissions each "
+            "user authored, in any event (TF-IDF). The authors and current "
+            "reviewers of a submission aren't suggested for it."
+        ),
+    )
+    @action(
+        detail=True,
+        url_path="reviewer_suggestions",
+        url_name="list-reviewer-suggestions",
+    )
+    def list_reviewer_suggestions(self, request, pk=None):
+        track = self.get_object()
+        try:
+            k = int(request.query_params.get("k", SUGGESTIONS_DEFAULT_K))
+        except ValueError:
+            raise ValidationError({"k": "A valid integer is required."})
+        if not 1 <= k <= SUGGESTIONS_MAX_K:
+            raise ValidationError(
+                {"k": "Must be between 1 and {}.".format(SUGGESTIONS_MAX_K)}
+            )
+
+        submissions = Submission.available_objects.filter(track=track)
+        titles = {
+            submission_id: [title, title_english]
+            for submission_id, title, title_english in submissions.order_by(
+                "pk"
+            ).values_list("pk", "title", "title_english")
+        }
+        suggestions = get_matching_index().suggest_reviewers(
+            titles,
+            k,
+            excluded=get_excluded_reviewers(submissions),
+            unavailable=set(
+                User.objects.filter(is_active=False).values_list("pk", flat=True)
+            ),
+        )
+
+        users = User.objects.in_bulk(
+            {user_id for pairs in suggestions.values() for user_id, _ in pairs}
+        )
+        serializer = ReviewerSuggestionSerializer(
+            [
+                {
+                    "submission": submission_id,
+                    "reviewers": [
+                        {"user": users[user_id], "score": score}
+                        for user_id, score in suggestions[submission_id]
+                        # unless deleted since the index was updated
+                        if user_id in users
+                    ],
+                }
+                for submission_id in titles
+            ],
+            many=True,
         )
         return Response(serializer.data)
@@ -3,13 +3,14 @@ from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from eventos2.core.models import Submission, User
+from eventos2.core.models import Review, Submission, User
 from eventos2.core.serializers import (
     ReviewRequestInlineSerializer,
     SubmissionDetailWithReviewsSerializer,
     UserCreateSerializer,
     UserSerializer,
 )
+from eventos2.utils.pagination import KEYSET_PAGINATION_PARAMETERS
 from eventos2.utils.permissions import PerActionPermissions
 from eventos2.utils.viewsets import CViewSet
 
@@ -46,8 +47,8 @@ class UserViewSet(CViewSet):
         url_path="current",
     )
     def current(self, request):
-        user = User.objects.filter(is_active=True).get(pk=request.user.pk)
-        return Response(self.get_serializer(user).data)
+        # inactive users aren't authenticated
+        return Response(self.get_serializer(request.user).data)
 
     @current.mapping.put
     def current_update(self, request):
@@ -55,22 +56,21 @@ class UserViewSet(CViewSet):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        user = User.objects.filter().get(pk=request.user.pk)
-
+        user = request.user
         user.first_name = data["first_name"]
         user.last_name = data["last_name"]
-        user.save()
+        user.save(update_fields=["first_name", "last_name"])
 
         return Response(serializer.data)
 
     @current.mapping.delete
     def current_destroy(self, request):
-        user = User.objects.filter().get(pk=request.user.pk)
-        user.delete()
+        request.user.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @extend_schema(
         responses={200: SubmissionDetailWithReviewsSerializer(many=True)},
+        parameters=KEYSET_PAGINATION_PARAMETERS,
     )
     @action(
         detail=False,
@@ -78,16 +78,15 @@ class UserViewSet(CViewSet):
         url_name="current-list-submissions",
     )
     def current_list_submissions(self, request, slug=None):
-        user = User.objects.filter().get(pk=request.user.pk)
-
-        serializer = SubmissionDetailWithReviewsSerializer(
-            Submission.available_objects.filter(authors__in=[user]).order_by("-id"),
-            many=True,
+        return self.get_list_response(
+            Submission.available_objects.filter(authors__in=[request.user]),
+            SubmissionDetailWithReviewsSerializer,
+            ordering=["-id"],
         )
-        return Response(serializer.data)
 
     @extend_schema(
         responses={200: ReviewRequestInlineSerializer(many=True)},
+        parameters=KEYSET_PAGINATION_PARAMETERS,
     )
     @action(
         detail=False,
@@ -95,13 +94,8 @@ class UserViewSet(CViewSet):
         url_name="current-list-review-requests",
     )
     def current_list_review_requests(self, request, slug=None):
-        user = User.objects.filter().get(pk=request.user.pk)
-
-        reviews = user.reviews.order_by("-id").all()
-        pending_reviews = [x for x in reviews if x.is_pending]
-
-        serializer = ReviewRequestInlineSerializer(
-            pending_reviews,
-            many=True,
+        return self.get_list_response(
+            Review.objects.filter(author=request.user).pending(),
+            ReviewRequestInlineSerializer,
+            ordering=["-id"],
         )
-        return Response(serializer.data)
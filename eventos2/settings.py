@@ -22,7 +22,26 @@ DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 EMAIL_CONFIG = env.email_url("EMAIL_URL", default="memorymail://")
 vars().update(EMAIL_CONFIG)
 
-HUEY = {"connection": {"url": env("REDIS_URL", default=None)}}
+REDIS_URL = env("REDIS_URL", default=None)
+
+HUEY = {"connection": {"url": REDIS_URL}}
+
+# Sem Redis (ex. nos testes), o cache padrão em memória local é utilizado.
+if REDIS_URL:  # pragma: no cover - deployment
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
+# Os caches invalidados por sinais (os papéis dos usuários, em
+# `eventos2.core.roles`, e os usuários autenticados, em
+# `eventos2.utils.authentication`) dependem de um cache compartilhado entre
+# os processos: com o cache em memória local, a invalidação só alcançaria
+# o processo que fez a alteração, e os outros usariam os valores antigos.
+# Sem ele, esses valores são carregados do banco de dados a cada request.
+SHARED_CACHE = env("SHARED_CACHE", bool, bool(REDIS_URL))
 
 CORS_ORIGIN_WHITELIST = env("CORS_ORIGIN_WHITELIST", list, [])
 
@@ -57,6 +76,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "eventos2.utils.memoization.RequestMemoMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -138,7 +158,7 @@ FILE_UPLOAD_PERMISSIONS = 0o644
 # https://www.django-rest-framework.org/
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
+        "eventos2.utils.authentication.CachedJWTAuthentication"
     ],
     "DEFAULT_METADATA_CLASS": "eventos2.utils.metadata.MinimalMetadata",
     "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
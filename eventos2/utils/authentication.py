@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+# How long (in seconds) the users are cached, in case an invalidation is missed.
+USER_CACHE_TIMEOUT = 60
+
+
+def get_user_cache_key(user_id):
+    return "auth-user:{}".format(user_id)
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(get_user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Same as simplejwt's JWTAuthentication, but the users are cached
+    for a short time, instead of being fetched on every request.
+
+    The cached user must be invalidated (see `invalidate_cached_user`)
+    when it's changed, for example, when it's deactivated. So the users
+    are only cached with a cache shared by all the processes
+    (see `SHARED_CACHE`), as the invalidation wouldn't reach the others.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or not settings.SHARED_CACHE:
+            return super().get_user(validated_token)
+
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            # raises an error if the user doesn't exist or is inactive
+            user = super().get_user(validated_token)
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user
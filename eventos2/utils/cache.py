@@ -0,0 +1,158 @@
+import time
+from functools import wraps
+from hashlib import sha256
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from eventos2.utils.conditional import get_not_modified_response
+
+# Cached along with the response data, see `conditional_response`.
+VALIDATOR_HEADERS = ["ETag", "Last-Modified"]
+
+# How long (in seconds) a value may take to be computed by `get_or_refill`,
+# and how often the other callers check whether it's done.
+REFILL_TIMEOUT = 10
+REFILL_POLL_INTERVAL = 0.05
+
+
+def _initial_version():
+    # Based on the clock, so a version that was evicted from the cache
+    # is never reused, which would serve values stored before it was bumped.
+    return time.time_ns() // 1000
+
+
+def _version_key(namespace):
+    return "{}:version".format(namespace)
+
+
+def get_cache_version(namespace):
+    """
+    Returns the current version of a namespace of cached values.
+    """
+    return cache.get_or_set(_version_key(namespace), _initial_version, timeout=None)
+
+
+def bump_cache_version(namespace):
+    """
+    Invalidates every value cached in the namespace, by changing its version.
+    The old values are not deleted, and just expire.
+    """
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:  # the version isn't in the cache
+        cache.set(_version_key(namespace), _initial_version(), timeout=None)
+
+
+def refill(key, value, timeout, stale_timeout=0):
+    """
+    Caches the value in `key`, for `get_or_refill`, e.g. after updating it.
+    With a `timeout` of None, it's kept until it's replaced (or evicted).
+    """
+    if timeout is None:
+        cache.set(key, (None, value), None)
+    else:
+        cache.set(key, (time.time() + timeout, value), timeout + stale_timeout)
+
+
+def get_or_refill(key, compute, timeout, stale_timeout=0):
+    """
+    Returns the value cached in `key`, or computes and caches it,
+    unless `compute()` returns None.
+
+    Only one caller at a time (per key) computes the value. While it does,
+    the others get the expired value, if it expired less than `stale_timeout`
+    seconds ago, or wait for the new one, instead of all hitting the database.
+    """
+    entry = cache.get(key)
+    if entry is not None and (entry[0] is None or entry[0] > time.time()):
+        return entry[1]
+
+    lock_key = "{}:lock".format(key)
+    is_locked = cache.add(lock_key, True, REFILL_TIMEOUT)
+    if not is_locked:
+        if entry is None:
+            entry = _wait_for_refill(key, lock_key)
+        if entry is not None:
+            return entry[1]
+
+    try:
+        value = compute()
+        if value is not None:
+            refill(key, value, timeout, stale_timeout)
+        return value
+    finally:
+        if is_locked:
+            cache.delete(lock_key)
+
+
+def _wait_for_refill(key, lock_key):
+    deadline = time.monotonic() + REFILL_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(REFILL_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(lock_key) is None:  # it wasn't cached, e.g. not found
+            return None
+    return None
+
+
+def get_response_cache_key(namespace, request):
+    url = request.build_absolute_uri().encode("utf-8")
+    return "{}:{}:{}".format(
+        namespace, get_cache_version(namespace), sha256(url).hexdigest()
+    )
+
+
+def cache_response(namespace, timeout, stale_timeout=0, anonymous_only=True):
+    """
+    Caches the successful responses of a view method, using `get_or_refill`.
+    Must only be used for responses that are the same for every user
+    (allowed by the permissions of the view), or with `anonymous_only`.
+
+    The cache key includes the full URL (with the query string),
+    and the version of the `namespace`, so the responses can be invalidated
+    with `bump_cache_version(namespace)`. The namespace may contain
+    placeholders for the URL arguments, e.g. `"event:{slug}"`.
+
+    The validator headers are cached too, so cached responses
+    still answer conditional GETs with 304 Not Modified.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if anonymous_only and request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            response = None
+
+            def compute():
+                nonlocal response
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return None
+                headers = {
+                    name: response[name]
+                    for name in VALIDATOR_HEADERS
+                    if response.has_header(name)
+                }
+                return response.data, headers
+
+            key = get_response_cache_key(namespace.format(**kwargs), request)
+            cached = get_or_refill(key, compute, timeout, stale_timeout)
+            if response is not None:
+                return response
+
+            data, headers = cached
+            response = get_not_modified_response(request, headers)
+            if response is None:
+                response = Response(data)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,90 @@
+from calendar import timegm
+from functools import wraps
+from hashlib import sha256
+
+from django.db.models import Subquery, Value
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+def subquery_aggregate(queryset, aggregate):
+    """
+    Returns an expression with the aggregate computed over the queryset,
+    which is usually correlated to the outer query, e.g.:
+
+    ```
+    Event.objects.annotate(
+        activities_updated_on=subquery_aggregate(
+            Activity.objects.filter(event=OuterRef("pk")), Max("updated_on")
+        )
+    )
+    ```
+    """
+    return Subquery(
+        queryset.order_by()
+        .annotate(group=Value(1))
+        .values("group")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+
+
+def get_validator_headers(etag_parts, last_modified=None):
+    """
+    Returns the `ETag` (built from a hash of `etag_parts`)
+    and `Last-Modified` headers.
+    """
+    etag = sha256(repr(tuple(etag_parts)).encode("utf-8")).hexdigest()
+    headers = {"ETag": quote_etag(etag)}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(timegm(last_modified.utctimetuple()))
+    return headers
+
+
+def get_not_modified_response(request, headers):
+    """
+    Returns a 304 Not Modified response, if the request preconditions
+    (`If-None-Match` and `If-Modified-Since`) match the validator headers.
+    Otherwise returns None.
+    """
+    return get_conditional_response(
+        request,
+        etag=headers.get("ETag"),
+        last_modified=parse_http_date_safe(headers.get("Last-Modified")),
+    )
+
+
+def conditional_response(get_validators):
+    """
+    Adds validators (`ETag` and `Last-Modified`) to the responses
+    of a view method, and answers conditional GETs with 304 Not Modified,
+    without running the view method.
+
+    `get_validators(view, request, *args, **kwargs)` must return
+    a tuple `(etag_parts, last_modified)`, or None, if the validators can't be
+    computed (e.g. the object doesn't exist), so the view method is run.
+    It should be cheap, usually a single query. The `etag_parts` are values that
+    change whenever the response would, and `last_modified` may be None,
+    when some of those changes aren't timestamped.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            validators = get_validators(self, request, *args, **kwargs)
+            if validators is None:
+                return view_method(self, request, *args, **kwargs)
+
+            headers = get_validator_headers(*validators)
+            response = get_not_modified_response(request, headers)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        return wrapper
+
+    return decorator
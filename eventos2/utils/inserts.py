@@ -0,0 +1,109 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, router
+from django.db.models.signals import post_save
+
+
+def insert_from_select(model, queryset, **values):
+    """
+    Inserts into the model's table a row for each object selected by the
+    queryset, in a single statement, skipping the rows that would violate
+    a unique constraint:
+
+    ```
+    INSERT INTO ... SELECT ... ON CONFLICT DO NOTHING RETURNING ...
+    ```
+
+    `values` maps the fields of the model to expressions over the queryset, e.g.:
+
+    ```
+    insert_from_select(
+        EventRegistration,
+        Event.objects.filter(slug=slug),
+        event=F("pk"),
+        user=Value(user.pk),
+    )
+    ```
+
+    Since the conditions are checked by the same statement that inserts
+    the rows, there's no race between checking and inserting.
+
+    Returns the inserted instances. As the rows aren't inserted by `save`,
+    `post_save` is sent for each of them, like `create` would.
+    """
+    db = queryset.db
+    fields = [model._meta.get_field(name) for name in values]
+
+    # The aliases can't clash with the fields of the queryset's model.
+    select = queryset.order_by().values(
+        **{"insert_{}".format(name): value for name, value in values.items()}
+    )
+    try:
+        select_sql, params = select.query.get_compiler(db).as_sql()
+    except EmptyResultSet:
+        return []
+
+    return _insert_ignoring_conflicts(model, db, fields, select_sql, params)
+
+
+def insert_objects(objs, batch_size=None):
+    """
+    Inserts the (unsaved) objects, like `bulk_create(ignore_conflicts=True)`,
+    skipping the rows that would violate a unique constraint:
+
+    ```
+    INSERT INTO ... VALUES ... ON CONFLICT DO NOTHING RETURNING ...
+    ```
+
+    Unlike `bulk_create`, returns the instances that were actually inserted,
+    with their primary keys, and sends `post_save` for each of them.
+    """
+    if not objs:
+        return []
+    model = type(objs[0])
+    db = router.db_for_write(model)
+    connection = connections[db]
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    placeholder = "({})".format(", ".join(["%s"] * len(fields)))
+    batch_size = batch_size or len(objs)
+
+    instances = []
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start : start + batch_size]
+        values_sql = "VALUES {}".format(", ".join([placeholder] * len(batch)))
+        params = [
+            field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+            for obj in batch
+            for field in fields
+        ]
+        instances.extend(
+            _insert_ignoring_conflicts(model, db, fields, values_sql, params)
+        )
+    return instances
+
+
+def _insert_ignoring_conflicts(model, db, fields, source_sql, params):
+    connection = connections[db]
+    quote_name = connection.ops.quote_name
+    columns = [model._meta.pk.column] + [field.column for field in fields]
+    sql = "INSERT INTO {} ({}) {} ON CONFLICT DO NOTHING RETURNING {}".format(  # nosec
+        quote_name(model._meta.db_table),
+        ", ".join(quote_name(field.column) for field in fields),
+        source_sql,
+        ", ".join(quote_name(column) for column in columns),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    field_names = [model._meta.pk.attname] + [field.attname for field in fields]
+    instances = [model.from_db(db, field_names, row) for row in rows]
+    for instance in instances:
+        post_save.send(
+            sender=model,
+            instance=instance,
+            created=True,
+            update_fields=None,
+            raw=False,
+            using=db,
+        )
+    return instances
@@ -0,0 +1,120 @@
+import logging
+import threading
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# The memo of the current request, or None outside of requests.
+_request_memo = ContextVar("request_memo", default=None)
+
+
+class RequestMemo:
+    def __init__(self):
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+
+
+class MemoStats:
+    """
+    How many calls to memoized functions were answered from the memo (`hits`),
+    instead of being evaluated (`misses`), since the process started.
+
+    Requests run in several threads of the same process (gthread workers),
+    so the counters are only changed through `record`, under a lock.
+    """
+
+    hits = 0
+    misses = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def record(cls, hit):
+        with cls._lock:
+            if hit:
+                cls.hits += 1
+            else:
+                cls.misses += 1
+
+
+def get_object_identity(obj):
+    # Model instances are identified by their primary key, so that
+    # the same row, even if loaded twice, shares the memoized results.
+    meta = getattr(obj, "_meta", None)
+    pk = getattr(obj, "pk", None)
+    if meta is not None and pk is not None:
+        return meta.label, pk
+    return type(obj), id(obj)
+
+
+def memoize_per_request(fn):
+    """
+    Memoizes a predicate with the signature `fn(user, obj=None)`,
+    by (predicate, user, object identity), until the end of the request.
+
+    Outside of requests (see `RequestMemoMiddleware`), nothing is memoized.
+    The memo must be cleared with `clear_request_memo` when the data
+    the predicate depends on is changed during the request.
+    """
+
+    @wraps(fn)
+    def wrapper(user, obj=None):
+        memo = _request_memo.get()
+        if memo is None:
+            return fn(user, obj)
+
+        key = (
+            fn,
+            getattr(user, "pk", None),
+            None if obj is None else get_object_identity(obj),
+        )
+        if key in memo.results:
+            memo.hits += 1
+            MemoStats.record(hit=True)
+            return memo.results[key]
+
+        memo.misses += 1
+        MemoStats.record(hit=False)
+        result = memo.results[key] = fn(user, obj)
+        return result
+
+    return wrapper
+
+
+def clear_request_memo():
+    memo = _request_memo.get()
+    if memo is not None:
+        memo.results.clear()
+
+
+class RequestMemoMiddleware:
+    """
+    Enables `memoize_per_request` during each request.
+
+    In debug mode, the number of evaluations saved is added to the response,
+    in the `X-Memo-Hits` header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        memo = RequestMemo()
+        token = _request_memo.set(memo)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_memo.reset(token)
+
+        logger.debug(
+            "Request memo: %d hits, %d misses (%s)",
+            memo.hits,
+            memo.misses,
+            request.path,
+        )
+        if settings.DEBUG:  # pragma: no cover - debugging
+            response["X-Memo-Hits"] = str(memo.hits)
+        return response
@@ -0,0 +1,142 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    Unlike DjangoJSONEncoder, keeps the microseconds of times,
+    so that they can be compared exactly with the database values.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime, time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination for custom list actions.
+
+    It is opt-in: the results are only paginated when the client sends
+    the `page_size` or `cursor` query parameters. Otherwise the plain list
+    is returned, as before, so clients can switch over one endpoint at a time.
+
+    The queryset must be ordered by its sort keys, ending with a unique one,
+    such as `("title", "id")`. The cursor encodes the values of these keys
+    for the last row of the page, so the next page is fetched with a
+    `WHERE (title, id) > (...)` filter instead of an OFFSET.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor."
+
+    def is_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = list(queryset.query.order_by)
+        if not self.ordering:  # pragma: no cover - internal use
+            raise RuntimeError("KeysetPagination requires an ordered queryset.")
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+
+        page_size = self.get_page_size(request)
+        results = list(queryset[: page_size + 1])
+
+        self.next_position = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            self.next_position = [
+                self.get_value(results[-1], field) for field in self.ordering
+            ]
+        return results
+
+    def get_position_filter(self, position):
+        # (a, b) > (x, y) is the same as: a > x OR (a = x AND b > y)
+        position_filter = Q()
+        equal_to = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            position_filter |= Q(**equal_to, **{"{}__{}".format(name, lookup): value})
+            equal_to[name] = value
+        return position_filter
+
+    @staticmethod
+    def get_value(obj, field):
+        for attr in field.lstrip("-").split("__"):
+            obj = getattr(obj, attr)
+        return obj
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+        except ValueError:  # includes base64, unicode and JSON decoding errors
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        data = json.dumps(position, cls=CursorJSONEncoder).encode("utf-8")
+        return urlsafe_b64encode(data).decode("ascii")
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)])
+        )
+
+
+# To be used in the `extend_schema` of paginated actions.
+KEYSET_PAGINATION_PARAMETERS = [
+    OpenApiParameter(
+        KeysetPagination.cursor_query_param,
+        description="The pagination cursor value.",
+    ),
+    OpenApiParameter(
+        KeysetPagination.page_size_query_param,
+        type=int,
+        description="Number of results to return per page. Enables pagination.",
+    ),
+]
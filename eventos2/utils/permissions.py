@@ -2,6 +2,8 @@ import warnings
 
 from rest_framework.permissions import BasePermission
 
+from eventos2.utils.predicates import permission_to_q
+
 
 class PerActionPermissions(BasePermission):
     """
@@ -117,3 +119,32 @@ class PerActionPermissions(BasePermission):
             perms = [perms]
 
         return request.user.has_perms(perms, obj)
+
+    def filter_queryset_by_permission(self, request, view, queryset):
+        """
+        Restringe o queryset aos objetos para os quais o usuário tem
+        as permissões à nivel de objeto da ação atual, em SQL,
+        sem carregar os objetos para verificá-los um a um.
+
+        Os predicados das permissões devem poder ser compilados em objetos `Q`
+        (veja `FilterablePredicate`).
+        """
+        perms = self.get_required_permissions(view)
+        if perms is self.ALLOW_ANY:
+            return queryset
+        elif perms is self.DENY_ALL:
+            return queryset.none()
+
+        user = request.user
+        if not user or not user.is_authenticated or not user.is_active:
+            return queryset.none()
+        if user.is_superuser:
+            # Como em `User.has_perm`, superusuários ativos têm todas as permissões.
+            return queryset
+
+        if isinstance(perms, str):
+            perms = [perms]
+
+        for perm in perms:
+            queryset = queryset.filter(permission_to_q(perm, user, queryset.model))
+        return queryset
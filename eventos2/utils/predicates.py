@@ -0,0 +1,111 @@
+from collections import deque
+from functools import lru_cache
+
+import rules
+from django.db.models import Q
+
+# Selects no objects.
+NOTHING = Q(pk__in=[])
+
+
+class FilterablePredicate(rules.Predicate):
+    """
+    A predicate that can also be compiled into a `Q` object,
+    selecting the objects of a model for which it's true,
+    so that querysets can be filtered by it in SQL.
+
+    `to_q(user, model)` returns the `Q` object. Predicates combined with
+    `&`, `|` and `~` can be compiled too, as long as all of them can.
+    """
+
+    def __init__(self, fn, name=None, bind=False, to_q=None):
+        super().__init__(fn, name, bind)
+        self.to_q = to_q
+
+    def __and__(self, other):
+        combined = super().__and__(other)
+        combined.to_q = lambda user, model: predicate_to_q(
+            self, user, model
+        ) & predicate_to_q(other, user, model)
+        return combined
+
+    def __or__(self, other):
+        combined = super().__or__(other)
+        combined.to_q = lambda user, model: predicate_to_q(
+            self, user, model
+        ) | predicate_to_q(other, user, model)
+        return combined
+
+    def __invert__(self):
+        inverted = super().__invert__()
+        inverted.to_q = lambda user, model: ~predicate_to_q(self, user, model)
+        return inverted
+
+
+def filterable_predicate(to_q):
+    """
+    Like `rules.predicate`, but creates a `FilterablePredicate`.
+    """
+
+    def decorator(fn):
+        return FilterablePredicate(fn, to_q=to_q)
+
+    return decorator
+
+
+# Q objects for the predicates that come with django-rules.
+BUILTIN_PREDICATE_FILTERS = {
+    rules.always_allow: lambda user, model: Q(),
+    rules.always_true: lambda user, model: Q(),
+    rules.always_deny: lambda user, model: NOTHING,
+    rules.always_false: lambda user, model: NOTHING,
+    rules.is_authenticated: lambda user, model: (
+        Q() if user.is_authenticated else NOTHING
+    ),
+}
+
+
+def predicate_to_q(predicate, user, model):
+    to_q = getattr(predicate, "to_q", None) or BUILTIN_PREDICATE_FILTERS.get(predicate)
+    if to_q is None:
+        raise TypeError(
+            "The predicate {} can't be compiled into a Q object.".format(predicate.name)
+        )
+    return to_q(user, model)
+
+
+def permission_to_q(permission, user, model):
+    """
+    Returns a `Q` object selecting the objects of the model
+    for which the user has the (object-level) permission.
+    """
+    if not rules.perm_exists(permission):
+        return NOTHING
+    return predicate_to_q(rules.permissions.permissions[permission], user, model)
+
+
+@lru_cache(maxsize=None)
+def get_lookup_path(model, target):
+    """
+    Returns the shortest lookup path following foreign keys from `model`
+    to `target`, e.g. `"track__event"` from `Submission` to `Event`,
+    or an empty string if they're the same model.
+    """
+    queue = deque([(model, "")])
+    visited = {model}
+    while queue:
+        current, path = queue.popleft()
+        if current is target:
+            return path
+        for field in current._meta.concrete_fields:
+            related = field.related_model
+            if field.many_to_one and related not in visited:
+                visited.add(related)
+                queue.append((related, join_lookup(path, field.name)))
+    raise LookupError(
+        "There's no path from {} to {}.".format(model.__name__, target.__name__)
+    )
+
+
+def join_lookup(*parts):
+    return "__".join(part for part in parts if part)
@@ -0,0 +1,60 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.functions import Cast, Greatest
+
+# No stemming, since the texts may be in several languages.
+SEARCH_CONFIG = "simple"
+
+
+class ImmutableUnaccent(Func):
+    """
+    Wrapper for `unaccent` that is declared as immutable,
+    so it can be used in index expressions and generated columns.
+    The function is created by a migration in the core app.
+    """
+
+    function = "immutable_unaccent"
+    arity = 1
+
+
+def search_by_text(queryset, text, *, vector_field, trigram_fields):
+    """
+    Filters the queryset by `text`, and annotates each row with a
+    `search_rank` (higher is more relevant).
+
+    Rows match if the text matches the full-text search vector,
+    or if it is similar to a word in one of the `trigram_fields`,
+    which tolerates typos and partial words. Both sides are unaccented.
+
+    For the search to be fast, the model must have a GIN index on the
+    `vector_field`, and GIN `gin_trgm_ops` indexes on `ImmutableUnaccent(field)`
+    for each of the `trigram_fields`.
+    """
+    query = SearchQuery(
+        ImmutableUnaccent(Value(text)), config=SEARCH_CONFIG, search_type="websearch"
+    )
+    unaccented_text = ImmutableUnaccent(Value(text))
+
+    matches = Q(**{vector_field: query})
+    similarities = []
+    for field in trigram_fields:
+        alias = "{}_unaccented".format(field)
+        queryset = queryset.alias(**{alias: ImmutableUnaccent(field)})
+        matches |= Q(**{"{}__trigram_word_similar".format(alias): unaccented_text})
+        similarities.append(TrigramWordSimilarity(unaccented_text, F(alias)))
+
+    # ts_rank returns a real, which is cast so the rank survives a round trip
+    # to Python unchanged (e.g. when used as a pagination key).
+    rank = SearchRank(F(vector_field), query)
+    if similarities:
+        rank = rank + (
+            Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        )
+
+    return queryset.filter(matches).annotate(
+        search_rank=Cast(rank, output_field=FloatField())
+    )
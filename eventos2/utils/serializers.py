@@ -7,3 +7,17 @@ class ReadOnlyModelSerializer(serializers.ModelSerializer):
         for field in fields:
             fields[field].read_only = True
         return fields
+
+
+class EagerLoadingMixin:
+    """
+    Permite que o serializer declare quais relações devem ser carregadas
+    junto com os objetos serializados, evitando uma query por objeto (N+1).
+
+    Serializers que acessam relações devem sobrescrever `setup_eager_loading`,
+    aplicando `select_related` e `prefetch_related` ao queryset recebido.
+    """
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset
@@ -0,0 +1,110 @@
+import csv
+import re
+import zipfile
+from html import escape
+
+# Control characters are not allowed in XML.
+XML_ILLEGAL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+OPENXML = "http://schemas.openxmlformats.org"
+NS_CONTENT_TYPES = OPENXML + "/package/2006/content-types"
+NS_PACKAGE_RELATIONSHIPS = OPENXML + "/package/2006/relationships"
+NS_RELATIONSHIPS = OPENXML + "/officeDocument/2006/relationships"
+NS_SPREADSHEET = OPENXML + "/spreadsheetml/2006/main"
+
+CONTENT_TYPE_RELATIONSHIPS = "application/vnd.openxmlformats-package.relationships+xml"
+CONTENT_TYPE_SPREADSHEET = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+
+XLSX_CONTENT_TYPES = (
+    XML_DECLARATION
+    + '<Types xmlns="{}">'.format(NS_CONTENT_TYPES)
+    + '<Default Extension="rels" ContentType="{}"/>'.format(CONTENT_TYPE_RELATIONSHIPS)
+    + '<Default Extension="xml" ContentType="application/xml"/>'
+    + '<Override PartName="/xl/workbook.xml" ContentType="{}"/>'.format(
+        CONTENT_TYPE_SPREADSHEET + ".sheet.main+xml"
+    )
+    + '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="{}"/>'.format(
+        CONTENT_TYPE_SPREADSHEET + ".worksheet+xml"
+    )
+    + "</Types>"
+)
+
+XLSX_ROOT_RELS = (
+    XML_DECLARATION
+    + '<Relationships xmlns="{}">'.format(NS_PACKAGE_RELATIONSHIPS)
+    + '<Relationship Id="rId1" Type="{}" Target="xl/workbook.xml"/>'.format(
+        NS_RELATIONSHIPS + "/officeDocument"
+    )
+    + "</Relationships>"
+)
+
+XLSX_WORKBOOK = (
+    XML_DECLARATION
+    + '<workbook xmlns="{}" xmlns:r="{}">'.format(NS_SPREADSHEET, NS_RELATIONSHIPS)
+    + '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    + "</workbook>"
+)
+
+XLSX_WORKBOOK_RELS = (
+    XML_DECLARATION
+    + '<Relationships xmlns="{}">'.format(NS_PACKAGE_RELATIONSHIPS)
+    + '<Relationship Id="rId1" Type="{}" Target="worksheets/sheet1.xml"/>'.format(
+        NS_RELATIONSHIPS + "/worksheet"
+    )
+    + "</Relationships>"
+)
+
+XLSX_SHEET_HEADER = XML_DECLARATION + '<worksheet xmlns="{}"><sheetData>'.format(
+    NS_SPREADSHEET
+)
+
+XLSX_SHEET_FOOTER = "</sheetData></worksheet>"
+
+
+def write_csv(path, header, rows):
+    """
+    Writes the rows (any iterable) to a CSV file, one row at a time.
+    """
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+
+
+def _xlsx_cell(value):
+    if isinstance(value, bool) or value is None:
+        value = "" if value is None else str(value)
+    if isinstance(value, (int, float)):
+        return "<c><v>{}</v></c>".format(value)
+    text = escape(XML_ILLEGAL_CHARACTERS.sub("", str(value)))
+    return '<c t="inlineStr"><is><t xml:space="preserve">{}</t></is></c>'.format(text)
+
+
+def _xlsx_row(values):
+    return "<row>{}</row>".format("".join(_xlsx_cell(x) for x in values))
+
+
+def write_xlsx(path, header, rows, sheet_name="Sheet1"):
+    """
+    Writes the rows (any iterable) to a single-sheet XLSX file.
+
+    The worksheet is written to the zip file as the rows are read,
+    using inline strings, so the rows are never all held in memory.
+    """
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        package.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        package.writestr(
+            "xl/workbook.xml", XLSX_WORKBOOK.format(sheet_name=escape(sheet_name))
+        )
+        package.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+
+        with package.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(XLSX_SHEET_HEADER.encode("utf-8"))
+            sheet.write(_xlsx_row(header).encode("utf-8"))
+            for row in rows:
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+            sheet.write(XLSX_SHEET_FOOTER.encode("utf-8"))
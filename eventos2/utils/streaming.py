@@ -0,0 +1,53 @@
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+
+def iterate_in_chunks(queryset, chunk_size):
+    """
+    Reads the queryset using a server-side cursor, yielding lists of
+    up to `chunk_size` objects, with their `prefetch_related` lookups loaded.
+    """
+    prefetch_lookups = queryset._prefetch_related_lookups
+    iterator = queryset.prefetch_related(None).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        prefetch_related_objects(chunk, *prefetch_lookups)
+        yield chunk
+
+
+def render_json_list(queryset, serializer_class, context=None, chunk_size=500):
+    """
+    Renders the queryset as a JSON array, one chunk of objects at a time.
+    """
+    renderer = JSONRenderer()
+
+    yield b"["
+    is_first = True
+    for chunk in iterate_in_chunks(queryset, chunk_size):
+        data = serializer_class(chunk, many=True, context=context).data
+        if not is_first:
+            yield b","
+        # the chunk is rendered as an array, without the enclosing brackets
+        yield renderer.render(data)[1:-1]
+        is_first = False
+    yield b"]"
+
+
+class StreamingJSONListResponse(StreamingHttpResponse):
+    """
+    Streams a JSON array with the serialized objects from the queryset.
+
+    Only a chunk of objects is held in memory at a time, and the first bytes
+    are sent before the whole queryset is serialized.
+    """
+
+    def __init__(self, queryset, serializer_class, context=None, chunk_size=500):
+        super().__init__(
+            render_json_list(queryset, serializer_class, context, chunk_size),
+            content_type="application/json",
+        )
@@ -1,6 +1,9 @@
 from rest_framework import mixins, status, viewsets
 from rest_framework.response import Response
 
+from eventos2.utils.pagination import KeysetPagination
+from eventos2.utils.streaming import StreamingJSONListResponse
+
 
 class CreateModelMixin:
     """
@@ -26,7 +29,77 @@ class UpdateModelMixin(object):
         return mixins.UpdateModelMixin.perform_update(self, serializer)
 
 
+class ListActionMixin:
+    """
+    Helpers for custom actions that return a list of objects.
+
+    Actions listed in `stream_list_actions` have their (unpaginated) responses
+    streamed, `stream_chunk_size` objects at a time, instead of being
+    serialized and rendered all at once.
+    """
+
+    list_pagination_class = KeysetPagination
+    stream_list_actions = []
+    stream_chunk_size = 500
+
+    def filter_queryset_by_permission(self, queryset):
+        """
+        Filters the queryset by the permission classes of the view
+        that can do it, e.g. `PerActionPermissions`.
+        """
+        for permission in self.get_permissions():
+            filter_queryset = getattr(permission, "filter_queryset_by_permission", None)
+            if filter_queryset is not None:
+                queryset = filter_queryset(self.request, self, queryset)
+        return queryset
+
+    def get_list_response(
+        self, queryset, serializer_class, ordering=None, always_paginate=False
+    ):
+        """
+        Serializes the queryset, applying the eager loading plan
+        declared by the serializer (see `EagerLoadingMixin`), if any.
+
+        The queryset is restricted, in SQL, to the objects the user has
+        the permissions of the action for (see `filter_queryset_by_permission`).
+
+        When an `ordering` is given, ending with a unique field,
+        the client may request the results to be paginated
+        (see `KeysetPagination`), or they always are, with `always_paginate`.
+        """
+        queryset = self.filter_queryset_by_permission(queryset)
+
+        setup_eager_loading = getattr(serializer_class, "setup_eager_loading", None)
+        if setup_eager_loading is not None:
+            queryset = setup_eager_loading(queryset)
+
+        paginator = None
+        if ordering is not None:
+            queryset = queryset.order_by(*ordering)
+            paginator = self.list_pagination_class()
+            if always_paginate or paginator.is_requested(self.request):
+                queryset = paginator.paginate_queryset(queryset, self.request, self)
+            else:
+                paginator = None
+
+        if paginator is None and self.action in self.stream_list_actions:
+            return StreamingJSONListResponse(
+                queryset,
+                serializer_class,
+                context=self.get_serializer_context(),
+                chunk_size=self.stream_chunk_size,
+            )
+
+        serializer = serializer_class(
+            queryset, many=True, context=self.get_serializer_context()
+        )
+        if paginator is not None:
+            return paginator.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+
 class CViewSet(
+    ListActionMixin,
     CreateModelMixin,
     viewsets.GenericViewSet,
 ):
@@ -36,6 +109,7 @@ class CViewSet(
 
 
 class CUDViewSet(
+    ListActionMixin,
     CreateModelMixin,
     UpdateModelMixin,
     mixins.DestroyModelMixin,
@@ -47,6 +121,7 @@ class CUDViewSet(
 
 
 class CRUDViewSet(
+    ListActionMixin,
     CreateModelMixin,
     mixins.RetrieveModelMixin,
     UpdateModelMixin,
@@ -1,9 +1,12 @@
+import json
 from datetime import timedelta
 
 import dateutil
 import pytest
 from django.contrib.auth.models import Permission
+from django.core.cache import cache
 from django.utils import timezone
+from huey.contrib.djhuey import HUEY
 from rest_framework.test import APIClient
 
 from eventos2.core.models import (
@@ -19,6 +22,23 @@ from eventos2.core.models import (
 from eventos2.media.models import Document
 
 
+@pytest.fixture(autouse=True)
+def huey_immediate():
+    """
+    Executa as tasks do Huey imediatamente, no mesmo processo,
+    sem depender de um Redis e de um consumer.
+    """
+    HUEY.immediate = True
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Limpa o cache (em memória, nos testes) antes de cada teste.
+    """
+    cache.clear()
+
+
 @pytest.fixture()
 def api_client():
     """
@@ -68,7 +88,7 @@ def event_factory():
 
 @pytest.fixture
 def activity_factory():
-    def _factory(*, event, name, owners, starts_on=None, ends_on=None):
+    def _factory(*, event, name, owners, starts_on=None, ends_on=None, capacity=None):
         default_starts_on = timezone.now()
         default_ends_on = default_starts_on + timedelta(days=10)
         activity = Activity.objects.create(
@@ -76,6 +96,8 @@ def activity_factory():
             name=name,
             starts_on=starts_on or default_starts_on,
             ends_on=ends_on or default_ends_on,
+            capacity=capacity,
+            remaining_seats=capacity,
         )
         activity.owners.add(*owners)
         return activity
@@ -166,3 +188,15 @@ def parse_to_aware_datetime():
         return timezone.make_aware(dateutil.parser.parse(s))
 
     return _func
+
+
+@pytest.fixture
+def read_streaming_json():
+    """
+    Lê o corpo JSON de uma resposta em streaming (StreamingHttpResponse).
+    """
+
+    def _func(resp):
+        return json.loads(b"".join(resp.streaming_content))
+
+    return _func
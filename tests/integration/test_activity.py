@@ -1,11 +1,18 @@
 from datetime import timedelta
+from unittest import mock
 
 import pytest
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 
-from eventos2.core.models import Activity, ActivityRegistration, EventRegistration
+from eventos2.core.models import (
+    Activity,
+    ActivityRegistration,
+    ActivityWaitlistEntry,
+    EventRegistration,
+)
+from eventos2.core.serializers import ActivitySerializer
 
 
 @pytest.mark.django_db
@@ -152,6 +159,38 @@ def test_retrieve_valid(api_client, user_factory, event_factory, activity_factor
     assert resp.data["is_open"] is False
 
 
+@pytest.mark.django_db
+def test_retrieve_conditional(
+    api_client, user_factory, event_factory, activity_factory
+):
+    # DADO um usuário, e uma activity já obtida anteriormente.
+    user = user_factory(name="user", permissions=["core.view_activities_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+    activity = activity_factory(event=event, name="Activity A", owners=[])
+    resp = api_client.get(reverse("activity-detail", args=[activity.id]))
+    etag = resp["ETag"]
+
+    # QUANDO a API é chamada novamente, com o ETag.
+    resp = api_client.get(
+        reverse("activity-detail", args=[activity.id]), HTTP_IF_NONE_MATCH=etag
+    )
+
+    # ENTÃO a resposta é 304.
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # QUANDO a activity é alterada.
+    activity.name = "Activity A (updated)"
+    activity.save()
+
+    # ENTÃO a activity é retornada novamente.
+    resp = api_client.get(
+        reverse("activity-detail", args=[activity.id]), HTTP_IF_NONE_MATCH=etag
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["name"] == "Activity A (updated)"
+
+
 @pytest.mark.django_db
 def test_retrieve_unauthorized(api_client, event_factory, activity_factory):
     # DADO nenhum usuário autenticado
@@ -333,3 +372,211 @@ def test_list_registrations_unauthorized(
 
     # ENTÃO a resposta deve ser de falta de permissões
     assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_update_capacity(api_client, user_factory, event_factory, activity_factory):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=["core.change_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO uma activity com duas inscrições.
+    activity = activity_factory(
+        event=event,
+        name="Activity A",
+        owners=[],
+        starts_on=event.starts_on,
+        ends_on=event.ends_on,
+    )
+    for name in ["a", "b"]:
+        ActivityRegistration.objects.create(
+            activity=activity,
+            event_registration=EventRegistration.objects.create(
+                event=event, user=user_factory(name=name, permissions=[])
+            ),
+        )
+
+    # QUANDO a API é chamada para limitar a activity a cinco vagas.
+    resp = api_client.put(
+        reverse("activity-detail", args=[activity.id]),
+        {
+            "name": activity.name,
+            "starts_on": activity.starts_on,
+            "ends_on": activity.ends_on,
+            "capacity": 5,
+        },
+    )
+
+    # ENTÃO as vagas restantes devem descontar as inscrições existentes.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["capacity"] == 5
+    assert resp.data["remaining_seats"] == 3
+
+
+@pytest.mark.django_db
+def test_update_keeps_seats_taken_concurrently(
+    api_client, user_factory, event_factory, activity_factory
+):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=["core.change_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO uma activity com três vagas.
+    activity = activity_factory(
+        event=event,
+        name="Activity A",
+        owners=[],
+        starts_on=event.starts_on,
+        ends_on=event.ends_on,
+        capacity=3,
+    )
+    # E DADO que uma vaga é tomada depois da activity ser lida.
+    update = ActivitySerializer.update
+
+    def take_seat_and_update(self, instance, validated_data):
+        Activity.objects.filter(pk=instance.pk).take_seat()
+        return update(self, instance, validated_data)
+
+    # QUANDO a API é chamada para alterar a activity, sem alterar as vagas.
+    with mock.patch.object(ActivitySerializer, "update", take_seat_and_update):
+        resp = api_client.put(
+            reverse("activity-detail", args=[activity.id]),
+            {
+                "name": "Activity B",
+                "starts_on": activity.starts_on,
+                "ends_on": activity.ends_on,
+            },
+        )
+
+    # ENTÃO a vaga tomada não deve ser sobrescrita.
+    assert resp.status_code == status.HTTP_200_OK
+    activity.refresh_from_db()
+    assert activity.name == "Activity B"
+    assert activity.remaining_seats == 2
+
+    # E ENTÃO remover a activity também não deve sobrescrevê-la.
+    Activity.objects.filter(pk=activity.pk).release_seat()
+    activity.delete()
+    activity.refresh_from_db()
+    assert activity.deleted_on is not None
+    assert activity.remaining_seats == 3
+
+
+@pytest.mark.django_db
+def test_update_capacity_promotes_waitlist(
+    api_client,
+    user_factory,
+    event_factory,
+    activity_factory,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=["core.change_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO uma activity lotada, com uma inscrição e um usuário na fila de espera.
+    activity = activity_factory(
+        event=event,
+        name="Activity A",
+        owners=[],
+        starts_on=event.starts_on,
+        ends_on=event.ends_on,
+        capacity=1,
+    )
+    Activity.objects.filter(pk=activity.pk).update(remaining_seats=0)
+    ActivityRegistration.objects.create(
+        activity=activity,
+        event_registration=EventRegistration.objects.create(
+            event=event, user=user_factory(name="a", permissions=[])
+        ),
+    )
+    waitlisted = EventRegistration.objects.create(
+        event=event, user=user_factory(name="b", permissions=[])
+    )
+    ActivityWaitlistEntry.objects.create(
+        activity=activity, event_registration=waitlisted
+    )
+
+    # QUANDO a API é chamada para aumentar as vagas da activity.
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.put(
+            reverse("activity-detail", args=[activity.id]),
+            {
+                "name": activity.name,
+                "starts_on": activity.starts_on,
+                "ends_on": activity.ends_on,
+                "capacity": 2,
+            },
+        )
+
+    # ENTÃO o usuário na fila de espera deve ser inscrito na nova vaga.
+    assert resp.status_code == status.HTTP_200_OK
+    assert ActivityRegistration.objects.filter(
+        activity=activity, event_registration=waitlisted
+    ).exists()
+    assert not ActivityWaitlistEntry.objects.filter(activity=activity).exists()
+    activity.refresh_from_db()
+    assert activity.remaining_seats == 0
+
+
+@pytest.mark.django_db
+def test_update_unlimited_capacity_registers_waitlist(
+    api_client,
+    user_factory,
+    event_factory,
+    activity_factory,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=["core.change_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO uma activity lotada, com dois usuários na fila de espera,
+    # um dos quais já se inscreveu enquanto esperava.
+    activity = activity_factory(
+        event=event,
+        name="Activity A",
+        owners=[],
+        starts_on=event.starts_on,
+        ends_on=event.ends_on,
+        capacity=1,
+    )
+    Activity.objects.filter(pk=activity.pk).update(remaining_seats=0)
+    waitlisted = [
+        EventRegistration.objects.create(
+            event=event, user=user_factory(name=name, permissions=[])
+        )
+        for name in ["a", "b"]
+    ]
+    for event_registration in waitlisted:
+        ActivityWaitlistEntry.objects.create(
+            activity=activity, event_registration=event_registration
+        )
+    ActivityRegistration.objects.create(
+        activity=activity, event_registration=waitlisted[1]
+    )
+
+    # QUANDO a API é chamada para remover o limite de vagas da activity.
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.put(
+            reverse("activity-detail", args=[activity.id]),
+            {
+                "name": activity.name,
+                "starts_on": activity.starts_on,
+                "ends_on": activity.ends_on,
+                "capacity": None,
+            },
+            format="json",
+        )
+
+    # ENTÃO todos os usuários na fila de espera devem ser inscritos, em ordem.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["capacity"] is None
+    assert list(
+        ActivityRegistration.objects.filter(activity=activity)
+        .order_by("id")
+        .values_list("event_registration", flat=True)
+    ) == [waitlisted[1].pk, waitlisted[0].pk]
+    assert not ActivityWaitlistEntry.objects.filter(activity=activity).exists()
+    activity.refresh_from_db()
+    assert activity.remaining_seats is None
@@ -1,8 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
 import pytest
+from django.db import connection
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.test import APIClient
 
-from eventos2.core.models import ActivityRegistration, EventRegistration
+from eventos2.core.models import (
+    ActivityRegistration,
+    ActivityWaitlistEntry,
+    EventRegistration,
+)
+from eventos2.core.serializers import ActivityRegistrationDetailSerializer
 
 
 @pytest.mark.django_db
@@ -203,3 +214,239 @@ def test_list_registrations_for_user_and_event(
     assert resp.status_code == status.HTTP_200_OK
     assert len(resp.data) == 1
     assert resp.data[0]["activity"]["id"] == activity_a.id
+
+
+@pytest.mark.django_db
+def test_register_after_event_registration(
+    api_client, activity_factory, event_factory, user_factory, django_assert_num_queries
+):
+    # DADO um usuário autenticado, um evento, e uma activity no evento.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+    activity = activity_factory(event=event, name="Activity A", owners=[])
+
+    # QUANDO a API é chamada para registrar o usuário no evento,
+    # e em seguida na activity.
+    resp = api_client.post(
+        reverse("event-registration-list"), {"event_slug": event.slug}
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    with django_assert_num_queries(3) as queries:
+        resp = api_client.post(
+            reverse("activity-registration-list"), {"activity": activity.id}
+        )
+
+    # ENTÃO a reposta deve ser de sucesso
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["activity"]["id"] == activity.id
+    # E ENTÃO a registration deve ser criada em um único comando.
+    assert sum(q["sql"].startswith("INSERT") for q in queries.captured_queries) == 1
+    assert ActivityRegistration.objects.get().event_registration.user == user
+
+
+@pytest.mark.django_db
+def test_register_full_activity_waitlist(
+    api_client,
+    activity_factory,
+    event_factory,
+    user_factory,
+    django_capture_on_commit_callbacks,
+):
+    # DADO três usuários registrados em um evento,
+    # e uma activity no evento com uma vaga.
+    event = event_factory(slug="event-a", owners=[])
+    users = [user_factory(name=name, permissions=[]) for name in "abc"]
+    for user in users:
+        EventRegistration.objects.create(event=event, user=user)
+    activity = activity_factory(event=event, name="Activity A", owners=[], capacity=1)
+
+    # QUANDO os três usuários se registram na activity.
+    responses = []
+    for user in users:
+        api_client.force_authenticate(user=user)
+        responses.append(
+            api_client.post(
+                reverse("activity-registration-list"), {"activity": activity.id}
+            )
+        )
+
+    # ENTÃO o primeiro deve ocupar a vaga.
+    assert responses[0].status_code == status.HTTP_200_OK
+    assert responses[0].data["activity"]["remaining_seats"] == 0
+    # E ENTÃO os demais devem entrar na lista de espera, em ordem.
+    assert [resp.status_code for resp in responses[1:]] == [
+        status.HTTP_202_ACCEPTED,
+        status.HTTP_202_ACCEPTED,
+    ]
+    assert [resp.data["position"] for resp in responses[1:]] == [1, 2]
+    assert ActivityRegistration.objects.count() == 1
+
+    # E QUANDO o primeiro usuário remove o seu registro.
+    api_client.force_authenticate(user=users[0])
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.delete(
+            reverse("activity-registration-detail", args=[responses[0].data["id"]])
+        )
+    assert resp.status_code == status.HTTP_204_NO_CONTENT
+
+    # ENTÃO o primeiro da lista de espera deve ocupar a vaga.
+    registration = ActivityRegistration.objects.get()
+    assert registration.event_registration.user == users[1]
+    assert ActivityWaitlistEntry.objects.get().event_registration.user == users[2]
+    activity.refresh_from_db()
+    assert activity.remaining_seats == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_register_concurrent_capacity(activity_factory, event_factory, user_factory):
+    # DADO vinte usuários registrados em um evento,
+    # e uma activity no evento com cinco vagas.
+    event = event_factory(slug="event-a", owners=[])
+    users = [user_factory(name="user{}".format(i), permissions=[]) for i in range(20)]
+    for user in users:
+        EventRegistration.objects.create(event=event, user=user)
+    activity = activity_factory(event=event, name="Activity A", owners=[], capacity=5)
+
+    def register(user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        try:
+            return client.post(
+                reverse("activity-registration-list"), {"activity": activity.id}
+            ).status_code
+        finally:
+            connection.close()
+
+    # QUANDO todos se registram na activity ao mesmo tempo.
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        status_codes = list(executor.map(register, users))
+
+    # ENTÃO apenas cinco devem ocupar as vagas, e os demais devem esperar.
+    assert status_codes.count(status.HTTP_200_OK) == 5
+    assert status_codes.count(status.HTTP_202_ACCEPTED) == 15
+    assert ActivityRegistration.objects.count() == 5
+    assert ActivityWaitlistEntry.objects.count() == 15
+    activity.refresh_from_db()
+    assert activity.remaining_seats == 0
+
+
+@pytest.mark.django_db
+def test_register_many(
+    api_client, activity_factory, event_factory, user_factory, django_assert_num_queries
+):
+    # DADO um usuário autenticado, e um evento no qual ele está registrado.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+    event_registration = EventRegistration.objects.create(event=event, user=user)
+    # E DADO atividades abertas, com e sem vagas, uma encerrada,
+    # e uma na qual o usuário já está registrado.
+    now = timezone.now()
+    open_a = activity_factory(event=event, name="Open A", owners=[])
+    open_b = activity_factory(event=event, name="Open B", owners=[], capacity=10)
+    full = activity_factory(event=event, name="Full", owners=[], capacity=0)
+    closed = activity_factory(
+        event=event,
+        name="Closed",
+        owners=[],
+        starts_on=now - timedelta(days=2),
+        ends_on=now - timedelta(days=1),
+    )
+    registered = activity_factory(event=event, name="Registered", owners=[])
+    ActivityRegistration.objects.create(
+        activity=registered, event_registration=event_registration
+    )
+    activity_ids = [open_a.id, open_b.id, full.id, closed.id, registered.id, 0]
+
+    # QUANDO a API é chamada para registrar o usuário em todas as atividades.
+    # ENTÃO as atividades devem ser validadas com uma única query,
+    # e os registros criados com um único insert
+    # (os savepoints só existem por causa da transação do teste).
+    with django_assert_num_queries(8) as queries:
+        resp = api_client.post(
+            reverse("activity-registration-create-many"), {"activities": activity_ids}
+        )
+    inserts = [
+        q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT")
+    ]
+    assert len(inserts) == 2  # registrations, and the waitlist
+
+    # E ENTÃO a resposta deve conter o resultado para cada atividade.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [(x["activity"], x["result"]) for x in resp.data] == [
+        (open_a.id, "created"),
+        (open_b.id, "created"),
+        (full.id, "waitlisted"),
+        (closed.id, "closed"),
+        (registered.id, "already_registered"),
+        (0, "not_found"),
+    ]
+    registrations = ActivityRegistration.objects.filter(
+        event_registration=event_registration
+    )
+    assert set(registrations.values_list("activity", flat=True)) == {
+        open_a.id,
+        open_b.id,
+        registered.id,
+    }
+    assert resp.data[0]["registration_id"] == registrations.get(activity=open_a).id
+    # E ENTÃO as vagas devem ser descontadas.
+    open_b.refresh_from_db()
+    assert open_b.remaining_seats == 9
+    assert ActivityWaitlistEntry.objects.get().activity == full
+
+
+@pytest.mark.django_db
+def test_register_many_not_registered_to_event(
+    api_client, activity_factory, event_factory, user_factory
+):
+    # DADO um usuário autenticado, e um evento no qual ele não está registrado.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+    activity = activity_factory(event=event, name="Activity A", owners=[])
+
+    # QUANDO a API é chamada para registrar o usuário na atividade.
+    resp = api_client.post(
+        reverse("activity-registration-create-many"), {"activities": [activity.id]}
+    )
+
+    # ENTÃO o resultado deve indicar a falta de permissões.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data[0]["result"] == "forbidden"
+    assert ActivityRegistration.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_registration_detail_single_query(
+    user_factory, event_factory, activity_factory, django_assert_num_queries
+):
+    # DADO um usuário inscrito em duas activities de um evento.
+    user = user_factory(name="user", permissions=[])
+    event = event_factory(slug="event-a", owners=[])
+    event_registration = EventRegistration.objects.create(event=event, user=user)
+    for name in ["Activity A", "Activity B"]:
+        ActivityRegistration.objects.create(
+            activity=activity_factory(event=event, name=name, owners=[]),
+            event_registration=event_registration,
+        )
+
+    # QUANDO as inscrições são serializadas.
+    # ENTÃO as activities e os eventos aninhados devem ser carregados
+    # na mesma query.
+    with django_assert_num_queries(1):
+        data = ActivityRegistrationDetailSerializer(
+            ActivityRegistrationDetailSerializer.setup_eager_loading(
+                ActivityRegistration.objects.filter(
+                    event_registration__user=user
+                ).order_by("id")
+            ),
+            many=True,
+        ).data
+    assert [x["activity"]["name"] for x in data] == ["Activity A", "Activity B"]
+    assert [x["activity"]["registration_count"] for x in data] == [1, 1]
+    assert [x["event_registration"]["event"]["has_activities"] for x in data] == [
+        True,
+        True,
+    ]
@@ -1,11 +1,22 @@
 from datetime import timedelta
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 
-from eventos2.core.models import Event, EventRegistration
+from eventos2.core.models import (
+    ActivityRegistration,
+    Event,
+    EventRegistration,
+    ReviewAnswer,
+    Submission,
+    SubmissionDocument,
+)
+from eventos2.core.views import EventViewSet
+from eventos2.utils.files import CONTENT_TYPE_PDF
 
 
 @pytest.mark.django_db
@@ -120,6 +131,166 @@ def test_retrieve_valid(api_client, user_factory, event_factory):
     assert resp.data["slug"] == event.slug
 
 
+@pytest.mark.django_db
+def test_retrieve_conditional(
+    api_client,
+    event_factory,
+    activity_factory,
+    django_assert_max_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um evento, já obtido anteriormente.
+    event = event_factory(slug="event-a", owners=[])
+    resp = api_client.get(reverse("event-detail", args=[event.slug]))
+    etag = resp["ETag"]
+    last_modified = resp["Last-Modified"]
+
+    # QUANDO a API é chamada novamente, com os validadores.
+    # ENTÃO a resposta é 304, obtida com uma consulta no máximo.
+    with django_assert_max_num_queries(1):
+        resp = api_client.get(
+            reverse("event-detail", args=[event.slug]), HTTP_IF_NONE_MATCH=etag
+        )
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+    resp = api_client.get(
+        reverse("event-detail", args=[event.slug]),
+        HTTP_IF_MODIFIED_SINCE=last_modified,
+    )
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # QUANDO uma atividade é adicionada ao evento (mudando has_activities).
+    with django_capture_on_commit_callbacks(execute=True):
+        activity_factory(event=event, name="Activity A", owners=[])
+
+    # ENTÃO o evento é retornado novamente, com um novo ETag.
+    resp = api_client.get(
+        reverse("event-detail", args=[event.slug]), HTTP_IF_NONE_MATCH=etag
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["has_activities"] is True
+    assert resp["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_retrieve_cached(
+    api_client,
+    event_factory,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um evento, já obtido anteriormente.
+    event = event_factory(slug="event-a", owners=[])
+    api_client.get(reverse("event-detail", args=["event-a"]))
+
+    # QUANDO o evento é obtido novamente.
+    # ENTÃO a resposta vem do cache, sem consultas ao banco de dados.
+    with django_assert_num_queries(0):
+        resp = api_client.get(reverse("event-detail", args=["event-a"]))
+    assert resp.data["slug"] == "event-a"
+
+    # QUANDO o slug do evento é alterado.
+    with django_capture_on_commit_callbacks(execute=True):
+        event.slug = "event-b"
+        event.save()
+
+    # ENTÃO o evento não é mais encontrado com o slug antigo.
+    resp = api_client.get(reverse("event-detail", args=["event-a"]))
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+    resp = api_client.get(reverse("event-detail", args=["event-b"]))
+    assert resp.data["slug"] == "event-b"
+
+
+@pytest.mark.django_db
+def test_list_catalog(api_client, event_factory):
+    # DADO eventos futuros, um já encerrado, e um deletado.
+    now = timezone.now()
+    later = event_factory(
+        slug="event-b",
+        owners=[],
+        starts_on=now + timedelta(days=2),
+        ends_on=now + timedelta(days=3),
+    )
+    sooner = event_factory(
+        slug="event-a",
+        owners=[],
+        starts_on=now + timedelta(days=1),
+        ends_on=now + timedelta(days=3),
+    )
+    event_factory(
+        slug="event-ended",
+        owners=[],
+        starts_on=now - timedelta(days=3),
+        ends_on=now - timedelta(days=2),
+    )
+    event_factory(slug="event-deleted", owners=[]).delete()
+
+    # QUANDO a API é chamada por um usuário anônimo.
+    resp = api_client.get(reverse("event-list"), {"page_size": 1})
+
+    # ENTÃO apenas os eventos disponíveis são retornados, em ordem de início.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [x["slug"] for x in resp.data["results"]] == [sooner.slug]
+    resp = api_client.get(resp.data["next"])
+    assert [x["slug"] for x in resp.data["results"]] == [later.slug]
+    assert resp.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_list_catalog_search(api_client, event_factory):
+    # DADO eventos com nomes diferentes.
+    event = event_factory(slug="event-a", owners=[])
+    event.name = "Semana Acadêmica"
+    event.save()
+    event_factory(slug="event-b", owners=[])
+
+    # QUANDO a API é chamada buscando pelo nome, sem acentos.
+    resp = api_client.get(reverse("event-list"), {"search": "academica"})
+
+    # ENTÃO apenas o evento correspondente é retornado.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [x["slug"] for x in resp.data["results"]] == ["event-a"]
+
+
+@pytest.mark.django_db
+def test_list_catalog_cached(
+    api_client,
+    event_factory,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um evento, e o catálogo já requisitado por um usuário anônimo.
+    event = event_factory(slug="event-a", owners=[])
+    api_client.get(reverse("event-list"))
+
+    # QUANDO o catálogo é requisitado novamente.
+    # ENTÃO a resposta vem do cache, sem consultas ao banco de dados.
+    with django_assert_num_queries(0):
+        resp = api_client.get(reverse("event-list"))
+    assert [x["slug"] for x in resp.data["results"]] == ["event-a"]
+
+    # E ENTÃO o cache também responde requests condicionais.
+    with django_assert_num_queries(0):
+        resp = api_client.get(reverse("event-list"), HTTP_IF_NONE_MATCH=resp["ETag"])
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # QUANDO o evento é alterado.
+    with django_capture_on_commit_callbacks(execute=True):
+        event.name = "Event A (updated)"
+        event.save()
+
+    # ENTÃO o catálogo é atualizado.
+    resp = api_client.get(reverse("event-list"))
+    assert [x["name"] for x in resp.data["results"]] == ["Event A (updated)"]
+
+    # QUANDO o evento é deletado.
+    with django_capture_on_commit_callbacks(execute=True):
+        event.delete()
+
+    # ENTÃO o evento não aparece mais no catálogo.
+    resp = api_client.get(reverse("event-list"))
+    assert resp.data["results"] == []
+
+
 @pytest.mark.django_db
 def test_update_valid(api_client, user_factory, event_factory):
     # DADO um usuário autenticado, e um evento pertencente a ele.
@@ -239,7 +410,9 @@ def test_delete_unauthorized(api_client, user_factory, event_factory):
 
 
 @pytest.mark.django_db
-def test_list_registrations(api_client, user_factory, event_factory):
+def test_list_registrations(
+    api_client, user_factory, event_factory, read_streaming_json
+):
     # DADO um usuário autenticado.
     user = user_factory(name="user", permissions=["core.view_registrations_for_event"])
     api_client.force_authenticate(user=user)
@@ -255,8 +428,86 @@ def test_list_registrations(api_client, user_factory, event_factory):
 
     # ENTÃO apenas as inscrições do evento A serão retornadas
     assert resp.status_code == status.HTTP_200_OK
-    assert len(resp.data) == 1
-    assert resp.data[0]["user"]["email"] == registration_a.user.email
+    data = read_streaming_json(resp)
+    assert len(data) == 1
+    assert data[0]["user"]["email"] == registration_a.user.email
+
+
+@pytest.mark.django_db
+def test_list_registrations_streamed_in_chunks(
+    api_client, user_factory, event_factory, read_streaming_json, monkeypatch
+):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=["core.view_registrations_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO cinco inscrições no evento.
+    registrations = [
+        EventRegistration.objects.create(
+            event=event, user=user_factory(name="user-{}".format(n), permissions=[])
+        )
+        for n in range(5)
+    ]
+    # E DADO que as inscrições são serializadas de 2 em 2.
+    monkeypatch.setattr(EventViewSet, "stream_chunk_size", 2)
+
+    # QUANDO a API é chamada para listar as inscrições do evento.
+    resp = api_client.get(reverse("event-list-registrations", args=[event.slug]))
+
+    # ENTÃO a resposta deve ser um único array JSON com todas as inscrições.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.streaming
+    data = read_streaming_json(resp)
+    assert [x["id"] for x in data] == [x.id for x in registrations]
+    assert data[0]["event"]["slug"] == event.slug
+
+
+@pytest.mark.django_db
+def test_list_registrations_paginated(api_client, user_factory, event_factory):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=["core.view_registrations_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO cinco inscrições no evento.
+    registrations = [
+        EventRegistration.objects.create(
+            event=event, user=user_factory(name="user-{}".format(n), permissions=[])
+        )
+        for n in range(5)
+    ]
+
+    # QUANDO a API é chamada para listar as inscrições, paginadas de 2 em 2.
+    url = "{}?page_size=2".format(
+        reverse("event-list-registrations", args=[event.slug])
+    )
+    ids = []
+    while url:
+        resp = api_client.get(url)
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.data["results"]) <= 2
+        ids += [x["id"] for x in resp.data["results"]]
+        url = resp.data["next"]
+
+    # ENTÃO todas as inscrições devem ser retornadas, em ordem, sem repetições.
+    assert ids == [x.id for x in registrations]
+
+
+@pytest.mark.django_db
+def test_list_registrations_invalid_cursor(api_client, user_factory, event_factory):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=["core.view_registrations_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+
+    # QUANDO a API é chamada com um cursor inválido.
+    resp = api_client.get(
+        "{}?cursor=invalid".format(
+            reverse("event-list-registrations", args=[event.slug])
+        )
+    )
+
+    # ENTÃO a resposta deve ser de não encontrado.
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
 
 
 @pytest.mark.django_db
@@ -292,6 +543,43 @@ def test_list_activities(api_client, user_factory, event_factory, activity_facto
     assert resp.data[0]["name"] == activity_a.name
 
 
+@pytest.mark.django_db
+def test_list_activities_conditional(
+    api_client,
+    user_factory,
+    event_factory,
+    activity_factory,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um usuário autenticado, e um evento com uma atividade.
+    user = user_factory(name="user", permissions=["core.view_activities_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+    activity = activity_factory(event=event, name="Activity A", owners=[])
+    # E DADO as atividades já obtidas anteriormente.
+    resp = api_client.get(reverse("event-list-activities", args=[event.slug]))
+    etag = resp["ETag"]
+
+    # QUANDO a API é chamada novamente, com o ETag.
+    resp = api_client.get(
+        reverse("event-list-activities", args=[event.slug]), HTTP_IF_NONE_MATCH=etag
+    )
+
+    # ENTÃO a resposta é 304.
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # QUANDO a atividade é deletada.
+    with django_capture_on_commit_callbacks(execute=True):
+        activity.delete()
+
+    # ENTÃO as atividades são retornadas novamente.
+    resp = api_client.get(
+        reverse("event-list-activities", args=[event.slug]), HTTP_IF_NONE_MATCH=etag
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data == []
+
+
 @pytest.mark.django_db
 def test_list_tracks(api_client, user_factory, event_factory, track_factory):
     # DADO um usuário autenticado, um evento pertencente a ele, e um track no evento.
@@ -310,6 +598,52 @@ def test_list_tracks(api_client, user_factory, event_factory, track_factory):
     assert resp.data[0]["name"] == track_a.name
 
 
+@pytest.mark.django_db
+def test_list_activities_registration_count(
+    api_client, user_factory, event_factory, activity_factory
+):
+    # DADO um usuário autenticado, registrado em um evento com duas atividades.
+    user = user_factory(name="user", permissions=["core.view_activities_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    event_registration = EventRegistration.objects.create(event=event, user=user)
+    activity_a = activity_factory(event=event, name="Activity A", owners=[])
+    activity_factory(event=event, name="Activity B", owners=[])
+    # E DADO uma inscrição na primeira atividade.
+    ActivityRegistration.objects.create(
+        activity=activity_a, event_registration=event_registration
+    )
+
+    # QUANDO a API é chamada para listar as activities do evento.
+    resp = api_client.get(reverse("event-list-activities", args=[event.slug]))
+
+    # ENTÃO a contagem de inscrições de cada activity deve ser retornada.
+    assert resp.status_code == status.HTTP_200_OK
+    counts = {x["name"]: x["registration_count"] for x in resp.data}
+    assert counts == {"Activity A": 1, "Activity B": 0}
+
+
+@pytest.mark.django_db
+def test_list_tracks_submission_count(
+    api_client, user_factory, event_factory, track_factory, submission_factory
+):
+    # DADO um usuário autenticado, um evento pertencente a ele, e um track no evento.
+    user = user_factory(name="user", permissions=["core.view_tracks_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    track = track_factory(event=event, name="Track A")
+    # E DADO duas submissions no track, uma delas removida.
+    submission_factory(track=track, title="Submission A", authors=[])
+    submission_factory(track=track, title="Submission B", authors=[]).delete()
+
+    # QUANDO a API é chamada para listar os tracks do evento.
+    resp = api_client.get(reverse("event-list-tracks", args=[event.slug]))
+
+    # ENTÃO a contagem não deve incluir a submission removida.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data[0]["submission_count"] == 1
+
+
 @pytest.mark.django_db
 def test_list_submissions(
     api_client, user_factory, event_factory, track_factory, submission_factory
@@ -357,3 +691,129 @@ def test_list_submissions_filter(
 
     assert len(resp.data) == 1
     assert resp.data[0]["title"] == submission_a.title
+
+
+@pytest.mark.django_db
+def test_list_submissions_search_tolerates_typos(
+    api_client, user_factory, event_factory, track_factory, submission_factory
+):
+    # DADO um usuário autenticado, um evento pertencente a ele, e um track no evento.
+    user = user_factory(name="user", permissions=["core.view_submissions_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    track = track_factory(event=event, name="Track A")
+    submission = submission_factory(
+        track=track, title="Aprendizagem de máquina na agricultura", authors=[]
+    )
+    submission_factory(track=track, title="Desenvolvimento web", authors=[])
+
+    # QUANDO a API é chamada buscando por um título com erro de digitação.
+    resp = api_client.get(
+        "{}?title=agricultra".format(
+            reverse("event-list-submissions", args=[event.slug])
+        )
+    )
+
+    # ENTÃO a submission correspondente será retornada.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [x["id"] for x in resp.data] == [submission.id]
+
+
+@pytest.mark.django_db
+def test_list_submissions_search_ranked(
+    api_client, user_factory, event_factory, track_factory, submission_factory
+):
+    # DADO um usuário autenticado, um evento pertencente a ele, e um track no evento.
+    user = user_factory(name="user", permissions=["core.view_submissions_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    track = track_factory(event=event, name="Track A")
+    # E DADO submissions onde o termo buscado aparece no título em inglês
+    # e no título.
+    english = submission_factory(track=track, title="Estudo de caso", authors=[])
+    Submission.objects.filter(pk=english.pk).update(title_english="Robotics case study")
+    exact = submission_factory(track=track, title="Robótica educacional", authors=[])
+    submission_factory(track=track, title="Outra submissão", authors=[])
+
+    # QUANDO a API é chamada buscando pelo termo.
+    resp = api_client.get(
+        "{}?title=robotica".format(reverse("event-list-submissions", args=[event.slug]))
+    )
+
+    # ENTÃO as submissions serão retornadas, a com o termo no título primeiro.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [x["id"] for x in resp.data] == [exact.id, english.id]
+
+    # E ENTÃO a busca também pode ser paginada.
+    resp = api_client.get(
+        "{}?title=robotica&page_size=1".format(
+            reverse("event-list-submissions", args=[event.slug])
+        )
+    )
+    assert [x["id"] for x in resp.data["results"]] == [exact.id]
+    resp = api_client.get(resp.data["next"])
+    assert [x["id"] for x in resp.data["results"]] == [english.id]
+    assert resp.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_list_submissions_query_count(
+    api_client,
+    user_factory,
+    event_factory,
+    track_factory,
+    submission_factory,
+    review_factory,
+    track_review_question_factory,
+    track_submission_document_slot_factory,
+    document_factory,
+):
+    # DADO um usuário autenticado, um evento pertencente a ele, e um track no evento.
+    user = user_factory(name="user", permissions=["core.view_submissions_for_event"])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    track = track_factory(event=event, name="Track A")
+    slot = track_submission_document_slot_factory(track=track, name="Slot A")
+    question = track_review_question_factory(track=track, text="Question A")
+
+    def create_submission(n):
+        author = user_factory(name="author-{}".format(n), permissions=[])
+        reviewer = user_factory(name="reviewer-{}".format(n), permissions=[])
+        submission = submission_factory(
+            track=track, title="Submission {}".format(n), authors=[author]
+        )
+        SubmissionDocument.objects.create(
+            slot=slot,
+            submission=submission,
+            document=document_factory(
+                file_path="document.pdf", content_type=CONTENT_TYPE_PDF
+            ),
+        )
+        review = review_factory(submission=submission, author=reviewer)
+        ReviewAnswer.objects.create(review=review, question=question, text="Yes")
+
+    url = reverse("event-list-submissions", args=[event.slug])
+
+    # E DADO uma submission com autores, documentos e reviews.
+    create_submission(1)
+    # (a primeira chamada popula o cache de permissões do usuário)
+    api_client.get(url)
+    # QUANDO a API é chamada para listar as submissions do evento.
+    with CaptureQueriesContext(connection) as queries_one:
+        resp = api_client.get(url)
+    assert len(resp.data) == 1
+
+    # E QUANDO existem mais submissions, e a API é chamada novamente.
+    for n in range(2, 6):
+        create_submission(n)
+    with CaptureQueriesContext(connection) as queries_many:
+        resp = api_client.get(url)
+    assert len(resp.data) == 5
+
+    # ENTÃO o número de queries deve ser o mesmo.
+    assert len(queries_many) == len(queries_one)
+    # E ENTÃO os dados aninhados devem estar presentes.
+    assert resp.data[0]["track"]["submission_count"] == 5
+    assert len(resp.data[0]["authors"]) == 1
+    assert len(resp.data[0]["documents"]) == 1
+    assert len(resp.data[0]["reviews"][0]["answers"]) == 1
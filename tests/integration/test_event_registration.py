@@ -1,8 +1,11 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
 from eventos2.core.models import EventRegistration
+from eventos2.core.serializers import EventRegistrationDetailSerializer
 
 
 @pytest.mark.django_db
@@ -161,6 +164,52 @@ def test_list_registrations_for_user_and_event(api_client, user_factory, event_f
     assert len(resp.data) == 1
 
 
+@pytest.mark.django_db
+def test_list_registrations_for_user_event_flags(
+    api_client, user_factory, event_factory, activity_factory, track_factory
+):
+    # DADO um usuário autenticado, e três eventos.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event_a = event_factory(slug="event-a", owners=[])
+    event_b = event_factory(slug="event-b", owners=[])
+    event_c = event_factory(slug="event-c", owners=[])
+    # E DADO uma atividade no evento A, e um track removido no evento B.
+    activity_factory(event=event_a, name="Activity A", owners=[])
+    track_factory(event=event_b, name="Track B").delete()
+    track_factory(event=event_c, name="Track C")
+    # E DADO inscrições do usuário em todos os eventos.
+    for event in [event_a, event_b, event_c]:
+        EventRegistration.objects.create(event=event, user=user)
+    url = "{}?user_public_id={}".format(
+        reverse("event-registration-list"), user.public_id
+    )
+
+    # QUANDO a API é chamada para listar as inscrições do usuário.
+    with CaptureQueriesContext(connection) as queries:
+        resp = api_client.get(url)
+
+    # ENTÃO os indicadores de cada evento devem estar corretos.
+    assert resp.status_code == status.HTTP_200_OK
+    flags = {
+        x["event"]["slug"]: (x["event"]["has_activities"], x["event"]["has_tracks"])
+        for x in resp.data
+    }
+    assert flags == {
+        "event-a": (True, False),
+        "event-b": (False, False),
+        "event-c": (False, True),
+    }
+    # E ENTÃO o número de queries não deve depender do número de inscrições.
+    EventRegistration.objects.create(
+        event=event_factory(slug="event-d", owners=[]), user=user
+    )
+    with CaptureQueriesContext(connection) as more_queries:
+        resp = api_client.get(url)
+    assert len(resp.data) == 4
+    assert len(more_queries) == len(queries)
+
+
 @pytest.mark.django_db
 def test_list_registrations_for_user_unauthorized(
     api_client, user_factory, event_factory
@@ -182,3 +231,77 @@ def test_list_registrations_for_user_unauthorized(
 
     # ENTÃO a reposta deve ser de falta de permissões
     assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_register_single_statement(
+    api_client, user_factory, event_factory, django_assert_num_queries
+):
+    # DADO um usuário autenticado, e um evento.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+
+    # QUANDO a API é chamada para registrar o usuário no evento.
+    # ENTÃO a registration deve ser criada em um único comando,
+    # além das queries para montar a resposta.
+    with django_assert_num_queries(2) as queries:
+        resp = api_client.post(
+            reverse("event-registration-list"), {"event_slug": event.slug}
+        )
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["event"]["slug"] == event.slug
+    assert queries.captured_queries[0]["sql"].startswith("INSERT")
+    assert "ON CONFLICT DO NOTHING" in queries.captured_queries[0]["sql"]
+
+    # E QUANDO a API é chamada novamente, como em um clique duplo.
+    resp = api_client.post(
+        reverse("event-registration-list"), {"event_slug": event.slug}
+    )
+
+    # ENTÃO a reposta deve ser de falha, sem erro no servidor.
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert EventRegistration.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_register_nonexistent_event(api_client, user_factory):
+    # DADO um usuário autenticado.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+
+    # QUANDO a API é chamada para registrar o usuário em um evento inexistente.
+    resp = api_client.post(
+        reverse("event-registration-list"), {"event_slug": "event-x"}
+    )
+
+    # ENTÃO a reposta de falha deve conter o erro no campo event.
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert len(resp.data["event_slug"]) != 0
+
+
+@pytest.mark.django_db
+def test_registration_detail_single_query(
+    user_factory, event_factory, activity_factory, django_assert_num_queries
+):
+    # DADO um usuário inscrito em dois eventos, um deles com uma activity.
+    user = user_factory(name="user", permissions=[])
+    event_a = event_factory(slug="event-a", owners=[])
+    event_b = event_factory(slug="event-b", owners=[])
+    activity_factory(event=event_a, name="Activity", owners=[])
+    for event in [event_a, event_b]:
+        EventRegistration.objects.create(event=event, user=user)
+
+    # QUANDO as inscrições são serializadas.
+    # ENTÃO os eventos aninhados devem ser carregados na mesma query.
+    with django_assert_num_queries(1):
+        data = EventRegistrationDetailSerializer(
+            EventRegistrationDetailSerializer.setup_eager_loading(
+                EventRegistration.objects.filter(user=user).order_by("id")
+            ),
+            many=True,
+        ).data
+    assert [(x["event"]["slug"], x["event"]["has_activities"]) for x in data] == [
+        ("event-a", True),
+        ("event-b", False),
+    ]
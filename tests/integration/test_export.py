@@ -0,0 +1,155 @@
+import csv
+import zipfile
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from eventos2.core.models import ActivityRegistration, EventRegistration, Export
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_export_event_registrations_csv(
+    api_client,
+    user_factory,
+    event_factory,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO duas inscrições no evento.
+    for name in ["user-a", "user-b"]:
+        EventRegistration.objects.create(
+            event=event, user=user_factory(name=name, permissions=[])
+        )
+
+    # QUANDO a API é chamada para exportar as inscrições do evento.
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(
+            reverse("export-list"),
+            {
+                "event_slug": event.slug,
+                "kind": Export.Kind.EVENT_REGISTRATIONS,
+                "file_format": Export.FileFormat.CSV,
+            },
+        )
+
+    # ENTÃO a exportação deve ser aceita, e executada em background.
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    export = Export.objects.get(public_id=resp.data["public_id"])
+    assert export.status == Export.Status.DONE
+
+    # E QUANDO a API é chamada para obter o estado da exportação.
+    resp = api_client.get(reverse("export-detail", args=[export.public_id]))
+
+    # ENTÃO a exportação deve estar completa, com um link para o arquivo.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["status"] == Export.Status.DONE
+    assert resp.data["progress"] == 1.0
+    assert resp.data["url"].endswith(".csv")
+    # E ENTÃO o arquivo deve conter as inscrições.
+    with open(media_root / export.file.name, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [x["email"] for x in rows] == ["user-a@example.com", "user-b@example.com"]
+
+
+@pytest.mark.django_db
+def test_export_activity_registrations_xlsx(
+    api_client,
+    user_factory,
+    event_factory,
+    activity_factory,
+    media_root,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um usuário autenticado, e uma atividade pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+    activity = activity_factory(event=event, name="Activity <A>", owners=[user])
+    # E DADO uma inscrição na atividade.
+    participant = user_factory(name="participant", permissions=[])
+    ActivityRegistration.objects.create(
+        activity=activity,
+        event_registration=EventRegistration.objects.create(
+            event=event, user=participant
+        ),
+    )
+
+    # QUANDO a API é chamada para exportar as inscrições da atividade.
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(
+            reverse("export-list"),
+            {
+                "event_slug": event.slug,
+                "kind": Export.Kind.ACTIVITY_REGISTRATIONS,
+                "activity": activity.id,
+                "file_format": Export.FileFormat.XLSX,
+            },
+        )
+
+    # ENTÃO a exportação deve ser concluída.
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    export = Export.objects.get(public_id=resp.data["public_id"])
+    assert export.status == Export.Status.DONE
+    assert export.row_count == 1
+    # E ENTÃO o arquivo deve ser uma planilha contendo a inscrição.
+    with zipfile.ZipFile(media_root / export.file.name) as package:
+        sheet = package.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert "Activity &lt;A&gt;" in sheet
+    assert participant.email in sheet
+
+
+@pytest.mark.django_db
+def test_export_unauthorized(api_client, user_factory, event_factory):
+    # DADO um usuário autenticado, e um evento não pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+
+    # QUANDO a API é chamada para exportar as inscrições do evento.
+    resp = api_client.post(
+        reverse("export-list"),
+        {
+            "event_slug": event.slug,
+            "kind": Export.Kind.EVENT_REGISTRATIONS,
+            "file_format": Export.FileFormat.CSV,
+        },
+    )
+
+    # ENTÃO a resposta deve ser de falta de permissão.
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+    # E ENTÃO a exportação não deve ser criada.
+    assert Export.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_export_retrieve_other_user_unauthorized(
+    api_client, user_factory, event_factory
+):
+    # DADO um usuário autenticado, e uma exportação solicitada por outro usuário.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    other_user = user_factory(name="other", permissions=[])
+    event = event_factory(slug="event-a", owners=[other_user])
+    export = Export.objects.create(
+        event=event,
+        kind=Export.Kind.EVENT_REGISTRATIONS,
+        file_format=Export.FileFormat.CSV,
+        requested_by=other_user,
+    )
+
+    # QUANDO a API é chamada para obter o estado da exportação.
+    resp = api_client.get(reverse("export-detail", args=[export.public_id]))
+
+    # ENTÃO a resposta deve ser de falta de permissão.
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
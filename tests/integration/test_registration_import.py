@@ -0,0 +1,250 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from eventos2.core import tasks
+from eventos2.core.models import EventRegistration, RegistrationImport
+from eventos2.core.views import registration_import
+
+
+@pytest.mark.django_db
+def test_import_identifiers(api_client, user_factory, event_factory):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO três usuários, um deles já registrado no evento.
+    user_a = user_factory(name="user-a", permissions=[])
+    user_b = user_factory(name="user-b", permissions=[])
+    user_c = user_factory(name="user-c", permissions=[])
+    EventRegistration.objects.create(event=event, user=user_c)
+
+    # QUANDO a API é chamada para importar os usuários, por email ou public ID.
+    resp = api_client.post(
+        reverse("registration-import-list"),
+        {
+            "event_slug": event.slug,
+            "identifiers": [
+                user_a.email,
+                user_b.public_id,
+                user_c.email,
+                "unknown@example.com",
+                user_a.public_id,
+            ],
+        },
+    )
+
+    # ENTÃO a resposta deve conter o resultado de cada linha.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["status"] == RegistrationImport.Status.DONE
+    assert [x["result"] for x in resp.data["rows"]] == [
+        RegistrationImport.Result.CREATED,
+        RegistrationImport.Result.CREATED,
+        RegistrationImport.Result.ALREADY_REGISTERED,
+        RegistrationImport.Result.NOT_FOUND,
+        RegistrationImport.Result.DUPLICATE,
+    ]
+    assert resp.data["summary"][RegistrationImport.Result.CREATED] == 2
+    # E ENTÃO os usuários devem ser registrados no evento.
+    assert set(
+        EventRegistration.objects.filter(event=event).values_list("user", flat=True)
+    ) == {user_a.id, user_b.id, user_c.id}
+
+
+@pytest.mark.django_db
+def test_import_results_from_database(api_client, user_factory, event_factory):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    # E DADO um usuário já registrado no evento, um não registrado,
+    # e um desativado.
+    registered = user_factory(name="registered", permissions=[])
+    EventRegistration.objects.create(event=event, user=registered)
+    new = user_factory(name="new", permissions=[])
+    inactive = user_factory(name="inactive", permissions=[])
+    inactive.is_active = False
+    inactive.save()
+
+    # QUANDO a API é chamada para importar os usuários, com emails em
+    # maiúsculas e minúsculas, e linhas repetidas.
+    resp = api_client.post(
+        reverse("registration-import-list"),
+        {
+            "event_slug": event.slug,
+            "identifiers": [
+                "New@Example.com",
+                registered.public_id,
+                "REGISTERED@example.com",
+                new.email,
+                new.public_id,
+                inactive.email,
+            ],
+        },
+    )
+
+    # ENTÃO os emails devem ser encontrados sem diferenciar maiúsculas,
+    # os usuários desativados não, e cada usuário deve ser contado uma vez.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [x["result"] for x in resp.data["rows"]] == [
+        RegistrationImport.Result.CREATED,
+        RegistrationImport.Result.ALREADY_REGISTERED,
+        RegistrationImport.Result.DUPLICATE,
+        RegistrationImport.Result.DUPLICATE,
+        RegistrationImport.Result.DUPLICATE,
+        RegistrationImport.Result.NOT_FOUND,
+    ]
+    assert set(
+        EventRegistration.objects.filter(event=event).values_list("user", flat=True)
+    ) == {registered.id, new.id}
+
+
+@pytest.mark.django_db
+def test_import_registered_concurrently(
+    api_client, user_factory, event_factory, monkeypatch
+):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    user_a = user_factory(name="user-a", permissions=[])
+    user_b = user_factory(name="user-b", permissions=[])
+    # E DADO que um dos usuários se registra enquanto a importação é feita.
+    resolve_users = tasks.resolve_users
+
+    def resolve_and_register(identifiers):
+        user_ids = resolve_users(identifiers)
+        EventRegistration.objects.create(event=event, user=user_b)
+        return user_ids
+
+    monkeypatch.setattr(tasks, "resolve_users", resolve_and_register)
+
+    # QUANDO a API é chamada para importar os usuários.
+    resp = api_client.post(
+        reverse("registration-import-list"),
+        {"event_slug": event.slug, "identifiers": [user_a.email, user_b.email]},
+    )
+
+    # ENTÃO apenas o registro criado pela importação deve ser reportado.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [x["result"] for x in resp.data["rows"]] == [
+        RegistrationImport.Result.CREATED,
+        RegistrationImport.Result.ALREADY_REGISTERED,
+    ]
+    assert resp.data["summary"][RegistrationImport.Result.CREATED] == 1
+
+
+@pytest.mark.django_db
+def test_import_queries_batched(api_client, user_factory, event_factory):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    users = [user_factory(name="user{}".format(i), permissions=[]) for i in range(20)]
+
+    def import_users(users):
+        with CaptureQueriesContext(connection) as queries:
+            resp = api_client.post(
+                reverse("registration-import-list"),
+                {"event_slug": event.slug, "identifiers": [x.email for x in users]},
+            )
+        assert resp.status_code == status.HTTP_200_OK
+        return len(queries)
+
+    # QUANDO a API é chamada para importar poucos e muitos usuários
+    # (após uma primeira importação, que carrega os papéis do usuário).
+    import_users(users[:1])
+    # ENTÃO o número de queries não deve depender do número de usuários.
+    assert import_users(users[1:3]) == import_users(users[3:])
+    assert EventRegistration.objects.filter(event=event).count() == 20
+
+
+@pytest.mark.django_db
+def test_import_csv_file(api_client, user_factory, event_factory):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    user_a = user_factory(name="user-a", permissions=[])
+
+    # QUANDO a API é chamada com um arquivo CSV, com cabeçalho.
+    file = SimpleUploadedFile(
+        "students.csv", "email,name\r\n{},A\r\n".format(user_a.email).encode()
+    )
+    resp = api_client.post(
+        reverse("registration-import-list"),
+        {"event_slug": event.slug, "file": file},
+        format="multipart",
+    )
+
+    # ENTÃO o usuário do arquivo deve ser registrado.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["rows"] == [
+        {
+            "row": 1,
+            "identifier": user_a.email,
+            "result": RegistrationImport.Result.CREATED,
+        }
+    ]
+    assert EventRegistration.objects.get(event=event).user == user_a
+
+
+@pytest.mark.django_db
+def test_import_large_in_background(
+    api_client,
+    user_factory,
+    event_factory,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    # DADO um usuário autenticado, e um evento pertencente a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[user])
+    users = [user_factory(name="user{}".format(i), permissions=[]) for i in range(3)]
+    # E DADO que importações com mais de dois usuários são grandes.
+    monkeypatch.setattr(registration_import, "IMPORT_MAX_SYNC_ROWS", 2)
+
+    # QUANDO a API é chamada para importar os usuários.
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(
+            reverse("registration-import-list"),
+            {"event_slug": event.slug, "identifiers": [x.email for x in users]},
+        )
+
+    # ENTÃO a importação deve ser aceita, e executada em background.
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    assert resp.data["status"] == RegistrationImport.Status.PENDING
+
+    # E QUANDO a API é chamada para obter o estado da importação.
+    resp = api_client.get(
+        reverse("registration-import-detail", args=[resp.data["public_id"]])
+    )
+
+    # ENTÃO a importação deve estar completa.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["status"] == RegistrationImport.Status.DONE
+    assert resp.data["summary"][RegistrationImport.Result.CREATED] == 3
+    assert EventRegistration.objects.filter(event=event).count() == 3
+
+
+@pytest.mark.django_db
+def test_import_unauthorized(api_client, user_factory, event_factory):
+    # DADO um usuário autenticado, e um evento que não pertence a ele.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+
+    # QUANDO a API é chamada para importar registros no evento.
+    resp = api_client.post(
+        reverse("registration-import-list"),
+        {"event_slug": event.slug, "identifiers": [user.email]},
+    )
+
+    # ENTÃO a reposta deve ser de falta de permissões
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+    # E ENTÃO nenhuma registration deve ser criada.
+    assert EventRegistration.objects.count() == 0
@@ -1,5 +1,6 @@
 import pytest
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
 from eventos2.core.models import EventRegistration, Review, ReviewAnswer
@@ -51,6 +52,9 @@ def test_create_valid(
     assert Review.objects.first().author == reviewer_user
     assert Review.objects.first().submission == submission
     assert Review.objects.first().answers.first().text == "Answer A"
+    # E ENTÃO a review deve estar completa.
+    assert Review.objects.first().completed_on is not None
+    assert Review.objects.pending().count() == 0
 
 
 @pytest.mark.django_db
@@ -175,6 +179,7 @@ def test_create_duplicate(
     # E DADO uma review já respondida.
     review = review_factory(submission=submission, author=reviewer_user)
     ReviewAnswer.objects.create(review=review, question=question_a, text="Answer A")
+    Review.objects.filter(pk=review.pk).update(completed_on=timezone.now())
 
     # QUANDO a API é chamada para fazer a review novamente.
     resp = api_client.post(
@@ -1,8 +1,11 @@
+from unittest import mock
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 
 from eventos2.core.models import EventRegistration, Review
+from eventos2.core.views import review_request
 
 
 @pytest.mark.django_db
@@ -84,3 +87,239 @@ def test_create_unauthorized(
     assert resp.status_code == status.HTTP_403_FORBIDDEN
     # E ENTÃO a review não deve ser criada.
     assert Review.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_assign(
+    api_client,
+    track_factory,
+    event_factory,
+    user_factory,
+    submission_factory,
+    review_factory,
+):
+    # DADO um usuário autenticado, que é o event owner.
+    event_owner_user = user_factory(name="owner", permissions=[])
+    api_client.force_authenticate(user=event_owner_user)
+    event = event_factory(slug="event-a", owners=[event_owner_user])
+    track = track_factory(event=event, name="Track A")
+    # E DADO quatro reviewers, dos quais um é autor de todas as submissions.
+    reviewers = [
+        user_factory(name="reviewer{}".format(n), permissions=[]) for n in range(4)
+    ]
+    author = reviewers[0]
+    submissions = [
+        submission_factory(track=track, title="Submission", authors=[author])
+        for _ in range(3)
+    ]
+    # E DADO uma submission que já tem um reviewer.
+    review_factory(submission=submissions[0], author=reviewers[1])
+
+    # QUANDO a API é chamada para atribuir dois reviewers a cada submission.
+    resp = api_client.post(
+        reverse("review-request-assign"),
+        {
+            "track": track.id,
+            "reviewers": [x.public_id for x in reviewers],
+            "reviewers_per_submission": 2,
+        },
+        format="json",
+    )
+
+    # ENTÃO a resposta deve ser de sucesso.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data == {
+        "assigned": 5,
+        "submissions": 3,
+        "incomplete_submissions": [],
+    }
+    # E ENTÃO cada submission deve ter dois reviewers, nenhum deles o autor.
+    for submission in submissions:
+        assert submission.reviews.count() == 2
+    assert not Review.objects.filter(author=author).exists()
+    # E ENTÃO as reviews devem ser distribuídas igualmente.
+    assert sorted(Review.objects.filter(author=x).count() for x in reviewers[1:]) == [
+        2,
+        2,
+        2,
+    ]
+
+    # E QUANDO a API é chamada novamente.
+    resp = api_client.post(
+        reverse("review-request-assign"),
+        {
+            "event_slug": event.slug,
+            "reviewers": [x.public_id for x in reviewers],
+            "reviewers_per_submission": 2,
+        },
+        format="json",
+    )
+
+    # ENTÃO nenhuma review deve ser criada.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["assigned"] == 0
+    assert Review.objects.count() == 6
+
+
+@pytest.mark.django_db
+def test_assign_counts_only_created_reviews(
+    api_client, track_factory, event_factory, user_factory, submission_factory
+):
+    # DADO um event owner, duas submissions e dois reviewers.
+    event_owner_user = user_factory(name="owner", permissions=[])
+    api_client.force_authenticate(user=event_owner_user)
+    event = event_factory(slug="event-a", owners=[event_owner_user])
+    track = track_factory(event=event, name="Track A")
+    author = user_factory(name="author", permissions=[])
+    reviewers = [
+        user_factory(name="reviewer{}".format(n), permissions=[]) for n in range(2)
+    ]
+    for _ in range(2):
+        submission_factory(track=track, title="Submission", authors=[author])
+    # E DADO que outra requisição cria uma das reviews planejadas, ao mesmo tempo.
+    plan = review_request.plan_review_assignment
+
+    def plan_and_create_one(*args, **kwargs):
+        reviews, incomplete = plan(*args, **kwargs)
+        Review.objects.create(
+            submission_id=reviews[0].submission_id, author_id=reviews[0].author_id
+        )
+        return reviews, incomplete
+
+    # QUANDO a API é chamada para atribuir um reviewer a cada submission.
+    with mock.patch.object(
+        review_request, "plan_review_assignment", plan_and_create_one
+    ):
+        resp = api_client.post(
+            reverse("review-request-assign"),
+            {
+                "track": track.id,
+                "reviewers": [x.public_id for x in reviewers],
+                "reviewers_per_submission": 1,
+            },
+            format="json",
+        )
+
+    # ENTÃO apenas a review criada pela requisição deve ser contada.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["assigned"] == 1
+    assert Review.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_assign_not_enough_reviewers(
+    api_client, track_factory, event_factory, user_factory, submission_factory
+):
+    # DADO um event owner e uma submission.
+    event_owner_user = user_factory(name="owner", permissions=[])
+    api_client.force_authenticate(user=event_owner_user)
+    event = event_factory(slug="event-a", owners=[event_owner_user])
+    track = track_factory(event=event, name="Track A")
+    author = user_factory(name="author", permissions=[])
+    reviewer = user_factory(name="reviewer", permissions=[])
+    submission = submission_factory(track=track, title="Submission", authors=[author])
+
+    # QUANDO a API é chamada com um pool menor que o número de reviewers pedido.
+    resp = api_client.post(
+        reverse("review-request-assign"),
+        {
+            "event_slug": event.slug,
+            "reviewers": [author.public_id, reviewer.public_id],
+            "reviewers_per_submission": 2,
+        },
+        format="json",
+    )
+
+    # ENTÃO os reviewers disponíveis devem ser atribuídos,
+    # e a submission deve ser informada como incompleta.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["assigned"] == 1
+    assert resp.data["incomplete_submissions"] == [submission.id]
+    assert Review.objects.get().author == reviewer
+
+
+@pytest.mark.django_db
+def test_assign_unauthorized(
+    api_client, track_factory, event_factory, user_factory, submission_factory
+):
+    # DADO um usuário autenticado, que não é o event owner.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    event = event_factory(slug="event-a", owners=[])
+    track = track_factory(event=event, name="Track A")
+    submission_factory(track=track, title="Submission", authors=[])
+
+    # QUANDO a API é chamada para atribuir reviewers.
+    resp = api_client.post(
+        reverse("review-request-assign"),
+        {
+            "track": track.id,
+            "reviewers": [user.public_id],
+            "reviewers_per_submission": 1,
+        },
+        format="json",
+    )
+
+    # ENTÃO a resposta deve ser de falta de permissões.
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+    # E ENTÃO nenhuma review deve ser criada.
+    assert Review.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_create_conflict_of_interest(
+    api_client,
+    django_capture_on_commit_callbacks,
+    track_factory,
+    event_factory,
+    user_factory,
+    submission_factory,
+):
+    # DADO um event owner, e uma submission de um usuário.
+    event_owner_user = user_factory(name="owner", permissions=[])
+    submitter_user = user_factory(name="submitter", permissions=[])
+    reviewer_user = user_factory(name="reviewer", permissions=[])
+    api_client.force_authenticate(user=event_owner_user)
+    event = event_factory(slug="event-a", owners=[event_owner_user])
+    track = track_factory(event=event, name="Track A")
+    submission = submission_factory(
+        track=track, title="Submission A", authors=[submitter_user]
+    )
+    # E DADO que o reviewer e o autor da submission são coautores
+    # de uma submission de outro evento.
+    other_track = track_factory(
+        event=event_factory(slug="event-b", owners=[]), name="Track B"
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        submission_factory(
+            track=other_track,
+            title="Submission B",
+            authors=[submitter_user, reviewer_user],
+        )
+
+    # QUANDO a API é chamada para fazer a review request.
+    resp = api_client.post(
+        reverse("review-request-list"),
+        {"submission": submission.id, "author": reviewer_user.public_id},
+    )
+
+    # ENTÃO a resposta deve conter o erro no campo author.
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert len(resp.data["author"]) != 0
+    assert Review.objects.count() == 0
+
+    # E QUANDO a API é chamada para atribuir reviewers em massa.
+    resp = api_client.post(
+        reverse("review-request-assign"),
+        {
+            "track": track.id,
+            "reviewers": [reviewer_user.public_id],
+            "reviewers_per_submission": 1,
+        },
+        format="json",
+    )
+
+    # ENTÃO o coautor não deve ser atribuído.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["incomplete_submissions"] == [submission.id]
+    assert Review.objects.count() == 0
@@ -305,3 +305,83 @@ def test_list_review_questions(
     assert resp.status_code == status.HTTP_200_OK
     assert len(resp.data) == 1
     assert resp.data[0]["text"] == question_a.text
+
+
+@pytest.mark.django_db
+def test_list_reviewer_suggestions(
+    api_client,
+    django_capture_on_commit_callbacks,
+    user_factory,
+    event_factory,
+    track_factory,
+    submission_factory,
+    review_factory,
+):
+    # DADO um event owner autenticado, e um track com uma submission.
+    owner = user_factory(name="owner", permissions=["core.change_event"])
+    api_client.force_authenticate(user=owner)
+    event = event_factory(slug="event-a", owners=[owner])
+    track = track_factory(event=event, name="Track A")
+    author = user_factory(name="author", permissions=[])
+    submission = submission_factory(
+        track=track, title="Redes neurais para imagens médicas", authors=[author]
+    )
+    # E DADO usuários que são autores de submissions de outro evento.
+    other_track = track_factory(
+        event=event_factory(slug="event-b", owners=[]), name="Track B"
+    )
+    expert = user_factory(name="expert", permissions=[])
+    reviewer = user_factory(name="reviewer", permissions=[])
+    unrelated = user_factory(name="unrelated", permissions=[])
+    submission_factory(
+        track=other_track, title="Redes neurais profundas", authors=[expert]
+    )
+    submission_factory(track=other_track, title="Imagens médicas", authors=[reviewer])
+    submission_factory(
+        track=other_track, title="História da arte", authors=[unrelated, author]
+    )
+
+    # QUANDO a API é chamada para sugerir reviewers.
+    resp = api_client.get(
+        reverse("track-list-reviewer-suggestions", args=[track.id]), {"k": 2}
+    )
+
+    # ENTÃO os autores de submissions parecidas devem ser sugeridos,
+    # do mais parecido ao menos parecido, mas não o autor da submission.
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data[0]["submission"] == submission.id
+    suggested = [x["user"]["public_id"] for x in resp.data[0]["reviewers"]]
+    assert set(suggested) == {expert.public_id, reviewer.public_id}
+    assert resp.data[0]["reviewers"][0]["score"] > 0
+
+    # E QUANDO o reviewer é atribuído à submission,
+    # e uma nova submission parecida é criada.
+    review_factory(submission=submission, author=reviewer)
+    other = user_factory(name="other", permissions=[])
+    with django_capture_on_commit_callbacks(execute=True):
+        submission_factory(
+            track=other_track, title="Imagens médicas de redes", authors=[other]
+        )
+
+    # ENTÃO o reviewer não deve mais ser sugerido, e o novo autor deve.
+    resp = api_client.get(
+        reverse("track-list-reviewer-suggestions", args=[track.id]), {"k": 2}
+    )
+    suggested = [x["user"]["public_id"] for x in resp.data[0]["reviewers"]]
+    assert set(suggested) == {expert.public_id, other.public_id}
+
+
+@pytest.mark.django_db
+def test_list_reviewer_suggestions_unauthorized(
+    api_client, user_factory, event_factory, track_factory
+):
+    # DADO um usuário autenticado, que não é o event owner.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    track = track_factory(event=event_factory(slug="event-a", owners=[]), name="A")
+
+    # QUANDO a API é chamada para sugerir reviewers.
+    resp = api_client.get(reverse("track-list-reviewer-suggestions", args=[track.id]))
+
+    # ENTÃO a resposta deve ser de falta de permissões.
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
@@ -1,8 +1,10 @@
 import pytest
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 
-from eventos2.core.models import User
+from eventos2.core.models import Review, ReviewAnswer, User
 
 
 @pytest.mark.django_db
@@ -92,6 +94,56 @@ def test_retrieve_current_valid(api_client, user_factory):
     assert resp.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.django_db
+def test_retrieve_current_token_cached(
+    settings, api_client, user_factory, django_assert_num_queries
+):
+    # DADO um cache compartilhado entre os processos.
+    settings.SHARED_CACHE = True
+    # E DADO um user autenticado por um token JWT.
+    user = user_factory(name="user", permissions=[])
+    api_client.credentials(
+        HTTP_AUTHORIZATION="Bearer {}".format(AccessToken.for_user(user))
+    )
+
+    # QUANDO a API é chamada duas vezes para obter o user atual.
+    # ENTÃO o user é buscado no banco de dados apenas na primeira.
+    with django_assert_num_queries(1):
+        resp = api_client.get(reverse("user-current"))
+    assert resp.data["email"] == user.email
+    with django_assert_num_queries(0):
+        resp = api_client.get(reverse("user-current"))
+    assert resp.status_code == status.HTTP_200_OK
+
+    # QUANDO o user é desativado.
+    user.is_active = False
+    user.save()
+
+    # ENTÃO ele não é mais autenticado.
+    resp = api_client.get(reverse("user-current"))
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_retrieve_current_token_not_cached_without_shared_cache(
+    settings, api_client, user_factory, django_assert_num_queries
+):
+    # DADO um cache local a cada processo.
+    settings.SHARED_CACHE = False
+    # E DADO um user autenticado por um token JWT.
+    user = user_factory(name="user", permissions=[])
+    api_client.credentials(
+        HTTP_AUTHORIZATION="Bearer {}".format(AccessToken.for_user(user))
+    )
+
+    # QUANDO a API é chamada duas vezes para obter o user atual.
+    # ENTÃO o user é buscado no banco de dados em ambas.
+    for _ in range(2):
+        with django_assert_num_queries(1):
+            resp = api_client.get(reverse("user-current"))
+        assert resp.status_code == status.HTTP_200_OK
+
+
 @pytest.mark.django_db
 def test_retrieve_current_invalid(api_client, user_factory):
     # DADO nenhum user autenticado.
@@ -187,6 +239,41 @@ def test_list_submissions_current(
     assert resp.data[0]["title"] == submission.title
 
 
+@pytest.mark.django_db
+def test_list_submissions_current_paginated(
+    api_client, user_factory, event_factory, track_factory, submission_factory
+):
+    # DADO um user autenticado.
+    user = user_factory(name="user", permissions=[])
+    api_client.force_authenticate(user=user)
+    # E DADO três submissões do user
+    event = event_factory(slug="Event A", owners=[])
+    track = track_factory(event=event, name="Track A")
+    submissions = [
+        submission_factory(track=track, title="Submission", authors=[user])
+        for _ in range(3)
+    ]
+
+    # QUANDO a API é chamada para listar a primeira página das submissões.
+    resp = api_client.get(
+        "{}?page_size=2".format(reverse("user-current-list-submissions"))
+    )
+
+    # ENTÃO as submissões mais recentes devem ser retornadas.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [x["id"] for x in resp.data["results"]] == [
+        submissions[2].id,
+        submissions[1].id,
+    ]
+
+    # E QUANDO a API é chamada para listar a próxima página.
+    resp = api_client.get(resp.data["next"])
+
+    # ENTÃO a submissão restante deve ser retornada, e não deve haver mais páginas.
+    assert [x["id"] for x in resp.data["results"]] == [submissions[0].id]
+    assert resp.data["next"] is None
+
+
 @pytest.mark.django_db
 def test_list_review_requests(
     api_client,
@@ -217,3 +304,53 @@ def test_list_review_requests(
     # E ENTÃO a resposta deve conter a submissão pendente a ser avaliada pelo usuário.
     assert len(resp.data) == 1
     assert resp.data[0]["submission"]["title"] == submission.title
+
+
+@pytest.mark.django_db
+def test_list_review_requests_constant_queries(
+    api_client,
+    django_assert_num_queries,
+    user_factory,
+    event_factory,
+    track_factory,
+    track_review_question_factory,
+    submission_factory,
+    review_factory,
+):
+    # DADO um user autenticado.
+    user = user_factory(name="User A", permissions=[])
+    api_client.force_authenticate(user=user)
+    # E DADO uma review respondida e três reviews pendentes do user.
+    event = event_factory(slug="Event A", owners=[])
+    track = track_factory(event=event, name="Track A")
+    question = track_review_question_factory(track=track, text="Question A")
+    other_user = user_factory(name="User B", permissions=[])
+    reviews = [
+        review_factory(
+            submission=submission_factory(
+                track=track, title="Submission", authors=[other_user]
+            ),
+            author=user,
+        )
+        for _ in range(4)
+    ]
+    ReviewAnswer.objects.create(review=reviews[0], question=question, text="Answer")
+    Review.objects.filter(pk=reviews[0].pk).update(completed_on=timezone.now())
+
+    # QUANDO a API é chamada para listar a primeira página das reviews pendentes.
+    # ENTÃO o número de queries não deve depender do número de reviews.
+    with django_assert_num_queries(4):
+        resp = api_client.get(
+            "{}?page_size=2".format(reverse("user-current-list-review-requests"))
+        )
+
+    # E ENTÃO as reviews pendentes mais recentes devem ser retornadas.
+    assert resp.status_code == status.HTTP_200_OK
+    assert [x["id"] for x in resp.data["results"]] == [reviews[3].id, reviews[2].id]
+
+    # E QUANDO a API é chamada para listar a próxima página.
+    resp = api_client.get(resp.data["next"])
+
+    # ENTÃO a review respondida não deve ser retornada.
+    assert [x["id"] for x in resp.data["results"]] == [reviews[1].id]
+    assert resp.data["next"] is None
@@ -0,0 +1,93 @@
+import pytest
+
+from eventos2.core.coauthorship import (
+    CoauthorshipGraph,
+    build_coauthorship_graph,
+    get_coauthorship_graph,
+    update_coauthorship_graph,
+)
+
+
+def test_coauthorship_graph():
+    # DADO um grafo de coautoria em cadeia: 1 - 2 - 3 - 4, e 5 sozinho.
+    graph = CoauthorshipGraph.from_edges([(1, 2), (3, 2), (3, 4), (2, 1), (5, 5)])
+
+    # ENTÃO a representação CSR deve conter só os usuários com coautores.
+    assert list(graph.users) == [1, 2, 3, 4]
+    assert list(graph.indptr) == [0, 1, 3, 5, 6]
+    assert list(graph.indices) == [1, 0, 2, 1, 3, 2]
+    assert graph.coauthors(2) == {1, 3}
+    assert graph.coauthors(5) == set()
+    # E ENTÃO os usuários devem ser encontrados a até k saltos.
+    assert graph.within_hops([1], 0) == {1}
+    assert graph.within_hops([1], 2) == {1, 2, 3}
+    assert graph.within_hops([1, 5], 1) == {1, 2, 5}
+    # E ENTÃO os conflitos devem considerar o número de saltos.
+    assert graph.has_conflict(1, {1})
+    assert graph.has_conflict(1, {2}, hops=1)
+    assert not graph.has_conflict(1, {3}, hops=1)
+    assert graph.has_conflict(1, {4}, hops=3)
+    assert not graph.has_conflict(5, {1, 2, 3, 4}, hops=3)
+
+
+def test_coauthorship_graph_merge():
+    # DADO um grafo com vinte arestas.
+    graph = CoauthorshipGraph.from_edges(
+        [(n, n + 1) for n in range(1, 21)], last_authorship_id=2
+    )
+
+    # QUANDO novas arestas são adicionadas.
+    graph.merge([(21, 30), (1, 2), (30, 21)], last_authorship_id=4)
+
+    # ENTÃO o grafo deve conter todas as arestas, sem repetições,
+    # sem reconstruir os arrays.
+    assert sorted(graph.edges()) == [(n, n + 1) for n in range(1, 21)] + [(21, 30)]
+    assert graph.coauthors(21) == {20, 30}
+    assert graph.within_hops([30], 2) == {30, 21, 20}
+    assert graph.last_authorship_id == 4
+    assert 30 not in graph.users
+
+    # E QUANDO são adicionadas arestas além da fração limite.
+    graph.merge([(30, 31), (31, 32)], last_authorship_id=5)
+
+    # ENTÃO os arrays devem ser reconstruídos com todas as arestas.
+    assert graph.added == {}
+    assert list(graph.users) == list(range(1, 22)) + [30, 31, 32]
+    assert graph.coauthors(31) == {30, 32}
+
+
+@pytest.mark.django_db
+def test_update_coauthorship_graph(
+    user_factory,
+    event_factory,
+    track_factory,
+    submission_factory,
+    django_assert_num_queries,
+):
+    # DADO uma submission com dois autores.
+    track = track_factory(event=event_factory(slug="event-a", owners=[]), name="A")
+    user_a = user_factory(name="a", permissions=[])
+    user_b = user_factory(name="b", permissions=[])
+    user_c = user_factory(name="c", permissions=[])
+    submission = submission_factory(
+        track=track, title="Submission", authors=[user_a, user_b]
+    )
+    # E DADO o grafo carregado.
+    assert get_coauthorship_graph().coauthors(user_a.pk) == {user_b.pk}
+
+    # QUANDO um autor é adicionado, e o grafo é atualizado.
+    submission.authors.add(user_c)
+    update_coauthorship_graph([submission.pk])
+
+    # ENTÃO o grafo deve conter o novo coautor, sem nenhuma query ao ser lido.
+    with django_assert_num_queries(0):
+        graph = get_coauthorship_graph()
+    assert graph.coauthors(user_a.pk) == {user_b.pk, user_c.pk}
+    assert sorted(graph.edges()) == sorted(build_coauthorship_graph().edges())
+
+    # E QUANDO um autor é removido, e o grafo é reconstruído.
+    submission.authors.remove(user_b)
+    update_coauthorship_graph(rebuild=True)
+
+    # ENTÃO o grafo não deve mais conter o autor removido.
+    assert get_coauthorship_graph().coauthors(user_a.pk) == {user_c.pk}
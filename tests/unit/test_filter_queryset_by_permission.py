@@ -0,0 +1,169 @@
+from unittest.mock import Mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.viewsets import GenericViewSet
+
+from eventos2.core.models import Activity, Submission
+from eventos2.core.serializers import SubmissionDetailSerializer
+from eventos2.utils.permissions import PerActionPermissions
+from eventos2.utils.viewsets import ListActionMixin
+
+
+def create_view(action, perms):
+    view = Mock()
+    view.action = action
+    view.per_action_permissions = {action: perms}
+    return view
+
+
+def filter_by_permission(user, perms, queryset):
+    request = Mock()
+    request.user = user
+    return PerActionPermissions().filter_queryset_by_permission(
+        request, create_view("list", perms), queryset
+    )
+
+
+@pytest.mark.django_db
+def test_filter_combined_predicates(user_factory, event_factory, activity_factory):
+    # DADO um usuário, dono de um evento e de uma atividade em outro evento.
+    user = user_factory(name="user", permissions=[])
+    event_a = event_factory(slug="event-a", owners=[user])
+    event_b = event_factory(slug="event-b", owners=[])
+    activity_a = activity_factory(event=event_a, name="Activity A", owners=[])
+    activity_b = activity_factory(event=event_b, name="Activity B", owners=[user])
+    activity_factory(event=event_b, name="Activity C", owners=[])
+
+    # QUANDO as atividades são filtradas por uma permissão que combina
+    # predicados (dono da atividade ou dono do evento).
+    activities = filter_by_permission(
+        user, "core.view_registrations_for_activity", Activity.objects.all()
+    )
+
+    # ENTÃO apenas as atividades permitidas são retornadas,
+    # assim como verificando uma a uma.
+    assert set(activities) == {activity_a, activity_b}
+    assert set(activities) == {
+        x
+        for x in Activity.objects.all()
+        if user.has_perm("core.view_registrations_for_activity", x)
+    }
+
+
+@pytest.mark.django_db
+def test_filter_through_relations(
+    user_factory, event_factory, track_factory, submission_factory
+):
+    # DADO um usuário, dono de um evento, e submissions em dois eventos.
+    user = user_factory(name="user", permissions=[])
+    event_a = event_factory(slug="event-a", owners=[user])
+    event_b = event_factory(slug="event-b", owners=[])
+    submission_a = submission_factory(
+        track=track_factory(event=event_a, name="Track A"), title="A", authors=[]
+    )
+    submission_factory(
+        track=track_factory(event=event_b, name="Track B"), title="B", authors=[]
+    )
+
+    # QUANDO as submissions são filtradas pela permissão de dono do evento.
+    submissions = filter_by_permission(
+        user, "core.view_submissions_for_event", Submission.objects.all()
+    )
+
+    # ENTÃO apenas as submissions do evento do usuário são retornadas.
+    assert list(submissions) == [submission_a]
+
+
+@pytest.mark.django_db
+def test_filter_anonymous_and_allow_any(event_factory, activity_factory):
+    event = event_factory(slug="event-a", owners=[])
+    activity = activity_factory(event=event, name="Activity A", owners=[])
+
+    # Usuários anônimos não têm permissões à nivel de objeto.
+    activities = filter_by_permission(
+        AnonymousUser(), "core.view_activities_for_event", Activity.objects.all()
+    )
+    assert list(activities) == []
+
+    # A não ser que a ação permita todo mundo.
+    activities = filter_by_permission(
+        AnonymousUser(), PerActionPermissions.ALLOW_ANY, Activity.objects.all()
+    )
+    assert list(activities) == [activity]
+
+
+@pytest.mark.django_db
+def test_filter_superuser_and_inactive(user_factory, event_factory, activity_factory):
+    # DADO um superusuário, e atividades de eventos dos quais ele não é dono.
+    user = user_factory(name="admin", permissions=[])
+    user.is_superuser = True
+    user.save()
+    event = event_factory(slug="event-a", owners=[])
+    activity = activity_factory(event=event, name="Activity A", owners=[])
+    perm = "core.view_registrations_for_activity"
+
+    # ENTÃO todas as atividades são retornadas, assim como em `has_perm`.
+    assert list(filter_by_permission(user, perm, Activity.objects.all())) == [activity]
+    assert user.has_perm(perm, activity)
+
+    # QUANDO o superusuário é desativado.
+    user.is_active = False
+    user.save()
+
+    # ENTÃO nenhuma atividade é retornada, assim como em `has_perm`.
+    assert list(filter_by_permission(user, perm, Activity.objects.all())) == []
+    assert not user.has_perm(perm, activity)
+
+
+@pytest.mark.django_db
+def test_filter_inactive_owner(user_factory, event_factory, activity_factory):
+    # DADO um usuário desativado, dono de uma atividade.
+    user = user_factory(name="user", permissions=[])
+    event = event_factory(slug="event-a", owners=[])
+    activity_factory(event=event, name="Activity A", owners=[user])
+    user.is_active = False
+    user.save()
+
+    # QUANDO as atividades são filtradas pela permissão de dono.
+    activities = filter_by_permission(
+        user, "core.view_registrations_for_activity", Activity.objects.all()
+    )
+
+    # ENTÃO nenhuma atividade é retornada.
+    assert list(activities) == []
+
+
+class SubmissionListViewSet(ListActionMixin, GenericViewSet):
+    permission_classes = [PerActionPermissions]
+    per_action_permissions = {"list": "core.view_submissions_for_event"}
+
+    def list(self, request):
+        return self.get_list_response(
+            Submission.objects.all(), SubmissionDetailSerializer, ordering=["id"]
+        )
+
+
+@pytest.mark.django_db
+def test_list_response_filtered_by_permission(
+    user_factory, event_factory, track_factory, submission_factory
+):
+    # DADO um usuário, dono de um evento, e submissions em dois eventos.
+    user = user_factory(name="user", permissions=["core.view_submissions_for_event"])
+    event_a = event_factory(slug="event-a", owners=[user])
+    event_b = event_factory(slug="event-b", owners=[])
+    submission_a = submission_factory(
+        track=track_factory(event=event_a, name="Track A"), title="A", authors=[]
+    )
+    submission_factory(
+        track=track_factory(event=event_b, name="Track B"), title="B", authors=[]
+    )
+
+    # QUANDO uma ação de listagem lista todas as submissions.
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user=user)
+    resp = SubmissionListViewSet.as_view({"get": "list"})(request)
+
+    # ENTÃO apenas as submissions que o usuário pode ver são retornadas.
+    assert [x["id"] for x in resp.data] == [submission_a.id]
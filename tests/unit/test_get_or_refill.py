@@ -0,0 +1,75 @@
+import time
+
+from django.core.cache import cache
+
+from eventos2.utils import cache as cache_utils
+from eventos2.utils.cache import get_or_refill, refill
+
+
+def test_computes_once_while_fresh():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert get_or_refill("key", compute, timeout=60) == "value"
+    assert get_or_refill("key", compute, timeout=60) == "value"
+    # O valor é calculado só uma vez.
+    assert len(calls) == 1
+
+
+def test_cached_without_timeout():
+    # Um valor sem timeout não expira, até ser substituído.
+    assert get_or_refill("key", lambda: "value", timeout=None) == "value"
+    assert get_or_refill("key", lambda: "new", timeout=None) == "value"
+    refill("key", "new", timeout=None)
+    assert get_or_refill("key", lambda: "other", timeout=None) == "new"
+
+
+def test_not_cached_when_none():
+    assert get_or_refill("key", lambda: None, timeout=60) is None
+    assert get_or_refill("key", lambda: "value", timeout=60) == "value"
+
+
+def test_stale_while_refilling():
+    # Um valor expirado, mas dentro do stale_timeout.
+    cache.set("key", (time.time() - 1, "stale"), 60)
+    # Enquanto outro request está recalculando o valor.
+    cache.add("key:lock", True)
+
+    # O valor expirado é retornado, sem recalcular.
+    assert get_or_refill("key", lambda: "new", timeout=60, stale_timeout=60) == (
+        "stale"
+    )
+
+    # Quando o outro request termina, o valor é recalculado.
+    cache.delete("key:lock")
+    assert get_or_refill("key", lambda: "new", timeout=60, stale_timeout=60) == "new"
+
+
+def test_waits_for_refill(monkeypatch):
+    monkeypatch.setattr(cache_utils, "REFILL_POLL_INTERVAL", 0.01)
+    # Outro request está calculando o valor, que ainda não existe.
+    cache.add("key:lock", True)
+
+    def sleep(seconds):
+        # O outro request termina enquanto este espera.
+        cache.set("key", (time.time() + 60, "other"), 60)
+        cache.delete("key:lock")
+
+    monkeypatch.setattr(cache_utils.time, "sleep", sleep)
+
+    # O valor calculado pelo outro request é retornado.
+    assert get_or_refill("key", lambda: "new", timeout=60) == "other"
+
+
+def test_stops_waiting(monkeypatch):
+    monkeypatch.setattr(cache_utils, "REFILL_TIMEOUT", 0.05)
+    monkeypatch.setattr(cache_utils, "REFILL_POLL_INTERVAL", 0.01)
+    # Outro request está calculando o valor, mas demora demais.
+    cache.add("key:lock", True)
+
+    # O valor é calculado mesmo assim, sem liberar o lock do outro request.
+    assert get_or_refill("key", lambda: "new", timeout=60) == "new"
+    assert cache.get("key:lock") is True
@@ -0,0 +1,84 @@
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from eventos2.core.management.commands import loadtest
+from eventos2.core.management.commands.loadtest import (
+    compare_to_baseline,
+    percentile,
+    summarize,
+)
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) is None
+
+
+def test_summarize():
+    samples = [
+        ("GET /a", 0.010, True),
+        ("GET /a", 0.030, False),
+        ("POST /b", 0.020, True),
+        ("POST /b", 0.040, True),
+    ]
+
+    report = summarize(samples, duration=2)
+
+    assert report["GET /a"]["requests"] == 2
+    assert report["GET /a"]["error_rate"] == 0.5
+    assert report["POST /b"]["p50"] == 20
+    # O total inclui todos os endpoints.
+    assert report["total"]["requests"] == 4
+    assert report["total"]["throughput"] == 2
+    assert report["total"]["p99"] == 40
+
+
+def test_compare_to_baseline():
+    baseline = {
+        "GET /a": {"p95": 100, "error_rate": 0, "throughput": 50},
+        "GET /removed": {"p95": 100, "error_rate": 0, "throughput": 50},
+    }
+
+    # Dentro da tolerância, não há regressões.
+    report = {"GET /a": {"p95": 110, "error_rate": 0.005, "throughput": 45}}
+    assert compare_to_baseline(report, baseline, tolerance=0.2) == []
+
+    # Latência, erros e vazão piores que a tolerância são regressões.
+    report = {"GET /a": {"p95": 130, "error_rate": 0.05, "throughput": 30}}
+    assert len(compare_to_baseline(report, baseline, tolerance=0.2)) == 3
+
+
+@mock.patch.object(loadtest.time, "sleep")
+@mock.patch.object(loadtest.time, "monotonic")
+@mock.patch.object(loadtest.http.client, "HTTPConnection")
+@mock.patch.object(loadtest.subprocess, "Popen")
+def test_start_server_unhealthy(popen, http_connection, monotonic, sleep):
+    # DADO um servidor que responde ao health check com erro.
+    popen.return_value.poll.return_value = None
+    http_connection.return_value.getresponse.return_value.status = 503
+    monotonic.side_effect = range(0, 100, 10)
+
+    # QUANDO o servidor é iniciado.
+    with pytest.raises(CommandError, match="status: 503"):
+        loadtest.Command()._start_server("http://127.0.0.1:8001", 8001)
+
+    # ENTÃO deve esperar entre as tentativas, e encerrar o servidor.
+    assert sleep.call_count == http_connection.return_value.request.call_count == 2
+    popen.return_value.terminate.assert_called_once()
+
+
+def test_requires_shared_cache(settings):
+    # DADO que o Redis não está configurado.
+    settings.REDIS_URL = None
+
+    # QUANDO o teste de carga é executado, iniciando o servidor.
+    # ENTÃO ele deve falhar antes de começar.
+    with pytest.raises(CommandError, match="REDIS_URL"):
+        call_command("loadtest")
@@ -0,0 +1,102 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from eventos2.core.predicates import is_event_owner
+from eventos2.utils.memoization import (
+    MemoStats,
+    RequestMemoMiddleware,
+    memoize_per_request,
+)
+
+
+def run_in_request(fn):
+    """
+    Executa a função como se fosse a view de um request.
+    """
+    result = {}
+
+    def get_response(request):
+        result["value"] = fn()
+        return {}
+
+    RequestMemoMiddleware(get_response)(Mock(path="/"))
+    return result["value"]
+
+
+def create_counting_predicate():
+    calls = []
+
+    @memoize_per_request
+    def predicate(user, obj):
+        calls.append((user, obj))
+        return True
+
+    return predicate, calls
+
+
+def test_memoized_during_request():
+    predicate, calls = create_counting_predicate()
+    user = Mock(pk=1)
+    obj_a, obj_b = Mock(pk=1), Mock(pk=2)
+    hits_before = MemoStats.hits
+
+    def view():
+        predicate(user, obj_a)
+        predicate(user, obj_a)
+        predicate(user, obj_b)
+        predicate(user, None)
+        predicate(user, None)
+
+    run_in_request(view)
+
+    # Cada combinação de usuário e objeto é avaliada uma vez só.
+    assert len(calls) == 3
+    # E as avaliações economizadas são contadas.
+    assert MemoStats.hits - hits_before == 2
+
+    # Em outro request, o predicado é avaliado novamente.
+    run_in_request(lambda: predicate(user, obj_a))
+    assert len(calls) == 4
+
+
+def test_not_memoized_outside_request():
+    predicate, calls = create_counting_predicate()
+    user, obj = Mock(pk=1), Mock(pk=1)
+
+    predicate(user, obj)
+    predicate(user, obj)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.django_db
+def test_cleared_on_change(user_factory, event_factory):
+    user = user_factory(name="user", permissions=[])
+    event = event_factory(slug="event-a", owners=[])
+
+    def view():
+        before = is_event_owner(user, event)
+        event.owners.add(user)
+        return before, is_event_owner(user, event)
+
+    # O resultado muda quando o usuário se torna dono do evento.
+    assert run_in_request(view) == (False, True)
+
+
+def test_stats_counted_across_threads():
+    hits_before = MemoStats.hits
+
+    def record_hits():
+        for _ in range(10000):
+            MemoStats.record(hit=True)
+
+    threads = [threading.Thread(target=record_hits) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Nenhum incremento se perde entre as threads.
+    assert MemoStats.hits - hits_before == 80000
@@ -0,0 +1,26 @@
+from collections import Counter
+
+from eventos2.core.review_assignment import balance_assignment
+
+
+def test_balance_assignment():
+    # DADO cem submissions, cada uma com um autor excluído, e sete reviewers,
+    # dos quais um já tem muitas reviews.
+    reviewers = list(range(1, 8))
+    submissions = {n: (3, {reviewers[n % 7]}) for n in range(100)}
+    loads = {1: 20}
+
+    # QUANDO os reviewers são atribuídos.
+    pairs = balance_assignment(submissions, reviewers, loads)
+
+    # ENTÃO cada submission deve ter três reviewers diferentes, sem o seu autor.
+    by_submission = {}
+    for submission_id, reviewer_id in pairs:
+        by_submission.setdefault(submission_id, set()).add(reviewer_id)
+    assert all(len(x) == 3 for x in by_submission.values())
+    assert len(by_submission) == 100
+    assert all(reviewers[n % 7] not in by_submission[n] for n in range(100))
+    # E ENTÃO a carga total dos reviewers deve ser equilibrada.
+    total = Counter({**loads})
+    total.update(reviewer_id for _, reviewer_id in pairs)
+    assert max(total.values()) - min(total.values()) <= 1
@@ -0,0 +1,84 @@
+import pytest
+
+from eventos2.core.reviewer_matching import (
+    MatchingIndex,
+    get_matching_index,
+    refresh_matching_index,
+    tokenize,
+)
+
+
+def test_tokenize():
+    # QUANDO um título é separado em termos.
+    terms = tokenize("Análise de Redes Neurais para a saúde, em 2022")
+
+    # ENTÃO os termos devem estar sem acentos, stop words e palavras curtas.
+    assert terms == ["analise", "redes", "neurais", "saude"]
+
+
+def test_remove_submission():
+    # DADO um índice com duas submissions de um mesmo autor.
+    index = MatchingIndex()
+    index.add_submission(1, ["Redes neurais"], [10])
+    index.add_submission(2, ["Redes de sensores"], [10, 11])
+
+    # QUANDO uma submission é removida.
+    index.remove_submission(2)
+
+    # ENTÃO o índice deve ser igual ao de um índice só com a outra submission.
+    expected = MatchingIndex()
+    expected.add_submission(1, ["Redes neurais"], [10])
+    assert index.submission_terms == expected.submission_terms
+    assert index.reviewer_terms == expected.reviewer_terms
+    assert index.document_frequency == expected.document_frequency
+
+
+def test_suggest_reviewers():
+    # DADO um índice com os perfis de três reviewers e uma submission.
+    index = MatchingIndex()
+    index.add_submission(1, ["Redes neurais convolucionais"], [10])
+    index.add_submission(2, ["Redes neurais"], [11])
+    index.add_submission(3, ["Sensores de redes"], [12])
+    index.add_submission(4, ["Redes neurais convolucionais"], [13])
+    index.update_postings()
+
+    # QUANDO reviewers são sugeridos para a submission,
+    # sem o seu autor e com um reviewer indisponível.
+    suggestions = index.suggest_reviewers(
+        {1: ["Redes neurais convolucionais"]},
+        3,
+        excluded={1: {10}},
+        unavailable={13},
+    )
+
+    # ENTÃO os reviewers devem ser ordenados pela similaridade.
+    assert [x for x, _ in suggestions[1]] == [11, 12]
+    assert suggestions[1][0][1] == pytest.approx(0.8, abs=0.2)
+
+
+@pytest.mark.django_db
+def test_refresh_matching_index(
+    user_factory,
+    event_factory,
+    track_factory,
+    submission_factory,
+    django_assert_num_queries,
+):
+    # DADO o índice carregado, e uma submission criada depois.
+    track = track_factory(event=event_factory(slug="event-a", owners=[]), name="A")
+    user = user_factory(name="a", permissions=[])
+    assert get_matching_index().postings == {}
+    submission = submission_factory(track=track, title="Redes neurais", authors=[user])
+
+    # QUANDO o índice é atualizado com a submission.
+    refresh_matching_index([submission.pk])
+
+    # ENTÃO o índice deve conter os pesos do autor, sem nenhuma query ao ser lido.
+    with django_assert_num_queries(0):
+        index = get_matching_index()
+    assert {
+        term: [x for x, _ in entries] for term, entries in index.postings.items()
+    } == {
+        "redes": [user.pk],
+        "neurais": [user.pk],
+    }
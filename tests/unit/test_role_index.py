@@ -0,0 +1,89 @@
+import pytest
+
+from eventos2.core.models import EventRegistration
+from eventos2.core.predicates import (
+    is_activity_owner,
+    is_event_owner,
+    is_registered_to_event,
+    is_submission_author,
+)
+from eventos2.core.roles import get_role_index, load_role_index
+
+
+@pytest.mark.django_db
+def test_load_role_index(
+    user_factory,
+    event_factory,
+    activity_factory,
+    track_factory,
+    submission_factory,
+    django_assert_num_queries,
+):
+    # DADO um usuário com papéis em eventos, atividades e submissões.
+    user = user_factory(name="user", permissions=[])
+    event_a = event_factory(slug="event-a", owners=[user])
+    event_b = event_factory(slug="event-b", owners=[])
+    EventRegistration.objects.create(event=event_b, user=user)
+    activity = activity_factory(event=event_b, name="Activity A", owners=[user])
+    track = track_factory(event=event_b, name="Track A")
+    submission = submission_factory(track=track, title="Submission A", authors=[user])
+
+    # QUANDO os papéis são carregados.
+    # ENTÃO uma consulta só é feita.
+    with django_assert_num_queries(1):
+        index = load_role_index(user.pk)
+
+    assert index.owned_events == {event_a.pk}
+    assert index.registered_events == {event_b.pk}
+    assert index.owned_activities == {activity.pk}
+    assert index.authored_submissions == {submission.pk}
+
+
+@pytest.mark.django_db
+def test_predicates_use_cached_index(
+    settings,
+    user_factory,
+    event_factory,
+    activity_factory,
+    django_assert_num_queries,
+):
+    # DADO um cache compartilhado entre os processos.
+    settings.SHARED_CACHE = True
+    # E DADO um usuário, dono de um evento e de uma atividade.
+    user = user_factory(name="user", permissions=[])
+    event = event_factory(slug="event-a", owners=[user])
+    activity = activity_factory(event=event, name="Activity A", owners=[user])
+    # E DADO os papéis do usuário já em cache.
+    get_role_index(user)
+
+    # QUANDO os predicados são avaliados.
+    # ENTÃO nenhuma consulta é feita.
+    with django_assert_num_queries(0):
+        assert is_event_owner(user, event)
+        assert is_event_owner(user, activity)
+        assert is_activity_owner(user, activity)
+        assert not is_registered_to_event(user, event)
+        assert not is_submission_author(user, activity)
+
+    # QUANDO o usuário se registra no evento.
+    EventRegistration.objects.create(event=event, user=user)
+
+    # ENTÃO os papéis em cache são atualizados.
+    assert is_registered_to_event(user, event)
+
+
+@pytest.mark.django_db
+def test_index_not_cached_without_shared_cache(
+    settings, user_factory, event_factory, django_assert_num_queries
+):
+    # DADO um cache local a cada processo.
+    settings.SHARED_CACHE = False
+    # E DADO um usuário, dono de um evento.
+    user = user_factory(name="user", permissions=[])
+    event = event_factory(slug="event-a", owners=[user])
+    get_role_index(user)
+
+    # QUANDO os papéis são obtidos novamente, fora de um request.
+    # ENTÃO eles são carregados do banco de dados, e não do cache.
+    with django_assert_num_queries(1):
+        assert get_role_index(user).owned_events == {event.pk}